@@ -0,0 +1,437 @@
+"""
+Benchmarks of the client overhead of pyrdf4j.
+
+By default every run starts a fresh in-process stand-in server (see
+benchmarks.standin), so the numbers neither depend on a live RDF4J nor
+on the network and can be compared across versions of pyrdf4j:
+
+    python -m benchmarks.run --output before.json
+    git checkout feature
+    python -m benchmarks.run --output after.json --compare before.json
+
+The comparison exits with status 1 if the median of a case got slower
+by more than the threshold. The stand-in runs in the same process, so
+the timings include its share; they are meant to be compared with each
+other, not with those of a real server. Pass --server to benchmark
+against a RDF4J server instead.
+"""
+import argparse
+import gc
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from collections import namedtuple, OrderedDict
+from datetime import datetime, timezone
+
+from requests.auth import HTTPBasicAuth
+
+from benchmarks import standin
+from pyrdf4j.rdf4j import RDF4J
+from pyrdf4j.results import ijson
+
+# Version of the layout of the result files
+RESULT_FORMAT = 1
+
+# Relative slowdown of the median reported as regression
+DEFAULT_THRESHOLD = 0.1
+
+Case = namedtuple('Case', ['name', 'description', 'prepare', 'runs'])
+
+Workload = namedtuple('Workload', ['run', 'items', 'bytes', 'before'], defaults=(1, 0, None))
+Workload.__doc__ = """
+The timed function of a case. items and bytes are the statements or rows
+and the bytes handled by one run; before is called untimed ahead of each run.
+"""
+
+CASES = OrderedDict()
+
+
+def case(description, runs=1):
+    """
+    Registers a function preparing a Workload as benchmark case
+    :param runs: (optional) Factor of the number of runs, high for cases of
+        a few requests so their latencies are not lost in timer noise
+    """
+    def register(prepare):
+        CASES[prepare.__name__] = Case(prepare.__name__, description, prepare, runs)
+        return prepare
+    return register
+
+
+def ntriples(count, offset=0, contexts=0):
+    """N-Triples, or N-Quads spread over that many contexts"""
+    lines = []
+    for i in range(offset, offset + count):
+        line = '<http://example.org/s{}> <http://example.org/p{}> "value {}"'.format(i, i % 10, i)
+        if contexts:
+            line += ' <http://example.org/g{}>'.format(i % contexts)
+        lines.append(line + ' .\n')
+    return ''.join(lines).encode('utf8')
+
+
+class Bench:
+    """Connection and repositories shared by the cases of a run"""
+
+    def __init__(self, rdf4j_base, scale=1.0, auth=None, **server_params):
+        self.rdf4j_base = rdf4j_base
+        self.scale = scale
+        self.auth = auth
+        self.server_params = server_params
+        self.rdf4j = self.client()
+        self.repositories = set()
+
+    def client(self, **server_params):
+        return RDF4J(self.rdf4j_base, auth=self.auth, **dict(self.server_params, **server_params))
+
+    def size(self, count):
+        return max(1, int(count * self.scale))
+
+    def repository(self, repo_id, triple_data=None, content_type='application/n-triples'):
+        """A fresh repository, optionally filled with the triple data"""
+        repo_id = 'bench_' + repo_id
+        self.rdf4j.create_repository(repo_id, overwrite=True)
+        self.repositories.add(repo_id)
+        if triple_data is not None:
+            self.rdf4j.add_data_to_repo(repo_id, triple_data, content_type)
+        return repo_id
+
+    def cleanup(self):
+        self.rdf4j.drop_repositories(sorted(self.repositories), accept_not_exist=True)
+        self.repositories.clear()
+
+
+@case('Add one statement in a transaction of its own', runs=100)
+def small_updates(bench):
+    repo_id = bench.repository('small_updates')
+    counter = iter(range(10 ** 9))
+
+    def run():
+        bench.rdf4j.add_data_to_repo(repo_id, ntriples(1, next(counter)), 'application/n-triples')
+    return Workload(run, items=1)
+
+
+@case('Begin and commit an empty transaction', runs=100)
+def transaction_overhead(bench):
+    repo_id = bench.repository('transactions')
+
+    def run():
+        with bench.rdf4j.transaction(repo_id):
+            pass
+    return Workload(run)
+
+
+@case('Ten small adds and a size in one transaction', runs=100)
+def transaction_batch(bench):
+    repo_id = bench.repository('transaction_batch')
+    counter = iter(range(0, 10 ** 9, 10))
+
+    def run():
+        offset = next(counter)
+        with bench.rdf4j.transaction(repo_id) as transaction:
+            for i in range(10):
+                transaction.add(ntriples(1, offset + i), 'application/n-triples')
+            transaction.size()
+    return Workload(run, items=10)
+
+
+def _bulk_load(bench, repo_id, rdf4j):
+    count = bench.size(20000)
+    triple_data = ntriples(count)
+    repo_id = bench.repository(repo_id)
+
+    def before():
+        bench.rdf4j.empty_repository(repo_id)
+
+    def run():
+        rdf4j.add_data_to_repo(repo_id, triple_data, 'application/n-triples')
+    return Workload(run, items=count, bytes=len(triple_data), before=before)
+
+
+@case('Add N-Triples in one transaction')
+def bulk_load(bench):
+    return _bulk_load(bench, 'bulk_load', bench.rdf4j)
+
+
+@case('Add gzip compressed N-Triples in one transaction')
+def bulk_load_gzip(bench):
+    return _bulk_load(bench, 'bulk_load_gzip', bench.client(compress=True))
+
+
+@case('Load N-Triples lines in parallel batches by the BulkLoader')
+def bulk_loader(bench):
+    count = bench.size(20000)
+    triple_data = ntriples(count)
+    lines = triple_data.splitlines(keepends=True)
+    repo_id = bench.repository('bulk_loader')
+
+    def before():
+        bench.rdf4j.empty_repository(repo_id)
+
+    def run():
+        bench.rdf4j.bulk_load(repo_id, lines, batch_size=256 * 1024)
+    return Workload(run, items=count, bytes=len(triple_data), before=before)
+
+
+SELECT_ALL = 'SELECT ?s ?p ?o WHERE {?s ?p ?o}'
+
+
+def _select(bench, result_format):
+    count = bench.size(20000)
+    repo_id = bench.repository('select', ntriples(count))
+
+    def run():
+        if result_format is None:
+            rows = len(bench.rdf4j.query_repository(repo_id, SELECT_ALL)['results']['bindings'])
+        else:
+            rows = sum(1 for _ in bench.rdf4j.iter_query(repo_id, SELECT_ALL, result_format=result_format))
+        assert rows == count, rows
+    return Workload(run, items=count)
+
+
+@case('Decode a large SELECT result as one JSON document')
+def select_json(bench):
+    return _select(bench, None)
+
+
+@case('Stream a large SELECT result as JSON, requires ijson')
+def select_json_stream(bench):
+    if ijson is None:
+        return None
+    return _select(bench, 'json')
+
+
+@case('Stream a large SELECT result as TSV')
+def select_tsv(bench):
+    return _select(bench, 'tsv')
+
+
+@case('Stream a large SELECT result as binary results table')
+def select_binary(bench):
+    return _select(bench, 'binary')
+
+
+@case('Fetch a large SELECT result in pages with prefetch')
+def select_paginated(bench):
+    count = bench.size(20000)
+    repo_id = bench.repository('select', ntriples(count))
+
+    def run():
+        rows = sum(1 for _ in bench.rdf4j.paginated_query(repo_id, SELECT_ALL, page_size=5000))
+        assert rows == count, rows
+    return Workload(run, items=count)
+
+
+def _copy(bench, per_context):
+    count = bench.size(20000)
+    source = bench.repository('copy_source', ntriples(count, contexts=10), 'application/n-quads')
+    target = bench.repository('copy_target')
+
+    def before():
+        bench.rdf4j.empty_repository(target)
+
+    def run():
+        bench.rdf4j.copy_repository(source, target, per_context=per_context)
+    return Workload(run, items=count, before=before)
+
+
+@case('Copy a repository in one stream')
+def copy_repository(bench):
+    return _copy(bench, False)
+
+
+@case('Copy a repository context by context in parallel')
+def copy_repository_per_context(bench):
+    return _copy(bench, True)
+
+
+def summarize(timings, workload):
+    """Latency percentiles and throughput of the timings of a case"""
+    ordered = sorted(timings)
+    mean = statistics.mean(ordered)
+    median = statistics.median(ordered)
+    result = OrderedDict([
+        ('iterations', len(ordered)),
+        ('items', workload.items),
+        ('bytes', workload.bytes),
+        ('seconds', OrderedDict([
+            ('min', ordered[0]),
+            ('median', median),
+            ('mean', mean),
+            ('p95', ordered[min(len(ordered) - 1, int(math.ceil(0.95 * len(ordered))) - 1)]),
+            ('max', ordered[-1]),
+            ('stdev', statistics.stdev(ordered) if len(ordered) > 1 else 0.0),
+        ])),
+        ('ops_per_second', 1 / median if median else None),
+        ('items_per_second', workload.items / median if median else None),
+    ])
+    if workload.bytes:
+        result['bytes_per_second'] = workload.bytes / median if median else None
+    return result
+
+
+def measure(bench, case_, repeat, warmup):
+    """
+    Runs a case warmup times untimed, then repeat times timed
+    :return: Summary of the timings, None if the case is not available
+    """
+    workload = case_.prepare(bench)
+    if workload is None:
+        return None
+    timings = []
+    for i in range(warmup + repeat):
+        if workload.before is not None:
+            workload.before()
+        gc.collect()
+        start = time.perf_counter()
+        workload.run()
+        seconds = time.perf_counter() - start
+        if i >= warmup:
+            timings.append(seconds)
+    result = summarize(timings, workload)
+    result['description'] = case_.description
+    return result
+
+
+def environment():
+    try:
+        from importlib.metadata import version, PackageNotFoundError
+        try:
+            package_version = version('pyrdf4j')
+        except PackageNotFoundError:
+            package_version = None
+    except ImportError:  # pragma: no cover
+        package_version = None
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=os.path.dirname(os.path.abspath(__file__)),
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=True,
+        ).stdout.decode('ascii').strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return OrderedDict([
+        ('pyrdf4j', package_version),
+        ('commit', commit),
+        ('python', platform.python_version()),
+        ('implementation', platform.python_implementation()),
+        ('platform', platform.platform()),
+        ('created', datetime.now(timezone.utc).isoformat()),
+    ])
+
+
+def run(names=None, repeat=5, warmup=1, scale=1.0, rdf4j_base=None, auth=None, log=sys.stderr):
+    """
+    Runs the benchmark cases
+    :param names: (optional) Names of the cases to run, all by default
+    :param repeat: (optional) Timed runs per case, times the runs factor of the case
+    :param warmup: (optional) Untimed runs per case ahead of the timed ones, times the runs factor
+    :param scale: (optional) Factor of the numbers of statements and rows
+    :param rdf4j_base: (optional) Base URI of a RDF4J server, a stand-in is started by default
+    :param auth: (optional) Credentials for the RDF4J server
+    :return: The results in the layout of the result files
+    """
+    names = list(CASES) if not names else names
+    unknown = [name for name in names if name not in CASES]
+    if unknown:
+        raise ValueError('Unknown benchmark cases {}'.format(', '.join(unknown)))
+
+    server = None
+    if rdf4j_base is None:
+        server, rdf4j_base = standin.start()
+    bench = Bench(rdf4j_base, scale=scale, auth=auth)
+    report = environment()
+    report['format'] = RESULT_FORMAT
+    report['server'] = 'stand-in' if server is not None else rdf4j_base
+    report['parameters'] = OrderedDict([('repeat', repeat), ('warmup', warmup), ('scale', scale)])
+    report['results'] = OrderedDict()
+    try:
+        for name in names:
+            case_ = CASES[name]
+            result = measure(bench, case_, repeat * case_.runs, warmup * case_.runs)
+            if result is None:
+                log.write('{:<30} skipped\n'.format(name))
+                continue
+            report['results'][name] = result
+            log.write('{:<30} {}\n'.format(name, format_result(result)))
+    finally:
+        bench.cleanup()
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+    return report
+
+
+def format_result(result):
+    seconds = result['seconds']
+    text = 'median {:9.3f} ms  p95 {:9.3f} ms  {:10.1f} items/s'.format(
+        seconds['median'] * 1000, seconds['p95'] * 1000, result['items_per_second'] or 0)
+    if result.get('bytes_per_second'):
+        text += '  {:8.2f} MB/s'.format(result['bytes_per_second'] / 1e6)
+    return text
+
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD):
+    """
+    Compares the medians of the cases found in both results
+    :return: List of tuples (name, baseline median, current median, relative change, regressed)
+    """
+    rows = []
+    for name, result in current['results'].items():
+        before = baseline.get('results', {}).get(name)
+        if before is None:
+            continue
+        old, new = before['seconds']['median'], result['seconds']['median']
+        change = (new - old) / old if old else 0.0
+        rows.append((name, old, new, change, change > threshold))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmarks of the client overhead of pyrdf4j')
+    parser.add_argument('cases', nargs='*', help='cases to run, all by default: {}'.format(', '.join(CASES)))
+    parser.add_argument('--output', '-o', help='write the results as JSON to this file')
+    parser.add_argument('--compare', '-c', help='compare with the results in this JSON file')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='relative slowdown of the median reported as regression (default %(default)s)')
+    parser.add_argument('--repeat', '-r', type=int, default=5, help='timed runs per case (default %(default)s)')
+    parser.add_argument('--warmup', type=int, default=1, help='untimed runs per case (default %(default)s)')
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help='factor of the numbers of statements and rows (default %(default)s)')
+    parser.add_argument('--server', help='base URI of a RDF4J server to use instead of the stand-in')
+    parser.add_argument('--user', help='user name on the RDF4J server')
+    parser.add_argument('--password', help='password on the RDF4J server')
+    args = parser.parse_args(argv)
+
+    auth = HTTPBasicAuth(args.user, args.password) if args.user else None
+    unknown = [name for name in args.cases if name not in CASES]
+    if unknown:
+        parser.error('unknown cases {}'.format(', '.join(unknown)))
+    report = run(args.cases, repeat=args.repeat, warmup=args.warmup, scale=args.scale,
+                 rdf4j_base=args.server, auth=auth)
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=2)
+            output.write('\n')
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+        if baseline.get('parameters', {}).get('scale') != report['parameters']['scale']:
+            print('warning: the baseline was run with another scale', file=sys.stderr)
+        rows = compare(baseline, report, threshold=args.threshold)
+        print('{:<30} {:>12} {:>12} {:>9}'.format('case', 'baseline ms', 'current ms', 'change'))
+        for name, old, new, change, regressed in rows:
+            print('{:<30} {:12.3f} {:12.3f} {:+8.1%}{}'.format(
+                name, old * 1000, new * 1000, change, '  REGRESSION' if regressed else ''))
+        if any(row[-1] for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,421 @@
+"""
+In-process stand-in for the parts of the RDF4J REST API used by pyrdf4j:
+repositories, transactions, statements, contexts and a small subset of
+SPARQL (one triple pattern with LIMIT/OFFSET, CLEAR and DROP updates).
+Statements are kept in memory as tuples of N-Triples terms. It is no
+triplestore, but answers fast and alike from run to run, so benchmarks
+measure the overhead of the client rather than that of a server.
+
+    server, base = start()
+    rdf4j = RDF4J(base)
+    ...
+    server.shutdown()
+"""
+import gzip
+import io
+import json
+import re
+import struct
+import threading
+import itertools
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs, unquote
+
+from pyrdf4j.binary_rdf import iter_binary_rdf, iter_binary_rdf_statements
+from pyrdf4j.results import unescape
+
+TERM_PATTERN = re.compile(r'\s*(<[^>]*>|_:\S+|"(?:[^"\\]|\\.)*"(?:@[A-Za-z0-9-]+|\^\^<[^>]*>)?)')
+RDF_TYPE = '<http://www.w3.org/1999/02/22-rdf-syntax-ns#type>'
+QUERY_PATTERN = re.compile(r'(SELECT|CONSTRUCT|ASK)(.*?)WHERE\s*\{(.*)\}', re.I | re.S)
+CLEAR_PATTERN = re.compile(r'\s*(?:CLEAR|DROP)\s+(?:SILENT\s+)?(ALL|DEFAULT|GRAPH\s+(<[^>]*>))', re.I)
+
+
+def parse_line(line):
+    """Terms of a N-Triples or N-Quads line, the context is None for triples"""
+    line = line.strip()
+    if not line or line.startswith('#'):
+        return None
+    terms = []
+    position = 0
+    while True:
+        match = TERM_PATTERN.match(line, position)
+        if not match:
+            break
+        terms.append(match.group(1))
+        position = match.end()
+    if len(terms) == 3:
+        terms.append(None)
+    return tuple(terms)
+
+
+def parse_data(data, content_type):
+    if 'binary-rdf' in (content_type or ''):
+        return [tuple(from_json(term) for term in statement)
+                for statement in iter_binary_rdf_statements(io.BytesIO(data))]
+    return [quad for quad in (parse_line(line) for line in data.decode('utf8').splitlines()) if quad]
+
+
+def to_json(term):
+    if term.startswith('<'):
+        return {'type': 'uri', 'value': term[1:-1]}
+    if term.startswith('_:'):
+        return {'type': 'bnode', 'value': term[2:]}
+    end = term.rindex('"')
+    result = {'type': 'literal', 'value': unescape(term[1:end])}
+    if term[end + 1:].startswith('@'):
+        result['xml:lang'] = term[end + 2:]
+    elif term[end + 1:].startswith('^^'):
+        result['datatype'] = term[end + 4:-1]
+    return result
+
+
+def escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n').replace('\r', '\\r') \
+        .replace('\t', '\\t')
+
+
+def from_json(term):
+    if term is None:
+        return None
+    if term['type'] == 'uri':
+        return '<{}>'.format(term['value'])
+    if term['type'] == 'bnode':
+        return '_:' + term['value']
+    literal = '"{}"'.format(escape(term['value']))
+    if 'xml:lang' in term:
+        return literal + '@' + term['xml:lang']
+    if term.get('datatype'):
+        return literal + '^^<{}>'.format(term['datatype'])
+    return literal
+
+
+def serialize(statements):
+    return ''.join(' '.join(term for term in statement if term) + ' .\n' for statement in statements)
+
+
+def serialize_binary(statements):
+    return b''.join(iter_binary_rdf(
+        [tuple(to_json(term) if term else None for term in statement) for statement in statements]))
+
+
+def _string(value):
+    data = value.encode('utf8')
+    return struct.pack('>i', len(data)) + data
+
+
+def serialize_binary_table(names, rows):
+    """The rows in the binary results table format of RDF4J"""
+    out = [b'BRTR', struct.pack('>ii', 4, len(names))] + [_string(name) for name in names]
+    namespaces = {}
+    previous = [None] * len(names)
+    for row in rows:
+        current = [row.get(name) for name in names]
+        for term, last in zip(current, previous):
+            if term is None:
+                out.append(b'\x00')
+            elif term == last:
+                out.append(b'\x01')
+            else:
+                value = to_json(term)
+                if value['type'] == 'uri':
+                    namespace, _, local = value['value'].rpartition('/')
+                    namespace += '/'
+                    if namespace not in namespaces:
+                        namespaces[namespace] = len(namespaces)
+                        out.append(b'\x02' + struct.pack('>i', namespaces[namespace]) + _string(namespace))
+                    out.append(b'\x03' + struct.pack('>i', namespaces[namespace]) + _string(local))
+                elif value['type'] == 'bnode':
+                    out.append(b'\x05' + _string(value['value']))
+                elif 'xml:lang' in value:
+                    out.append(b'\x07' + _string(value['value']) + _string(value['xml:lang']))
+                elif 'datatype' in value:
+                    out.append(b'\x08' + _string(value['value']) + b'\x04' + _string(value['datatype']))
+                else:
+                    out.append(b'\x06' + _string(value['value']))
+        previous = current
+    out.append(b'\x7f')
+    return b''.join(out)
+
+
+def match_pattern(statements, pattern):
+    """Bindings of the variables of a triple pattern, in a stable order"""
+    rows = []
+    for statement in sorted(statements, key=lambda terms: tuple(term or '' for term in terms)):
+        row = {}
+        for part, term in zip(pattern, statement[:3]):
+            if part.startswith('?'):
+                if row.setdefault(part[1:], term) != term:
+                    break
+            elif part != term:
+                break
+        else:
+            rows.append(row)
+    return rows
+
+
+def clear(statements, target, graph):
+    if target == 'ALL':
+        return set()
+    if target == 'DEFAULT':
+        return {statement for statement in statements if statement[3] is not None}
+    return {statement for statement in statements if statement[3] != graph}
+
+
+class Repository:
+
+    def __init__(self, config):
+        self.config = config
+        self.statements = set()
+        self.lock = threading.Lock()
+
+
+class State:
+    """The repositories and open transactions of a stand-in server"""
+
+    def __init__(self):
+        self.repositories = {}
+        self.transactions = {}
+        self.counter = itertools.count(1)
+        self.lock = threading.Lock()
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    state = None
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.route('GET')
+
+    def do_POST(self):
+        self.route('POST')
+
+    def do_PUT(self):
+        self.route('PUT')
+
+    def do_DELETE(self):
+        self.route('DELETE')
+
+    def read_body(self):
+        if self.headers.get('Transfer-Encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int(self.rfile.readline().strip(), 16)
+                if size == 0:
+                    self.rfile.readline()
+                    break
+                chunks.append(self.rfile.read(size))
+                self.rfile.readline()
+            data = b''.join(chunks)
+        else:
+            data = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        if self.headers.get('Content-Encoding') == 'gzip':
+            data = gzip.decompress(data)
+        return data
+
+    def reply(self, status, body=b'', content_type='text/plain', headers=None):
+        if isinstance(body, str):
+            body = body.encode('utf8')
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if body and 'gzip' in self.headers.get('Accept-Encoding', ''):
+            body = gzip.compress(body, 1)
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def contexts(self):
+        if 'context' not in self.params:
+            return None
+        return [None if context == 'null' else context for context in self.params['context']]
+
+    def route(self, method):
+        url = urlparse(self.path)
+        self.params = parse_qs(url.query, keep_blank_values=True)
+        segments = [unquote(segment) for segment in url.path.strip('/').split('/')]
+        data = self.read_body()
+        state = self.state
+
+        if segments == ['protocol']:
+            return self.reply(HTTPStatus.OK, '12')
+        if segments == ['repositories'] and method == 'GET':
+            rows = [{'id': {'type': 'literal', 'value': repo_id}} for repo_id in list(state.repositories)]
+            return self.reply(HTTPStatus.OK, json.dumps({'head': {'vars': ['id']}, 'results': {'bindings': rows}}),
+                              'application/sparql-results+json')
+        if len(segments) < 2 or segments[0] != 'repositories':
+            return self.reply(HTTPStatus.NOT_FOUND)
+
+        repo_id, rest = segments[1], segments[2:]
+        if not rest and method == 'PUT':
+            with state.lock:
+                if repo_id in state.repositories:
+                    return self.reply(HTTPStatus.CONFLICT, 'REPOSITORY EXISTS')
+                state.repositories[repo_id] = Repository(data.decode('utf8'))
+            return self.reply(HTTPStatus.NO_CONTENT)
+        if not rest and method == 'DELETE':
+            with state.lock:
+                if state.repositories.pop(repo_id, None) is None:
+                    return self.reply(HTTPStatus.NOT_FOUND)
+            return self.reply(HTTPStatus.NO_CONTENT)
+
+        repository = state.repositories.get(repo_id)
+        if repository is None:
+            return self.reply(HTTPStatus.NOT_FOUND, 'Unknown repository: ' + repo_id)
+        if not rest:
+            query = data.decode('utf8') if method == 'POST' else self.params['query'][0]
+            return self.query(repository.statements, query)
+        if rest == ['config']:
+            return self.reply(HTTPStatus.OK, repository.config, 'text/turtle')
+        if rest == ['size']:
+            return self.reply(HTTPStatus.OK, str(len(repository.statements)))
+        if rest == ['contexts']:
+            rows = [{'contextID': to_json(context)}
+                    for context in sorted({statement[3] for statement in repository.statements if statement[3]})]
+            return self.reply(HTTPStatus.OK,
+                              json.dumps({'head': {'vars': ['contextID']}, 'results': {'bindings': rows}}),
+                              'application/sparql-results+json')
+        if rest == ['statements']:
+            return self.statements(method, repository, data)
+        if rest == ['transactions'] and method == 'POST':
+            transaction_id = str(next(state.counter))
+            state.transactions[transaction_id] = []
+            location = 'http://{}:{}/repositories/{}/transactions/{}'.format(
+                *self.server.server_address, repo_id, transaction_id)
+            return self.reply(HTTPStatus.CREATED, headers={'Location': location})
+        if len(rest) == 2 and rest[0] == 'transactions':
+            return self.transaction(method, rest[1], repository, data)
+        return self.reply(HTTPStatus.NOT_FOUND)
+
+    def statements(self, method, repository, data):
+        contexts = self.contexts()
+        if method == 'GET':
+            statements = [statement for statement in repository.statements
+                          if contexts is None or statement[3] in contexts]
+            if 'binary-rdf' in self.headers.get('Accept', ''):
+                return self.reply(HTTPStatus.OK, serialize_binary(statements), 'application/x-binary-rdf')
+            return self.reply(HTTPStatus.OK, serialize(statements), 'application/n-quads')
+        quads = parse_data(data, self.headers.get('Content-Type'))
+        with repository.lock:
+            if method in ('PUT', 'DELETE'):
+                repository.statements = {statement for statement in repository.statements
+                                         if not (contexts is None or statement[3] in contexts)}
+            if method in ('PUT', 'POST'):
+                default = contexts[0] if contexts else None
+                repository.statements.update(quad[:3] + (quad[3] or default,) for quad in quads)
+        return self.reply(HTTPStatus.NO_CONTENT)
+
+    def transaction(self, method, transaction_id, repository, data):
+        """
+        Operations of a transaction are queued as functions of the set of
+        statements and applied on commit.
+        """
+        operations = self.state.transactions.get(transaction_id)
+        if operations is None:
+            return self.reply(HTTPStatus.NOT_FOUND, 'unknown transaction')
+        if method == 'DELETE':
+            del self.state.transactions[transaction_id]
+            return self.reply(HTTPStatus.NO_CONTENT)
+
+        action = self.params.get('action', [''])[0]
+        if action == 'COMMIT':
+            with repository.lock:
+                statements = repository.statements
+                for operation in operations:
+                    statements = operation(statements)
+                repository.statements = statements
+            del self.state.transactions[transaction_id]
+            return self.reply(HTTPStatus.OK)
+
+        contexts = self.contexts()
+        if action == 'ADD':
+            default = contexts[0] if contexts else None
+            quads = {quad[:3] + (quad[3] or default,) for quad in parse_data(data, self.headers.get('Content-Type'))}
+            operations.append(lambda statements: statements | quads)
+            return self.reply(HTTPStatus.OK)
+        if action == 'DELETE':
+            quads = parse_data(data, self.headers.get('Content-Type'))
+            exact = {quad[:3] + (contexts[0],) for quad in quads} if contexts else None
+            triples = {quad[:3] for quad in quads}
+            if exact is not None:
+                operations.append(lambda statements: statements - exact)
+            else:
+                operations.append(lambda statements: {statement for statement in statements
+                                                      if statement[:3] not in triples})
+            return self.reply(HTTPStatus.OK)
+        if action == 'UPDATE':
+            update = self.params.get('update', [data.decode('utf8')])[0]
+            match = CLEAR_PATTERN.match(update)
+            if not match:
+                return self.reply(HTTPStatus.BAD_REQUEST, 'unsupported update')
+            target = match.group(1).split()[0].upper()
+            operations.append(lambda statements: clear(statements, target, match.group(2)))
+            return self.reply(HTTPStatus.OK)
+        if action in ('QUERY', 'SIZE'):
+            statements = repository.statements
+            for operation in operations:
+                statements = operation(statements)
+            if action == 'SIZE':
+                return self.reply(HTTPStatus.OK, str(len(statements)))
+            return self.query(statements, self.params.get('query', [data.decode('utf8')])[0])
+        return self.reply(HTTPStatus.BAD_REQUEST, 'unsupported action')
+
+    def query(self, statements, query):
+        match = QUERY_PATTERN.search(query)
+        if not match:
+            return self.reply(HTTPStatus.BAD_REQUEST, 'MALFORMED QUERY')
+        kind, projection, body = match.group(1).upper(), match.group(2), match.group(3)
+        pattern = re.findall(r'(\?\w+|<[^>]*>|"(?:[^"\\]|\\.)*"|a\b)', body)[:3]
+        pattern = [RDF_TYPE if part == 'a' else part for part in pattern]
+        rows = match_pattern(statements, pattern)
+
+        modifiers = query[match.end():]
+        offset = re.search(r'OFFSET\s+(\d+)', modifiers, re.I)
+        limit = re.search(r'LIMIT\s+(\d+)', modifiers, re.I)
+        if offset:
+            rows = rows[int(offset.group(1)):]
+        if limit:
+            rows = rows[:int(limit.group(1))]
+
+        accept = self.headers.get('Accept', '')
+        if kind == 'ASK':
+            return self.reply(HTTPStatus.OK, json.dumps({'head': {}, 'boolean': bool(rows)}),
+                              'application/sparql-results+json')
+        if kind == 'CONSTRUCT':
+            template = re.findall(r'(\?\w+|<[^>]*>)', projection)[:3]
+            constructed = {tuple(row.get(part[1:]) if part.startswith('?') else part for part in template) + (None,)
+                           for row in rows}
+            if 'binary-rdf' in accept:
+                return self.reply(HTTPStatus.OK, serialize_binary(constructed), 'application/x-binary-rdf')
+            return self.reply(HTTPStatus.OK, serialize(constructed), 'application/n-triples')
+
+        names = re.findall(r'\?(\w+)', projection) or [part[1:] for part in pattern if part.startswith('?')]
+        if 'binary-rdf-results-table' in accept:
+            return self.reply(HTTPStatus.OK, serialize_binary_table(names, rows),
+                              'application/x-binary-rdf-results-table')
+        if 'tab-separated' in accept:
+            lines = ['\t'.join('?' + name for name in names)]
+            lines.extend('\t'.join(row.get(name) or '' for name in names) for row in rows)
+            return self.reply(HTTPStatus.OK, '\n'.join(lines) + '\n', 'text/tab-separated-values')
+        bindings = [{name: to_json(row[name]) for name in names if row.get(name)} for row in rows]
+        return self.reply(HTTPStatus.OK, json.dumps({'head': {'vars': names}, 'results': {'bindings': bindings}}),
+                          'application/sparql-results+json')
+
+
+def start(port=0, address='127.0.0.1'):
+    """
+    Serves a fresh stand-in from a daemon thread
+    :param port: (optional) Port to listen on, a free one by default
+    :return: Tuple of the HTTP server, stop it by shutdown(), and its base URI
+    """
+    handler = type('StandInHandler', (Handler,), {'state': State()})
+    server = ThreadingHTTPServer((address, port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, 'http://{}:{}/'.format(address, server.server_address[1])
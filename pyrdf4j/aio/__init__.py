@@ -0,0 +1,10 @@
+"""
+Asyncio counterpart of the pyrdf4j API. Requires aiohttp.
+"""
+from pyrdf4j.aio.api_graph import AsyncAPIGraph
+from pyrdf4j.aio.api_repo import AsyncAPIRepo
+from pyrdf4j.aio.rdf4j import AsyncRDF4J
+from pyrdf4j.aio.server import AsyncServer
+from pyrdf4j.aio.transaction import AsyncRepositoryTransaction
+
+__all__ = ['AsyncRDF4J', 'AsyncAPIRepo', 'AsyncAPIGraph', 'AsyncServer', 'AsyncRepositoryTransaction']
@@ -0,0 +1,194 @@
+import json
+from contextlib import asynccontextmanager
+from http import HTTPStatus
+
+from pyrdf4j.aio.transaction import AsyncRepositoryTransaction
+from pyrdf4j.api_base import APIBase
+from pyrdf4j.constants import DEFAULT_QUERY_RESPONSE_MIME_TYPE, \
+    DEFAULT_QUERY_MIME_TYPE, \
+    DEFAULT_CHARSET, \
+    BINARY_RDF_MIME_TYPE
+from pyrdf4j.errors import QueryFailed, TerminatingError
+from pyrdf4j.util import encode_context
+
+
+class AsyncAPIBase(APIBase):
+    """
+    Asynchronous counterpart of APIBase. The URI translation is inherited,
+    all operations on the server are coroutines.
+    """
+
+    def transaction(self, auth=None):
+        """
+        A transaction kept open across several operations.
+        Use it as async context manager to commit on exit and roll back on exceptions.
+        :return: AsyncRepositoryTransaction
+        """
+        return AsyncRepositoryTransaction(self, auth=auth)
+
+    @classmethod
+    async def create(cls, server, repo_id, repo_config, repo_uri=None, auth=None):
+        api = cls(server, repo_id, repo_uri=repo_uri)
+        response = await api.create_repository(repo_config, auth=auth)
+        return api, response
+
+    async def create_repository(self, repo_config, auth=None, charset=None):
+        """
+        Creates a repository in rdf4j
+        :param repo_config: Configuration of the repository as TTL resource
+        :param auth: Optional user credential in form of a HTTPBasicAuth instance (testing only)
+        :return: the response from the Server server
+        """
+
+        if charset is None:
+            charset = DEFAULT_CHARSET
+
+        headers = {'content-type': 'application/x-turtle; charset=' + charset}
+        response = await self.server.put(
+            self.repo_uri,
+            headers=headers,
+            data=repo_config,
+            auth=auth,
+        )
+        if response.status_code == HTTPStatus.NO_CONTENT:
+            self.config = repo_config
+        return response
+
+    async def drop_repository(self, auth=None, charset=None):
+        """
+        Drops a repository
+        :param auth: (optional) authentication Instance
+        :return: the response from the triple store
+        """
+        if charset is None:
+            charset = DEFAULT_CHARSET
+
+        headers = {'content-type': 'application/x-turtle; charset=' + charset}
+        response = await self.server.delete(
+            self.repo_uri,
+            headers=headers,
+            auth=auth,
+        )
+        if response.status_code == HTTPStatus.NO_CONTENT:
+            self.config = None
+
+        return response
+
+    async def empty_repository(self, auth=None, contexts=None, reset=False):
+        """
+        Removes the statements of the repository by a DELETE on its statements endpoint
+        :param contexts: (optional) Only clear these contexts.
+            None in the list denotes the default graph. An empty list
+            clears nothing, no request is sent and None is returned.
+        :param reset: (optional) Drop and re-create the repository from its configuration instead
+        :return: the response from the triple store, None for an empty list of contexts
+        :raises: TerminatingError if the statements cannot be removed
+        """
+        if reset:
+            return await self.reset_repository(auth=auth)
+
+        params = []
+        if contexts is not None:
+            if not contexts:
+                # No context to clear. Sending the DELETE without a
+                # context parameter would clear the whole repository.
+                return None
+            params = [('context', encode_context(context)) for context in contexts]
+
+        response = await self.server.delete(self.repo_uri + '/statements', params=params, auth=auth)
+        if response.status_code != HTTPStatus.NO_CONTENT:
+            raise TerminatingError(response.content)
+        return response
+
+    async def get_contexts(self, auth=None):
+        """
+        Lists the contexts (named graphs) of the repository
+        :return: List of the context IRIs, blank nodes as '_:' prefixed IDs
+        """
+        headers = {'Accept': DEFAULT_QUERY_RESPONSE_MIME_TYPE}
+        response = await self.server.get(self.repo_uri + '/contexts', headers=headers, auth=auth)
+        if response.status_code not in [HTTPStatus.OK]:
+            raise QueryFailed(response.content)
+        contexts = []
+        for binding in json.loads(response.content)['results']['bindings']:
+            context = binding['contextID']
+            if context['type'] == 'bnode':
+                contexts.append('_:' + context['value'])
+            else:
+                contexts.append(context['value'])
+        return contexts
+
+    @asynccontextmanager
+    async def stream_statements(self, mime_type=None, auth=None, contexts=None):
+        """
+        Async context of the response to a request of the statements of the
+        repository, so they can be consumed incrementally from response.content.
+        :param mime_type: (optional) RDF format of the statements, binary RDF by default
+        :param contexts: (optional) Restrict the statements to these contexts.
+            None in the list denotes the default graph.
+        :raises: QueryFailed if the statements cannot be fetched
+        """
+        if mime_type is None:
+            mime_type = BINARY_RDF_MIME_TYPE
+
+        params = []
+        if contexts is not None:
+            params = [('context', encode_context(context)) for context in contexts]
+
+        async with self.server.stream('GET', self.repo_uri + '/statements', params=params,
+                                      headers={'Accept': mime_type}, auth=auth) as response:
+            if response.status != HTTPStatus.OK:
+                raise QueryFailed(str(response.url))
+            yield response
+
+    async def get_config(self, auth=None, refresh=False):
+        """
+        :param refresh: (optional) Fetch the configuration even if it is cached
+        :return: Configuration of the repository as TTL resource
+        :raises: QueryFailed if the configuration cannot be fetched
+        """
+        if self.config is not None and not refresh:
+            return self.config
+        config = self.repo_uri + '/config'
+        headers = {'content-type': 'application/x-turtle; charset=' + DEFAULT_CHARSET}
+        response = await self.server.get(config, auth=auth, headers=headers)
+        if response.status_code != HTTPStatus.OK:
+            raise QueryFailed(response.content)
+        self.config = response.content.decode('utf8')
+        return self.config
+
+    async def reset_repository(self, auth=None):
+        """
+        Drops the repository and re-creates it with the same (cached) configuration
+        :return: the response to the creation
+        """
+        config = await self.get_config(auth=auth)
+        await self.drop_repository(auth=auth)
+        return await self.create_repository(config, auth=auth)
+
+    async def query_repository(self, query, query_type=None, mime_type=None, auth=None, charset=None):
+
+        if charset is None:
+            charset = DEFAULT_CHARSET
+
+        if query_type is None:
+            query_type = DEFAULT_QUERY_MIME_TYPE
+
+        if mime_type is None:
+            mime_type = DEFAULT_QUERY_RESPONSE_MIME_TYPE
+
+        headers = {
+            'Accept': mime_type,
+            'content-type': query_type + '; charset=' + charset,
+        }
+
+        response = await self.server.post(
+            self.repo_uri,
+            data=query,
+            headers=headers,
+            auth=auth,
+        )
+        if response.status_code in [HTTPStatus.OK]:
+            return response.content
+        else:
+            raise QueryFailed(query)
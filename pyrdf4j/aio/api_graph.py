@@ -0,0 +1,56 @@
+from http import HTTPStatus
+
+from pyrdf4j.aio.api_base import AsyncAPIBase
+from pyrdf4j.api_graph import APIGraph
+from pyrdf4j.constants import DEFAULT_CHARSET
+from pyrdf4j.errors import TerminatingError
+from pyrdf4j.util import encode_context
+
+
+class AsyncAPIGraph(AsyncAPIBase):
+
+    repo_id_to_uri = APIGraph.repo_id_to_uri
+
+    async def replace_triple_data_in_repo(self, triple_data, content_type, auth=None, charset=None, base_uri=None,
+                                          context=None):
+
+        if charset is None:
+            charset = DEFAULT_CHARSET
+
+        # PUT replaces all statements, or those of the context, in a single server side transaction
+        params = {}
+        if context is not None:
+            params['context'] = encode_context(context)
+        headers = {'Content-Type': content_type + '; charset=' + charset}
+
+        response = await self.server.put(
+            self.uri,
+            params=params,
+            data=triple_data,
+            headers=headers,
+            auth=auth,
+        )
+        if response.status_code != HTTPStatus.NO_CONTENT:
+            raise TerminatingError(response.content)
+
+        return response
+
+    async def add_triple_data_to_repo(self, triple_data, content_type, auth=None, charset=None, base_uri=None,
+                                      context=None):
+        if charset is None:
+            charset = DEFAULT_CHARSET
+        params = {}
+        if context is not None:
+            params['context'] = encode_context(context)
+        headers = {'Content-Type': content_type + '; charset=' + charset}
+        response = await self.server.post(
+            self.uri,
+            params=params,
+            data=triple_data,
+            headers=headers,
+            auth=auth,
+        )
+        if response.status_code != HTTPStatus.NO_CONTENT:
+            raise TerminatingError(response.content)
+
+        return response
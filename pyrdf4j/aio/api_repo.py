@@ -0,0 +1,37 @@
+from pyrdf4j.aio.api_base import AsyncAPIBase
+from pyrdf4j.errors import TerminatingError
+from pyrdf4j.util import encode_context
+
+
+class AsyncAPIRepo(AsyncAPIBase):
+
+    async def add_triple_data_to_repo(self, triple_data, content_type, auth=None, charset=None, base_uri=None,
+                                      context=None):
+        async with self.transaction(auth=auth) as transaction:
+            response = await transaction.add(
+                triple_data, content_type, charset=charset, base_uri=base_uri, context=context)
+
+        return response
+
+    async def replace_triple_data_in_repo(self, triple_data, content_type, auth=None, charset=None, base_uri=None,
+                                          context=None):
+        """
+        Replaces all statements of the repository by the triple_data in one
+        transaction. Readers keep seeing the old statements until the commit.
+        :param context: (optional) IRI of a named graph. Only this graph is
+            cleared and the triple_data is added to it.
+        """
+        if context is None:
+            update = 'CLEAR ALL'
+        else:
+            graph = encode_context(context)
+            if not graph.startswith('<'):
+                raise TerminatingError('Only named graphs can be replaced: ' + graph)
+            update = 'CLEAR SILENT GRAPH ' + graph
+
+        async with self.transaction(auth=auth) as transaction:
+            await transaction.update(update, charset=charset)
+            response = await transaction.add(
+                triple_data, content_type, charset=charset, base_uri=base_uri, context=context)
+
+        return response
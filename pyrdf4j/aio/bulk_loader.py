@@ -0,0 +1,67 @@
+"""
+Asynchronous bulk loading of line based RDF formats (N-Triples, N-Quads)
+"""
+import asyncio
+import time
+
+from pyrdf4j.bulk_loader import BulkLoader
+from pyrdf4j.errors import BulkLoadError
+
+
+class AsyncBulkLoader(BulkLoader):
+    """
+    Asynchronous counterpart of BulkLoader. The batches are committed
+    by concurrent tasks instead of a thread pool.
+    """
+
+    async def load_batch(self, statements, triple_data):
+        """Commits a single batch in a transaction of its own"""
+        api = self.rdf4j.get_api(self.repo_id, repo_uri=self.repo_uri)
+        start = time.monotonic()
+        try:
+            await api.add_triple_data_to_repo(triple_data, self.content_type, auth=self.auth)
+        except Exception as e:
+            self.statistics.errors.append(e)
+            return
+        commit_seconds = time.monotonic() - start
+        self.statistics.batches += 1
+        self.statistics.triples += statements
+        self.statistics.bytes += len(triple_data)
+        self.statistics.commit_seconds += commit_seconds
+        self.adapt(commit_seconds)
+
+    async def load(self, lines):
+        """
+        Loads the lines into the repository.
+        :param lines: Iterable of lines, e.g. a file opened in binary mode
+        :return: LoadStatistics
+        :raises: BulkLoadError if a batch could not be committed
+        """
+        # Limit the batches held in memory to two per worker
+        slots = asyncio.BoundedSemaphore(self.workers * 2)
+        workers = asyncio.Semaphore(self.workers)
+        tasks = set()
+
+        async def run(statements, triple_data):
+            try:
+                async with workers:
+                    await self.load_batch(statements, triple_data)
+            finally:
+                slots.release()
+
+        start = time.monotonic()
+        for statements, triple_data in self.iter_batches(lines):
+            await slots.acquire()
+            if self.statistics.errors:
+                slots.release()
+                break
+            task = asyncio.ensure_future(run(statements, triple_data))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks)
+        self.statistics.seconds = time.monotonic() - start
+
+        if self.statistics.errors:
+            raise BulkLoadError(self.statistics)
+        return self.statistics
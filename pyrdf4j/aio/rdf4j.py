@@ -0,0 +1,405 @@
+import asyncio
+import json
+from http import HTTPStatus
+
+import aiohttp
+
+from pyrdf4j.aio.api_repo import AsyncAPIRepo
+from pyrdf4j.aio.bulk_loader import AsyncBulkLoader
+from pyrdf4j.aio.server import AsyncServer
+from pyrdf4j.constants import DEFAULT_RESPONSE_TRIPLE_MIME_TYPE, DEFAULT_CHUNK_SIZE, \
+    DEFAULT_BULK_LOAD_WORKERS, DEFAULT_BATCH_SIZE, BINARY_RDF_MIME_TYPE, DEFAULT_COPY_WORKERS
+from pyrdf4j.errors import URINotReachable, CreateRepositoryAlreadyExists, CreateRepositoryError, \
+    DropRepositoryError
+from pyrdf4j.repo_types import repo_config_factory
+from pyrdf4j.util import is_gzip_source, iter_gunzip, aiter_gunzip
+
+
+class AsyncRDF4J:
+    """
+    High level asyncio API to the RDF4J.
+    Offers the methods of RDF4J as coroutines.
+    """
+
+    def __init__(self, rdf4j_base=None, api=AsyncAPIRepo, auth=None, **server_params):
+        """
+        :param rdf4j_base: (optional) Base URI of the RDF4J server
+        :param api: (optional) API class used to access the repositories
+        :param auth: (optional) Default credentials for all requests to the server
+        :param server_params: (optional) Connection pool parameters passed on to the AsyncServer
+        """
+
+        self.server = AsyncServer(rdf4j_base, auth=auth, **server_params)
+        self.api_class = api
+        self.apis = {}
+
+    async def close(self):
+        """Close all pooled connections"""
+        await self.server.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, exc_traceback):
+        await self.close()
+
+    def get_api(self, repo_id, repo_uri=None):
+        if repo_id in self.apis:
+            pass
+        else:
+            self.apis[repo_id] = self.api_class(self.server, repo_id, repo_uri=repo_uri)
+        return self.apis[repo_id]
+
+    def transaction(self, repo_id, auth=None, repo_uri=None):
+        """
+        Groups many add, delete, update and query operations on the
+        repository into one transaction:
+
+            async with rdf4j.transaction('repo', auth=auth) as transaction:
+                await transaction.add(triple_data, 'text/turtle')
+                await transaction.update('DELETE WHERE {?s <http://example.org/p> ?o}')
+
+        The transaction is committed on exit and rolled back on exceptions.
+        :param repo_id: ID of the repository
+        :return: AsyncRepositoryTransaction
+        """
+        api = self.get_api(repo_id, repo_uri=repo_uri)
+        return api.transaction(auth=auth)
+
+    async def bulk_load_from_uri(
+            self,
+            repo_id,
+            target_uri,
+            content_type,
+            clear_repository=False,
+            repo_uri=None,
+            auth=None,
+            base_uri=None,
+            stream=False,
+            gunzip=None,
+            chunk_size=DEFAULT_CHUNK_SIZE,
+            context=None,
+    ):
+        """
+        Load the triple_data from the harvest uri
+        and push it into the triplestore
+        :param repo_id:
+        :param target_uri:
+        :param content_type:
+        :param stream: (optional) If enabled the triple_data is not buffered
+            but passed chunk by chunk from the harvest uri to the triplestore
+        :param gunzip: (optional) Decompress a gzip source on the fly.
+            If None, gzip sources are detected by media type or '.gz' suffix
+        :param chunk_size: (optional) Size of the chunks in streaming mode
+        :param context: (optional) IRI of the named graph to load into.
+            Together with clear_repository only this graph is replaced.
+        :return:
+        """
+        api = self.get_api(repo_id, repo_uri=repo_uri)
+        if clear_repository:
+            load = api.replace_triple_data_in_repo
+        else:
+            load = api.add_triple_data_to_repo
+
+        # The harvest source gets a session of its own, so the
+        # credentials of the triplestore are never sent to it.
+        async with aiohttp.ClientSession() as session:
+            try:
+                response = await session.get(target_uri)
+            except aiohttp.ClientConnectionError:
+                raise URINotReachable(
+                    'Database not reachable. Tried GET on {uri}'.format(uri=target_uri))
+            async with response:
+                if response.status != HTTPStatus.OK:
+                    raise URINotReachable(await response.read())
+
+                if gunzip is None:
+                    gunzip = is_gzip_source(target_uri, response)
+
+                if stream:
+                    # An async generator as request body is send chunked
+                    triple_data = response.content.iter_chunked(chunk_size)
+                    if gunzip:
+                        triple_data = aiter_gunzip(triple_data)
+                else:
+                    triple_data = await response.read()
+                    if gunzip:
+                        triple_data = b''.join(iter_gunzip([triple_data]))
+
+                return await load(triple_data, content_type, auth=auth, base_uri=base_uri, context=context)
+
+    async def bulk_load(
+            self,
+            repo_id,
+            lines,
+            content_type='application/n-triples',
+            repo_uri=None,
+            auth=None,
+            workers=DEFAULT_BULK_LOAD_WORKERS,
+            batch_size=DEFAULT_BATCH_SIZE,
+            **kwargs,
+    ):
+        """
+        Load N-Triples or N-Quads in size bounded batches,
+        each committed in its own transaction by concurrent tasks.
+        :param repo_id: ID of the repository to load into
+        :param lines: Iterable of lines, e.g. a file opened in binary mode
+        :param content_type: (optional) A line based RDF media type
+        :param workers: (optional) Number of batches committed concurrently
+        :param batch_size: (optional) Initial batch size in bytes
+        :param kwargs: (optional) Further parameters of the BulkLoader
+        :return: LoadStatistics with the aggregated throughput
+        :raises: BulkLoadError if a batch could not be committed
+        """
+        loader = AsyncBulkLoader(
+            self,
+            repo_id,
+            content_type=content_type,
+            repo_uri=repo_uri,
+            auth=auth,
+            workers=workers,
+            batch_size=batch_size,
+            **kwargs
+        )
+        return await loader.load(lines)
+
+    async def graph_from_uri(self,
+                             repository_id,
+                             target_uri,
+                             content_type,
+                             repo_type='memory',
+                             repo_label=None,
+                             auth=None,
+                             overwrite=False,
+                             accept_existing=True,
+                             clear_repository=False,
+                             stream=False,
+                             gunzip=None,
+                             **kwargs):
+        """
+        :param repository_id:
+        :param uri:
+        :param content_type:
+        :param clear_repository:
+        :param stream: (optional) Pass the triple_data through without buffering it
+        :param gunzip: (optional) Decompress a gzip source on the fly
+        :return:
+        """
+        await self.create_repository(repository_id, accept_existing=accept_existing, repo_type=repo_type,
+                                     repo_label=repo_label, auth=auth, overwrite=overwrite, **kwargs)
+        response = await self.bulk_load_from_uri(
+            repository_id, target_uri, content_type, clear_repository=clear_repository, auth=auth,
+            stream=stream, gunzip=gunzip)
+        return response
+
+    async def create_repository(self,
+                                repo_id,
+                                repo_type='memory',
+                                repo_label=None,
+                                auth=None,
+                                overwrite=False,
+                                accept_existing=False,
+                                **kwargs):
+        """
+        :param repo_id: ID of the repository to create
+        :param repo_type: (Optional) Configuration template
+            type name of the server (see repo_types.py)
+        :param repo_label: (Optional) Label for the repository
+        :param auth: (Optional) user credentials for authentication
+        :param overwrite: (Optional) If overwrite is enabled an existing
+            server will be overwritten (testing only). Use with care!
+        :param kwargs: Parameters for the Configuration template
+        :return:
+        """
+        if repo_label is None:
+            repo_label = repo_id
+
+        repo_config = repo_config_factory(
+            repo_type,
+            repo_id=repo_id,
+            repo_label=repo_label,
+            **kwargs)
+
+        api = self.get_api(repo_id)
+
+        response = await api.create_repository(repo_config, auth=auth)
+
+        if response.status_code in [HTTPStatus.NO_CONTENT]:
+            return response
+
+        msg = str(response.status_code) + ': ' + str(response.content)
+        if response.status_code != HTTPStatus.CONFLICT:
+            raise CreateRepositoryError(msg)
+
+        if overwrite:
+            await api.drop_repository(auth=auth)
+            await api.create_repository(repo_config, auth=auth)
+        elif not accept_existing:
+            raise CreateRepositoryAlreadyExists(msg)
+
+        return response
+
+    async def drop_repository(self, repo_id, accept_not_exist=False, auth=None):
+        """
+        :param repo_id: ID of the repository to drop
+        :return: response
+        :raises: DropRepositoryError if operation fails
+        """
+
+        api = self.get_api(repo_id)
+
+        response = await api.drop_repository(auth=auth)
+        if response.status_code in [HTTPStatus.NO_CONTENT]:
+            return response
+        elif response.status_code in [HTTPStatus.NOT_FOUND]:
+            if accept_not_exist:
+                return response
+        msg = str(response.status_code) + ': ' + str(response.content)
+        raise DropRepositoryError(msg)
+
+    async def move_data_between_repositorys(
+            self,
+            target_repository,
+            source_repository,
+            auth=None,
+            repo_type='memory'):
+        """
+        :param target_repository:
+        :param source_repository:
+        :param auth:
+        :return:
+        """
+        await self.create_repository(source_repository,
+                                     accept_existing=True,
+                                     auth=auth,
+                                     repo_type=repo_type)
+        await self.create_repository(target_repository,
+                                     accept_existing=True,
+                                     auth=auth,
+                                     repo_type=repo_type)
+
+        responses = await self.copy_repository(source_repository, target_repository, auth=auth)
+
+        return responses[0]
+
+    async def copy_statements(self, source_repository, target_repository, contexts=None, auth=None,
+                              chunk_size=DEFAULT_CHUNK_SIZE, target_rdf4j=None):
+        """
+        Streams statements from the source repository into a transaction
+        on the target repository, preserving their contexts. The statements
+        are passed through in binary RDF chunk by chunk, so memory use
+        does not depend on the size of the repository.
+        :param contexts: (optional) Restrict the copy to these contexts.
+            None in the list denotes the default graph.
+        :param target_rdf4j: (optional) AsyncRDF4J instance of another server
+            holding the target repository
+        :return: response of the target repository
+        """
+        if target_rdf4j is None:
+            target_rdf4j = self
+        api_source = self.get_api(source_repository)
+        api_target = target_rdf4j.get_api(target_repository)
+
+        async with api_source.stream_statements(mime_type=BINARY_RDF_MIME_TYPE, auth=auth,
+                                                contexts=contexts) as response:
+            return await api_target.add_triple_data_to_repo(
+                response.content.iter_chunked(chunk_size),
+                BINARY_RDF_MIME_TYPE,
+                auth=auth)
+
+    async def copy_repository(self, source_repository, target_repository, auth=None, per_context=False,
+                              workers=DEFAULT_COPY_WORKERS, target_rdf4j=None):
+        """
+        Copies all statements with their contexts from the source
+        into the target repository with bounded memory.
+        :param source_repository: ID of the repository to copy from
+        :param target_repository: ID of the repository to copy into
+        :param per_context: (optional) Copy every context in a transaction
+            of its own, running up to workers copies concurrently
+        :param workers: (optional) Number of contexts copied concurrently
+        :param target_rdf4j: (optional) AsyncRDF4J instance of another server
+            holding the target repository
+        :return: List of the responses of the target repository, one per transfer
+        """
+        if not per_context:
+            return [await self.copy_statements(source_repository, target_repository, auth=auth,
+                                               target_rdf4j=target_rdf4j)]
+
+        contexts = [None] + await self.get_api(source_repository).get_contexts(auth=auth)
+        semaphore = asyncio.Semaphore(workers)
+
+        async def copy(context):
+            async with semaphore:
+                return await self.copy_statements(source_repository, target_repository, contexts=[context],
+                                                  auth=auth, target_rdf4j=target_rdf4j)
+
+        return list(await asyncio.gather(*[copy(context) for context in contexts]))
+
+    async def get_turtle_from_query(self, repo_id, query, auth=None):
+        """
+        :param repository:
+        :param query:
+        :return:
+        """
+        mime_type = 'text/turtle'
+        triple_data = await self.get_triple_data_from_query(
+            repo_id,
+            query,
+            mime_type=mime_type,
+            auth=auth)
+        return triple_data
+
+    async def get_triple_data_from_query(
+            self,
+            repo_id,
+            query,
+            mime_type=None,
+            auth=None,
+            repo_uri=None):
+        """
+        :param repo_id:
+        :param query:
+        :param mime_type:
+        :return:
+        """
+        api = self.get_api(repo_id, repo_uri=repo_uri)
+
+        if mime_type is None:
+            mime_type = DEFAULT_RESPONSE_TRIPLE_MIME_TYPE
+
+        return await api.query_repository(query, mime_type=mime_type, auth=auth)
+
+    async def empty_repository(self, repository, auth=None, contexts=None, reset=False):
+        """
+        :param repository:
+        :param contexts: (optional) Only clear these contexts.
+            None in the list denotes the default graph. An empty list
+            clears nothing, no request is sent and None is returned.
+        :param reset: (optional) Drop and re-create the repository instead
+            of deleting its statements
+        :return:
+        """
+        api = self.get_api(repository)
+        return await api.empty_repository(auth=auth, contexts=contexts, reset=reset)
+
+    async def query_repository(self, repo_id, query, auth=None):
+        api = self.get_api(repo_id)
+
+        res = await api.query_repository(query, auth=auth)
+
+        json_data = json.loads(res)
+
+        return json_data
+
+    async def add_data_to_repo(
+            self,
+            repo_id,
+            triple_data,
+            content_type,
+            repo_uri=None,
+            auth=None,
+            context=None):
+
+        api = self.get_api(repo_id, repo_uri=repo_uri)
+
+        return await api.add_triple_data_to_repo(triple_data, content_type, auth=auth, context=context)
@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+"""Asynchronous RDF4J Rest-API access"""
+import base64
+import sys
+import traceback
+from contextlib import asynccontextmanager
+from http import HTTPStatus
+
+import aiohttp
+
+from pyrdf4j.constants import RDF4J_BASE, DEFAULT_POOL_MAXSIZE
+from pyrdf4j.errors import CannotStartTransaction, CannotCommitTransaction, \
+    CannotRollbackTransaction, DataBaseNotReachable
+
+
+def authorization_header(auth):
+    """
+    Translates the credentials into the value of a basic Authorization header.
+    Accepts objects with username and password like requests.auth.HTTPBasicAuth,
+    or (username, password) tuples.
+    """
+    if auth is None:
+        return None
+    if isinstance(auth, tuple):
+        username, password = auth
+    else:
+        username, password = auth.username, auth.password
+    if isinstance(username, bytes):
+        username = username.decode('latin1')
+    if isinstance(password, bytes):
+        password = password.decode('latin1')
+    credentials = '{}:{}'.format(username, password).encode('latin1')
+    return 'Basic ' + base64.b64encode(credentials).decode('ascii')
+
+
+class Response:
+    """
+    The completely read response to a request.
+    Offers the attributes of a requests response which pyrdf4j relies on.
+    """
+
+    def __init__(self, status_code, headers, content, url):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.url = url
+
+    @property
+    def text(self):
+        return self.content.decode('utf8')
+
+    def __repr__(self):
+        return '<Response [{}]>'.format(self.status_code)
+
+
+class AsyncServer:
+    """
+    Represent a RDF4J server instance accessed by asyncio.
+
+    All requests share the pooled keep-alive connections of one aiohttp session.
+    The session is created on first use inside the running event loop.
+    """
+
+    def __init__(
+            self,
+            RDF4J_base=None,
+            auth=None,
+            limit=100,
+            limit_per_host=DEFAULT_POOL_MAXSIZE,
+            keepalive_timeout=15,
+    ):
+        """
+        :param RDF4J_base: (optional) Base URI of the RDF4J server
+        :param auth: (optional) Default credentials used if a request brings no auth of its own
+        :param limit: (optional) Maximal number of connections in total
+        :param limit_per_host: (optional) Maximal number of connections per host
+        :param keepalive_timeout: (optional) Seconds an idle connection is kept alive
+        """
+        self.repository_uris = {}
+        if RDF4J_base is not None:
+            self.RDF4J_base = RDF4J_base
+        else:
+            self.RDF4J_base = RDF4J_BASE
+
+        self.auth = auth
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self._session = None
+
+    @property
+    def session(self):
+        """The aiohttp session holding the connection pool"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            headers = {}
+            if self.auth is not None:
+                headers['Authorization'] = authorization_header(self.auth)
+            self._session = aiohttp.ClientSession(connector=connector, headers=headers)
+        return self._session
+
+    async def close(self):
+        """Close all pooled connections"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, exc_traceback):
+        await self.close()
+
+    async def request(self, method, uri, **params):
+        """Low level request utilizing the connection pool"""
+        auth = params.pop('auth', None)
+        if auth is not None:
+            params['headers'] = dict(params.get('headers') or {})
+            params['headers']['Authorization'] = authorization_header(auth)
+        try:
+            async with self.session.request(method, uri, **params) as response:
+                content = await response.read()
+                return Response(response.status, response.headers, content, str(response.url))
+        except aiohttp.ClientConnectionError as e:
+            exc_type, exc_value, exc_traceback = sys.exc_info()
+            # todo: Logger
+            print("%s termiated due to error %s %s" % (method, exc_type, exc_value))
+            for line in traceback.format_tb(exc_traceback):
+                print("Traceback:%s" % line[:-1])
+            raise DataBaseNotReachable(
+                'Database not reachable. Tried {method} on {uri} with params {params}'.format(
+                    method=method,
+                    uri=uri,
+                    params=params
+                )
+            )
+
+    @asynccontextmanager
+    async def stream(self, method, uri, **params):
+        """
+        Async context of a request whose response is not read in advance,
+        so its body can be consumed incrementally from response.content.
+        The connection is released on exit.
+        """
+        auth = params.pop('auth', None)
+        if auth is not None:
+            params['headers'] = dict(params.get('headers') or {})
+            params['headers']['Authorization'] = authorization_header(auth)
+        try:
+            response = await self.session.request(method, uri, **params)
+        except aiohttp.ClientConnectionError:
+            raise DataBaseNotReachable(
+                'Database not reachable. Tried {method} on {uri} with params {params}'.format(
+                    method=method,
+                    uri=uri,
+                    params=params
+                )
+            )
+        try:
+            yield response
+        finally:
+            response.release()
+
+    async def get(self, uri, **params):
+        """Low level GET request. The data is sent as query parameters."""
+        if 'params' not in params:
+            params['params'] = params.pop('data', None)
+        return await self.request('GET', uri, **params)
+
+    async def post(self, uri, **params):
+        """Low level POST request"""
+        return await self.request('POST', uri, **params)
+
+    async def put(self, uri, **params):
+        """Low level PUT request"""
+        return await self.request('PUT', uri, **params)
+
+    async def delete(self, uri, **params):
+        """Low level DELETE request"""
+        return await self.request('DELETE', uri, **params)
+
+    async def start_transaction(self, repo_uri, auth=None):
+        # start a transaction and return the associated transaction URI
+        # returns : The transaction URI
+
+        response = await self.post(
+            repo_uri + '/transactions',
+            auth=auth
+        )
+        if response.status_code != HTTPStatus.CREATED:
+            raise CannotStartTransaction(response.content)
+
+        return response.headers['Location']
+
+    async def commit(self, transcation_uri, auth=None):
+        # commit a transaction and return the response status
+        response = await self.put(
+            transcation_uri + '?action=COMMIT',
+            auth=auth
+        )
+        if response.status_code != HTTPStatus.OK:
+            raise CannotCommitTransaction
+
+        return response.status_code
+
+    async def rollback(self, transcation_uri, auth=None):
+        # Rollback a transaction and return the response status
+        response = await self.delete(
+            transcation_uri + '?action=ROLLBACK',
+            auth=auth
+        )
+        if response.status_code != HTTPStatus.OK:
+            raise CannotRollbackTransaction
+
+        return response.status_code
+
+    @asynccontextmanager
+    async def transaction(self, repo_uri, auth=None):
+        """
+        Async context of a transaction on the repository.
+        Yields the transaction URI. The transaction is committed on exit
+        and rolled back if an exception occurs.
+        """
+        transaction_uri = await self.start_transaction(repo_uri, auth=auth)
+        try:
+            yield transaction_uri
+        except BaseException:
+            try:
+                await self.rollback(transaction_uri, auth=auth)
+            except CannotRollbackTransaction:
+                pass
+            raise
+        await self.commit(transaction_uri, auth=auth)
@@ -1,19 +1,33 @@
+import json
 from http import HTTPStatus
 
 from pyrdf4j.constants import DEFAULT_QUERY_RESPONSE_MIME_TYPE, \
     DEFAULT_QUERY_MIME_TYPE, \
-    DEFAULT_CHARSET
-from pyrdf4j.errors import QueryFailed
+    DEFAULT_CHARSET, \
+    DEFAULT_RESPONSE_TRIPLE_MIME_TYPE, \
+    BINARY_RDF_MIME_TYPE
+from pyrdf4j.errors import QueryFailed, TerminatingError
 from pyrdf4j.server import Transaction
+from pyrdf4j.transaction import RepositoryTransaction
+from pyrdf4j.util import encode_context, graph_store_params
 
 
 class APIBase:
 
-    def __init__(self, server, repo_id, repo_uri=None):
+    def __init__(self, server, repo_id, repo_uri=None, cache=None):
+        """
+        :param server: The Server to talk to
+        :param repo_id: ID of the repository
+        :param repo_uri: (optional) Endpoint of the repository, if it deviates from the default
+        :param cache: (optional) QueryCache for the results of query_repository
+        """
         self.server = server
         self.repo_id = repo_id
         self.repo_uri = self.repo_id_to_repo_uri(repo_id, repo_uri=repo_uri)
         self.uri = self.repo_id_to_uri(repo_id, repo_uri=repo_uri)
+        self.cache = cache
+        # Configuration of the repository, fetched or created by this API
+        self.config = None
 
     @classmethod
     def create(cls, server, repo_id, repo_config, repo_uri=None, auth=None):
@@ -32,6 +46,19 @@ class APIBase:
         """Translates a repository ID into a api endpoint URI"""
         return self.repo_id_to_repo_uri(repo_id, repo_uri=repo_uri)
 
+    def invalidate_cache(self):
+        """Drops the cached query results of the repository after a write"""
+        if self.cache is not None:
+            self.cache.invalidate(self.repo_id)
+
+    def transaction(self, auth=None):
+        """
+        A transaction kept open across several operations.
+        Use it as context manager to commit on exit and roll back on exceptions.
+        :return: RepositoryTransaction
+        """
+        return RepositoryTransaction(self, auth=auth)
+
     def create_repository(self, repo_config, auth=None, charset=None):
         """
         Creates a repository in rdf4j
@@ -50,6 +77,8 @@ class APIBase:
             data=repo_config,
             auth=auth,
         )
+        if response.status_code == HTTPStatus.NO_CONTENT:
+            self.config = repo_config
         return response
 
     def drop_repository(self, auth=None, charset=None):
@@ -67,19 +96,131 @@ class APIBase:
             headers=headers,
             auth=auth,
         )
+        if response.status_code == HTTPStatus.NO_CONTENT:
+            self.config = None
+        self.invalidate_cache()
 
         return response
 
-    def empty_repository(self, auth=None):
-        # because we can not send a delete query,
-        # we query repo config,
-        # delete repo und create new one with same config
+    def get_config(self, auth=None, refresh=False):
+        """
+        :param refresh: (optional) Fetch the configuration even if it is cached
+        :return: Configuration of the repository as TTL resource
+        :raises: QueryFailed if the configuration cannot be fetched
+        """
+        if self.config is not None and not refresh:
+            return self.config
         config = self.repo_uri + '/config'
         headers = {'content-type': 'application/x-turtle; charset=' + DEFAULT_CHARSET}
         response = self.server.get(config, auth=auth, data={}, headers=headers)
-        res = response.content.decode('utf8')
+        if response.status_code != HTTPStatus.OK:
+            raise QueryFailed(response.content)
+        self.config = response.content.decode('utf8')
+        return self.config
+
+    def empty_repository(self, auth=None, contexts=None, reset=False):
+        """
+        Removes the statements of the repository by a DELETE on its statements
+        endpoint. The server removes them in a single transaction, so readers
+        either see the old statements or none, never a missing repository.
+        :param contexts: (optional) Only clear these contexts.
+            None in the list denotes the default graph. An empty list
+            clears nothing, no request is sent and None is returned.
+        :param reset: (optional) Drop and re-create the repository from its
+            configuration instead, which also rebuilds its store files and indexes
+        :return: the response from the triple store, None for an empty list of contexts
+        :raises: TerminatingError if the statements cannot be removed
+        """
+        if reset:
+            return self.reset_repository(auth=auth)
+
+        params = {}
+        if contexts is not None:
+            if not contexts:
+                # No context to clear. Sending the DELETE without a
+                # context parameter would clear the whole repository.
+                return None
+            params['context'] = [encode_context(context) for context in contexts]
+
+        response = self.server.delete(self.repo_uri + '/statements', params=params, auth=auth)
+        self.invalidate_cache()
+        if response.status_code != HTTPStatus.NO_CONTENT:
+            raise TerminatingError(response.content)
+        return response
+
+    def reset_repository(self, auth=None):
+        """
+        Drops the repository and re-creates it with the same (cached) configuration
+        :return: the response to the creation
+        """
+        config = self.get_config(auth=auth)
         self.drop_repository(auth=auth)
-        self.create_repository(res, auth=auth)
+        response = self.create_repository(config, auth=auth)
+        self.invalidate_cache()
+        return response
+
+    def graph_store_uri(self):
+        """Endpoint of the Graph Store protocol of the repository"""
+        return self.repo_uri + '/rdf-graphs/service'
+
+    def get_graph(self, graph=None, mime_type=None, auth=None):
+        """
+        Fetches the statements of one graph by the Graph Store protocol
+        :param graph: (optional) IRI of the named graph, the default graph if None
+        :param mime_type: (optional) RDF format of the statements
+        :return: The statements as bytes
+        :raises: QueryFailed if the graph cannot be fetched
+        """
+        if mime_type is None:
+            mime_type = DEFAULT_RESPONSE_TRIPLE_MIME_TYPE
+        headers = {'Accept': mime_type}
+        response = self.server.read(
+            'GET', self.graph_store_uri(), params=graph_store_params(graph), headers=headers, auth=auth)
+        if response.status_code != HTTPStatus.OK:
+            raise QueryFailed(response.content)
+        return response.content
+
+    def put_graph(self, triple_data, content_type, graph=None, auth=None, charset=None):
+        """
+        Replaces the statements of one graph by the Graph Store protocol
+        :param graph: (optional) IRI of the named graph, the default graph if None
+        :return: the response from the triple store
+        :raises: TerminatingError if the graph cannot be replaced
+        """
+        if charset is None:
+            charset = DEFAULT_CHARSET
+        headers = {'Content-Type': content_type + '; charset=' + charset}
+        response = self.server.put(
+            self.graph_store_uri(),
+            params=graph_store_params(graph),
+            data=triple_data,
+            headers=headers,
+            compress=True,
+            auth=auth,
+        )
+        self.invalidate_cache()
+        if response.status_code not in [HTTPStatus.CREATED, HTTPStatus.NO_CONTENT]:
+            raise TerminatingError(response.content)
+        return response
+
+    def delete_graph(self, graph=None, auth=None):
+        """
+        Removes one graph by the Graph Store protocol
+        :param graph: (optional) IRI of the named graph, the default graph if None
+        :return: the response from the triple store, 404 if the graph does not exist
+        """
+        response = self.server.delete(self.graph_store_uri(), params=graph_store_params(graph), auth=auth)
+        self.invalidate_cache()
+        return response
+
+    def post_query(self, query_type, **params):
+        """
+        POSTs a query to the repository. Plain queries may be served
+        by a read replica of the server, updates stay on the primary.
+        """
+        if query_type == DEFAULT_QUERY_MIME_TYPE:
+            return self.server.read('POST', self.repo_uri, **params)
+        return self.server.post(self.repo_uri, **params)
 
     def query_repository(self, query, query_type=None, mime_type=None, auth=None, charset=None):
 
@@ -92,20 +233,118 @@ class APIBase:
         if mime_type is None:
             mime_type = DEFAULT_QUERY_RESPONSE_MIME_TYPE
 
+        # Only plain queries are cached, updates must not be answered from the cache
+        key = None
+        if self.cache is not None and query_type == DEFAULT_QUERY_MIME_TYPE:
+            key = self.cache.key(self.repo_id, query, mime_type, auth or self.server.auth)
+            triple_data = self.cache.get(key)
+            if triple_data is not None:
+                return triple_data
+            generation = self.cache.generation(self.repo_id)
+
         headers = {
             'Accept': mime_type,
             'content-type': query_type + '; charset=' + charset,
         }
 
-        response = self.server.post(
-            self.repo_uri,
+        response = self.post_query(
+            query_type,
             data=query,
             headers=headers,
             auth=auth,
         )
         if response.status_code in [HTTPStatus.OK]:
             triple_data = response.content
-            triple_data = triple_data
+            if key is not None:
+                self.cache.put(key, triple_data, generation=generation)
             return triple_data
         else:
             raise QueryFailed(query)
+
+    def stream_query(self, query, query_type=None, mime_type=None, auth=None, charset=None):
+        """
+        Sends the query and returns the response without reading its body,
+        so the results can be consumed incrementally from response.raw.
+        The caller has to close the response.
+        """
+        if charset is None:
+            charset = DEFAULT_CHARSET
+
+        if query_type is None:
+            query_type = DEFAULT_QUERY_MIME_TYPE
+
+        if mime_type is None:
+            mime_type = DEFAULT_QUERY_RESPONSE_MIME_TYPE
+
+        headers = {
+            'Accept': mime_type,
+            'content-type': query_type + '; charset=' + charset,
+        }
+
+        response = self.post_query(
+            query_type,
+            data=query,
+            headers=headers,
+            auth=auth,
+            stream=True,
+        )
+        if response.status_code in [HTTPStatus.OK]:
+            response.raw.decode_content = True
+            # Keep the raw stream open at its end, so it can be wrapped by io classes
+            response.raw.auto_close = False
+            return response
+        else:
+            response.close()
+            raise QueryFailed(query)
+
+    def get_contexts(self, auth=None):
+        """
+        Lists the contexts (named graphs) of the repository
+        :return: List of the context IRIs, blank nodes as '_:' prefixed IDs
+        """
+        headers = {'Accept': DEFAULT_QUERY_RESPONSE_MIME_TYPE}
+        response = self.server.read('GET', self.repo_uri + '/contexts', headers=headers, auth=auth)
+        if response.status_code not in [HTTPStatus.OK]:
+            raise QueryFailed(response.content)
+        contexts = []
+        for binding in json.loads(response.content)['results']['bindings']:
+            context = binding['contextID']
+            if context['type'] == 'bnode':
+                contexts.append('_:' + context['value'])
+            else:
+                contexts.append(context['value'])
+        return contexts
+
+    def stream_statements(self, mime_type=None, auth=None, contexts=None):
+        """
+        Requests the statements of the repository and returns the response
+        without reading its body, so the statements can be consumed
+        incrementally from response.raw. The caller has to close the response.
+        :param mime_type: (optional) RDF format of the statements, binary RDF by default
+        :param contexts: (optional) Restrict the statements to these contexts.
+            None in the list denotes the default graph.
+        """
+        if mime_type is None:
+            mime_type = BINARY_RDF_MIME_TYPE
+
+        headers = {'Accept': mime_type}
+
+        params = {}
+        if contexts is not None:
+            params['context'] = [encode_context(context) for context in contexts]
+
+        response = self.server.read(
+            'GET',
+            self.repo_uri + '/statements',
+            params=params,
+            headers=headers,
+            auth=auth,
+            stream=True,
+        )
+        if response.status_code in [HTTPStatus.OK]:
+            response.raw.decode_content = True
+            response.raw.auto_close = False
+            return response
+        else:
+            response.close()
+            raise QueryFailed(response.url)
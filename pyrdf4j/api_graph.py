@@ -3,6 +3,7 @@ from http import HTTPStatus
 from pyrdf4j.api_base import APIBase
 from pyrdf4j.constants import DEFAULT_CHARSET
 from pyrdf4j.errors import TerminatingError
+from pyrdf4j.util import encode_context
 
 
 class APIGraph(APIBase):
@@ -14,48 +15,50 @@ class APIGraph(APIBase):
         repo_uri = self.server.RDF4J_base + 'repositories/{}/statements'.format(repo_id)
         return repo_uri
 
-    def replace_triple_data_in_repo(self, triple_data, content_type, auth=None, charset=None, base_uri=None):
+    def replace_triple_data_in_repo(self, triple_data, content_type, auth=None, charset=None, base_uri=None,
+                                    context=None):
 
         if charset is None:
             charset = DEFAULT_CHARSET
 
+        # PUT replaces all statements, or those of the context, in a single server side transaction
+        params = {}
+        if context is not None:
+            params['context'] = encode_context(context)
         headers = {'Content-Type': content_type + '; charset=' + charset}
-        self.empty_repository(auth=auth)
 
         response = self.server.put(
             self.uri,
+            params=params,
             data=triple_data,
             headers=headers,
+            compress=True,
             auth=auth,
         )
         if response.status_code != HTTPStatus.NO_CONTENT:
             raise TerminatingError(response.content)
+        self.invalidate_cache()
 
         return response
 
-    def add_triple_data_to_repo(self, triple_data, content_type, auth=None, charset=None, base_uri=None):
+    def add_triple_data_to_repo(self, triple_data, content_type, auth=None, charset=None, base_uri=None,
+                                context=None):
         if charset is None:
             charset = DEFAULT_CHARSET
+        params = {}
+        if context is not None:
+            params['context'] = encode_context(context)
         headers = {'Content-Type': content_type + '; charset=' + charset}
         response = self.server.post(
             self.uri,
+            params=params,
             data=triple_data,
             headers=headers,
+            compress=True,
             auth=auth,
         )
         if response.status_code != HTTPStatus.NO_CONTENT:
             raise TerminatingError(response.content)
+        self.invalidate_cache()
 
         return response
-
-    def empty_repository(self, auth=None):
-        mime_type = 'application/rdf+xml'
-        query = '''DELETE {?s ?p ?o . } Where {?s ?p ?o}'''
-        #
-        headers = {
-            'Accept': mime_type
-        }
-        data = {'query': query}
-        response = self.server.delete(self.uri, headers=headers, data=data, auth=auth)
-        triple_data = response.content
-        return triple_data
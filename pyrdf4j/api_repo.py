@@ -1,15 +1,23 @@
 from http import HTTPStatus
 
 from pyrdf4j.api_base import APIBase
-from pyrdf4j.constants import DEFAULT_CHARSET
+from pyrdf4j.constants import DEFAULT_CHARSET, DEFAULT_UPDATE_MIME_TYPE
 from pyrdf4j.errors import TerminatingError
 from pyrdf4j.server import Transaction
+from pyrdf4j.util import encode_context
 
 
 class APIRepo(APIBase):
 
     @Transaction()
-    def add_triple_data_to_repo(self, triple_data, content_type, auth=None, charset=None, base_uri=None):
+    def add_triple_data_to_repo(self, triple_data, content_type, auth=None, charset=None, base_uri=None,
+                                context=None, transaction_uri=None):
+        """
+        Adds the triple_data in a transaction of its own
+        :param context: (optional) IRI of the named graph to add the statements to,
+            instead of the contexts given by the triple_data
+        :param transaction_uri: (optional) Add within this running transaction instead
+        """
         if charset is None:
             charset = DEFAULT_CHARSET
         if base_uri:
@@ -17,11 +25,17 @@ class APIRepo(APIBase):
         else:
             extend = ''
 
+        params = {}
+        if context is not None:
+            params['context'] = encode_context(context)
+
         headers = {'Content-Type': content_type + '; charset=' + charset}
         response = self.server.put(
-            self.uri + '?action=ADD' + extend,
+            transaction_uri + '?action=ADD' + extend,
+            params=params,
             data=triple_data,
             headers=headers,
+            compress=True,
             auth=auth,
         )
         if response.status_code != HTTPStatus.OK:
@@ -29,6 +43,38 @@ class APIRepo(APIBase):
 
         return response
 
-    def replace_triple_data_in_repo(self, triple_data, content_type, auth=None, base_uri=None):
-        self.empty_repository(auth=auth)
-        return self.add_triple_data_to_repo(triple_data, content_type, auth=auth, base_uri=base_uri)
+    @Transaction()
+    def replace_triple_data_in_repo(self, triple_data, content_type, auth=None, charset=None, base_uri=None,
+                                    context=None, transaction_uri=None):
+        """
+        Replaces all statements of the repository by the triple_data in one
+        transaction. Readers keep seeing the old statements until the commit.
+        :param context: (optional) IRI of a named graph. Only this graph is
+            cleared and the triple_data is added to it.
+        :param transaction_uri: (optional) Replace within this running transaction instead
+        :raises: TerminatingError if the context is a blank node
+        """
+        if charset is None:
+            charset = DEFAULT_CHARSET
+
+        if context is None:
+            update = 'CLEAR ALL'
+        else:
+            graph = encode_context(context)
+            if not graph.startswith('<'):
+                raise TerminatingError('Only named graphs can be replaced: ' + graph)
+            update = 'CLEAR SILENT GRAPH ' + graph
+
+        headers = {'Content-Type': DEFAULT_UPDATE_MIME_TYPE + '; charset=' + charset}
+        response = self.server.put(
+            transaction_uri + '?action=UPDATE',
+            data=update.encode(charset),
+            headers=headers,
+            auth=auth,
+        )
+        if response.status_code not in [HTTPStatus.OK, HTTPStatus.NO_CONTENT]:
+            raise TerminatingError(response.content)
+
+        return self.add_triple_data_to_repo(
+            triple_data, content_type, auth=auth, charset=charset, base_uri=base_uri,
+            context=context, transaction_uri=transaction_uri)
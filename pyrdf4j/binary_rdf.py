@@ -0,0 +1,240 @@
+"""
+Streaming reader and writer of the binary RDF format of RDF4J
+(application/x-binary-rdf).
+
+A document starts with the magic number 'BRDF' and a format version,
+followed by records: namespace declarations, value declarations
+assigning an ID to a value, statements and an end of data marker.
+Values of a statement are either written in full or as reference to
+a declared ID.
+
+Statements are tuples of (subject, predicate, object, context) with the
+terms in SPARQL JSON form, e.g. {'type': 'uri', 'value': 'http://example.org'}.
+The context of a statement in the default graph is None.
+"""
+import struct
+
+from pyrdf4j.constants import BINARY_RDF_MIME_TYPE, DEFAULT_CHUNK_SIZE
+from pyrdf4j.errors import TerminatingError
+from pyrdf4j.util import read_exactly
+
+MAGIC_NUMBER = b'BRDF'
+
+MIME_TYPE = BINARY_RDF_MIME_TYPE
+
+FORMAT_VERSION_1 = 1
+FORMAT_VERSION_2 = 2
+
+# Record types
+NAMESPACE_DECL = 0
+STATEMENT = 1
+COMMENT = 2
+VALUE_DECL = 3
+ERROR = 126
+END_OF_DATA = 127
+
+# Value types
+NULL_VALUE = 0
+URI_VALUE = 1
+BNODE_VALUE = 2
+PLAIN_LITERAL_VALUE = 3
+LANG_LITERAL_VALUE = 4
+DATATYPE_LITERAL_VALUE = 5
+VALUE_REF = 6
+TRIPLE_VALUE = 7
+
+XSD_STRING = 'http://www.w3.org/2001/XMLSchema#string'
+
+# Maximal number of value IDs the writer keeps declared at once
+DEFAULT_MAX_VALUE_IDS = 4096
+
+INT = struct.Struct('>i')
+
+
+class BinaryRDFReader:
+    """
+    Decodes a binary RDF document read from a file like stream.
+    Iterating the reader yields the statements.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.version = None
+        self.charset = 'utf-8'
+        self.namespaces = {}
+        self.values = {}
+
+    def read_byte(self):
+        return read_exactly(self.stream, 1)[0]
+
+    def read_int(self):
+        return INT.unpack(read_exactly(self.stream, 4))[0]
+
+    def read_string(self):
+        length = self.read_int()
+        if self.version == FORMAT_VERSION_1:
+            # length in UTF-16 code units
+            return read_exactly(self.stream, 2 * length).decode('utf-16-be', errors='surrogatepass')
+        return read_exactly(self.stream, length).decode(self.charset)
+
+    def read_header(self):
+        magic_number = read_exactly(self.stream, len(MAGIC_NUMBER))
+        if magic_number != MAGIC_NUMBER:
+            raise TerminatingError('Stream does not contain a binary RDF document')
+        self.version = self.read_int()
+        if self.version == FORMAT_VERSION_2:
+            length = self.read_int()
+            self.charset = read_exactly(self.stream, length).decode('ascii')
+        elif self.version != FORMAT_VERSION_1:
+            raise TerminatingError('Incompatible binary RDF format version {}'.format(self.version))
+
+    def read_value(self):
+        value_type = self.read_byte()
+        if value_type == NULL_VALUE:
+            return None
+        if value_type == VALUE_REF:
+            return self.values[self.read_int()]
+        if value_type == URI_VALUE:
+            return {'type': 'uri', 'value': self.read_string()}
+        if value_type == BNODE_VALUE:
+            return {'type': 'bnode', 'value': self.read_string()}
+        if value_type == PLAIN_LITERAL_VALUE:
+            return {'type': 'literal', 'value': self.read_string()}
+        if value_type == LANG_LITERAL_VALUE:
+            label = self.read_string()
+            return {'type': 'literal', 'value': label, 'xml:lang': self.read_string()}
+        if value_type == DATATYPE_LITERAL_VALUE:
+            label = self.read_string()
+            datatype = self.read_string()
+            if datatype == XSD_STRING:
+                return {'type': 'literal', 'value': label}
+            return {'type': 'literal', 'value': label, 'datatype': datatype}
+        if value_type == TRIPLE_VALUE:
+            return {'type': 'triple', 'value': {
+                'subject': self.read_value(),
+                'predicate': self.read_value(),
+                'object': self.read_value(),
+            }}
+        raise TerminatingError('Unknown binary RDF value type {}'.format(value_type))
+
+    def __iter__(self):
+        if self.version is None:
+            self.read_header()
+        while True:
+            record_type = self.read_byte()
+            if record_type == STATEMENT:
+                subject = self.read_value()
+                predicate = self.read_value()
+                obj = self.read_value()
+                context = self.read_value()
+                yield subject, predicate, obj, context
+            elif record_type == VALUE_DECL:
+                value_id = self.read_int()
+                self.values[value_id] = self.read_value()
+            elif record_type == NAMESPACE_DECL:
+                prefix = self.read_string()
+                self.namespaces[prefix] = self.read_string()
+            elif record_type == COMMENT:
+                self.read_string()
+            elif record_type == END_OF_DATA:
+                return
+            elif record_type == ERROR:
+                raise TerminatingError(self.read_string())
+            else:
+                raise TerminatingError('Unknown binary RDF record type {}'.format(record_type))
+
+
+class BinaryRDFWriter:
+    """
+    Encodes statements into a binary RDF document (format version 1,
+    which every RDF4J version reads). IRIs and blank nodes are declared
+    as values on first use and referenced afterwards.
+    """
+
+    def __init__(self, max_value_ids=DEFAULT_MAX_VALUE_IDS):
+        # at least the four terms of a statement have to fit
+        self.max_value_ids = max(4, max_value_ids)
+        self.value_ids = {}
+
+    @staticmethod
+    def encode_string(value):
+        data = value.encode('utf-16-be', errors='surrogatepass')
+        return INT.pack(len(data) // 2) + data
+
+    def encode_value(self, value):
+        if value is None:
+            return bytes([NULL_VALUE])
+        value_type = value['type']
+        if value_type == 'uri':
+            return bytes([URI_VALUE]) + self.encode_string(value['value'])
+        if value_type == 'bnode':
+            return bytes([BNODE_VALUE]) + self.encode_string(value['value'])
+        if value_type in ('literal', 'typed-literal'):
+            label = self.encode_string(value['value'])
+            if 'xml:lang' in value:
+                return bytes([LANG_LITERAL_VALUE]) + label + self.encode_string(value['xml:lang'])
+            if value.get('datatype') and value['datatype'] != XSD_STRING:
+                return bytes([DATATYPE_LITERAL_VALUE]) + label + self.encode_string(value['datatype'])
+            return bytes([PLAIN_LITERAL_VALUE]) + label
+        if value_type == 'triple':
+            triple = value['value']
+            return bytes([TRIPLE_VALUE]) + \
+                self.encode_value(triple['subject']) + \
+                self.encode_value(triple['predicate']) + \
+                self.encode_value(triple['object'])
+        raise TerminatingError('Unknown term type {}'.format(value_type))
+
+    def encode_term(self, value, declarations):
+        """Encodes a term of a statement, declaring IRIs and blank nodes on first use"""
+        if value is None or value['type'] not in ('uri', 'bnode'):
+            return self.encode_value(value)
+        key = (value['type'], value['value'])
+        value_id = self.value_ids.get(key)
+        if value_id is None:
+            value_id = len(self.value_ids)
+            self.value_ids[key] = value_id
+            declarations.append(bytes([VALUE_DECL]) + INT.pack(value_id) + self.encode_value(value))
+        return bytes([VALUE_REF]) + INT.pack(value_id)
+
+    def header(self):
+        return MAGIC_NUMBER + INT.pack(FORMAT_VERSION_1)
+
+    def encode_statement(self, statement):
+        if len(statement) == 3:
+            statement = tuple(statement) + (None,)
+        if len(self.value_ids) + len(statement) > self.max_value_ids:
+            # Recycle all IDs, the reader overwrites redeclared IDs.
+            # This never happens within a statement, since its
+            # declarations precede the statement.
+            self.value_ids.clear()
+        declarations = []
+        terms = [self.encode_term(term, declarations) for term in statement]
+        return b''.join(declarations) + bytes([STATEMENT]) + b''.join(terms)
+
+    def end(self):
+        return bytes([END_OF_DATA])
+
+
+def iter_binary_rdf_statements(stream):
+    """Yields the statements of a binary RDF document read from the stream"""
+    return iter(BinaryRDFReader(stream))
+
+
+def iter_binary_rdf(statements, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Encodes the statements into a binary RDF document.
+    Yields chunks of about chunk_size bytes, suitable as streamed request body.
+    """
+    writer = BinaryRDFWriter()
+    chunk = [writer.header()]
+    size = 0
+    for statement in statements:
+        data = writer.encode_statement(statement)
+        chunk.append(data)
+        size += len(data)
+        if size >= chunk_size:
+            yield b''.join(chunk)
+            chunk = []
+            size = 0
+    chunk.append(writer.end())
+    yield b''.join(chunk)
@@ -0,0 +1,166 @@
+"""
+Streaming decoder of the binary SPARQL results table format of RDF4J
+(application/x-binary-rdf-results-table).
+
+The format starts with the magic number 'BRTR', a format version and
+the binding names. It is followed by one record per value. IRIs are
+usually split into a namespace, declared once in a namespace record
+and referenced by ID, and a local name. Values equal to the value of
+the previous row are sent as repeat records.
+"""
+import struct
+
+from pyrdf4j.errors import QueryFailed
+from pyrdf4j.util import read_exactly
+
+MAGIC_NUMBER = b'BRTR'
+
+MIME_TYPE = 'application/x-binary-rdf-results-table'
+
+NULL_RECORD_MARKER = 0
+REPEAT_RECORD_MARKER = 1
+NAMESPACE_RECORD_MARKER = 2
+QNAME_RECORD_MARKER = 3
+URI_RECORD_MARKER = 4
+BNODE_RECORD_MARKER = 5
+PLAIN_LITERAL_RECORD_MARKER = 6
+LANG_LITERAL_RECORD_MARKER = 7
+DATATYPE_LITERAL_RECORD_MARKER = 8
+EMPTY_ROW_RECORD_MARKER = 9
+TRIPLE_RECORD_MARKER = 10
+ERROR_RECORD_MARKER = 126
+TABLE_END_RECORD_MARKER = 127
+
+MALFORMED_QUERY_ERROR = 1
+QUERY_EVALUATION_ERROR = 2
+
+INT = struct.Struct('>i')
+SHORT = struct.Struct('>H')
+
+
+class BinaryResultsReader:
+    """
+    Decodes a binary results table read from a file like stream.
+    Iterating the reader yields the bindings row by row
+    in SPARQL JSON form.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.version = None
+        self.binding_names = None
+        self.namespaces = {}
+
+    def read_byte(self):
+        return read_exactly(self.stream, 1)[0]
+
+    def read_int(self):
+        return INT.unpack(read_exactly(self.stream, 4))[0]
+
+    def read_string(self):
+        if self.version == 1:
+            # Java modified UTF-8 with a two byte length
+            length = SHORT.unpack(read_exactly(self.stream, 2))[0]
+        else:
+            length = self.read_int()
+        return read_exactly(self.stream, length).decode('utf8', errors='surrogatepass')
+
+    def read_header(self):
+        """Reads the magic number, the format version and the binding names"""
+        magic_number = read_exactly(self.stream, len(MAGIC_NUMBER))
+        if magic_number != MAGIC_NUMBER:
+            raise QueryFailed('Stream does not contain a binary results table')
+        self.version = self.read_int()
+        count = self.read_int()
+        self.binding_names = [self.read_string() for i in range(count)]
+        return self.binding_names
+
+    def read_marker(self):
+        """Reads the next record marker, processing interspersed namespace records"""
+        marker = self.read_byte()
+        while marker == NAMESPACE_RECORD_MARKER:
+            namespace_id = self.read_int()
+            self.namespaces[namespace_id] = self.read_string()
+            marker = self.read_byte()
+        return marker
+
+    def read_iri(self, marker):
+        if marker == QNAME_RECORD_MARKER:
+            namespace_id = self.read_int()
+            return self.namespaces[namespace_id] + self.read_string()
+        if marker == URI_RECORD_MARKER:
+            return self.read_string()
+        raise QueryFailed('Unexpected record marker {} for an IRI'.format(marker))
+
+    def read_value(self, marker):
+        """Reads the value introduced by the marker in SPARQL JSON form"""
+        if marker in (QNAME_RECORD_MARKER, URI_RECORD_MARKER):
+            return {'type': 'uri', 'value': self.read_iri(marker)}
+        if marker == BNODE_RECORD_MARKER:
+            return {'type': 'bnode', 'value': self.read_string()}
+        if marker == PLAIN_LITERAL_RECORD_MARKER:
+            return {'type': 'literal', 'value': self.read_string()}
+        if marker == LANG_LITERAL_RECORD_MARKER:
+            label = self.read_string()
+            return {'type': 'literal', 'value': label, 'xml:lang': self.read_string()}
+        if marker == DATATYPE_LITERAL_RECORD_MARKER:
+            label = self.read_string()
+            datatype = self.read_iri(self.read_marker())
+            return {'type': 'literal', 'value': label, 'datatype': datatype}
+        if marker == TRIPLE_RECORD_MARKER:
+            return {'type': 'triple', 'value': {
+                'subject': self.read_value(self.read_marker()),
+                'predicate': self.read_value(self.read_marker()),
+                'object': self.read_value(self.read_marker()),
+            }}
+        raise QueryFailed('Unexpected record marker {}'.format(marker))
+
+    def read_error(self):
+        error_type = self.read_byte()
+        message = self.read_string()
+        if error_type == MALFORMED_QUERY_ERROR:
+            raise QueryFailed('Malformed query: ' + message)
+        raise QueryFailed(message)
+
+    def __iter__(self):
+        if self.binding_names is None:
+            self.read_header()
+        previous = [None] * len(self.binding_names)
+        while True:
+            marker = self.read_marker()
+            if marker == TABLE_END_RECORD_MARKER:
+                return
+            if marker == ERROR_RECORD_MARKER:
+                self.read_error()
+            if marker == EMPTY_ROW_RECORD_MARKER:
+                previous = [None] * len(self.binding_names)
+                yield {}
+                continue
+
+            row = []
+            for i in range(len(self.binding_names)):
+                if i:
+                    marker = self.read_marker()
+                if marker == NULL_RECORD_MARKER:
+                    row.append(None)
+                elif marker == REPEAT_RECORD_MARKER:
+                    row.append(previous[i])
+                else:
+                    row.append(self.read_value(marker))
+            previous = row
+            yield {name: value for name, value in zip(self.binding_names, row) if value is not None}
+
+
+def iter_binary_bindings(stream):
+    """Yields the bindings of a binary results table read from the stream"""
+    return iter(BinaryResultsReader(stream))
+
+
+def read_binary_results(stream):
+    """Reads a complete binary results table into the SPARQL JSON structure"""
+    reader = BinaryResultsReader(stream)
+    names = reader.read_header()
+    return {
+        'head': {'vars': names},
+        'results': {'bindings': list(reader)},
+    }
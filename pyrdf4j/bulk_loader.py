@@ -0,0 +1,173 @@
+"""
+Bulk loading of line based RDF formats (N-Triples, N-Quads)
+in many small transactions committed in parallel.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from pyrdf4j.constants import LINE_BASED_MIME_TYPES, DEFAULT_BULK_LOAD_WORKERS, DEFAULT_BATCH_SIZE, \
+    DEFAULT_MIN_BATCH_SIZE, DEFAULT_MAX_BATCH_SIZE, DEFAULT_TARGET_COMMIT_SECONDS
+from pyrdf4j.errors import BulkLoadError
+
+
+class LoadStatistics:
+    """
+    Aggregated figures of a bulk load
+    """
+
+    def __init__(self):
+        self.batches = 0
+        self.triples = 0
+        self.bytes = 0
+        self.seconds = 0.0
+        self.commit_seconds = 0.0
+        self.errors = []
+
+    @property
+    def triples_per_second(self):
+        if not self.seconds:
+            return 0.0
+        return self.triples / self.seconds
+
+    @property
+    def bytes_per_second(self):
+        if not self.seconds:
+            return 0.0
+        return self.bytes / self.seconds
+
+    def __repr__(self):
+        return '<LoadStatistics batches={} triples={} bytes={} seconds={:.3f} ' \
+               'triples/s={:.1f} bytes/s={:.1f} errors={}>'.format(
+                    self.batches, self.triples, self.bytes, self.seconds,
+                    self.triples_per_second, self.bytes_per_second, len(self.errors))
+
+
+class BulkLoader:
+    """
+    Splits N-Triples or N-Quads data at line boundaries into batches
+    and commits every batch in its own transaction on a thread pool.
+
+    The batch size adapts to the observed commit latency: batches which commit
+    faster than target_commit_seconds grow, slower ones shrink.
+
+    Notice: Since every batch is a document of its own, blank node labels
+    are only scoped to their batch. Each batch is committed on its own,
+    so a failing load may leave the batches committed before.
+    """
+
+    def __init__(
+            self,
+            rdf4j,
+            repo_id,
+            content_type='application/n-triples',
+            repo_uri=None,
+            auth=None,
+            workers=DEFAULT_BULK_LOAD_WORKERS,
+            batch_size=DEFAULT_BATCH_SIZE,
+            min_batch_size=DEFAULT_MIN_BATCH_SIZE,
+            max_batch_size=DEFAULT_MAX_BATCH_SIZE,
+            target_commit_seconds=DEFAULT_TARGET_COMMIT_SECONDS,
+    ):
+        if content_type not in LINE_BASED_MIME_TYPES:
+            raise BulkLoadError('Content type {} is not line based'.format(content_type))
+        self.rdf4j = rdf4j
+        self.repo_id = repo_id
+        self.content_type = content_type
+        self.repo_uri = repo_uri
+        self.auth = auth
+        self.workers = workers
+        self.batch_size = batch_size
+        self.min_batch_size = min_batch_size
+        self.max_batch_size = max_batch_size
+        self.target_commit_seconds = target_commit_seconds
+        self.statistics = LoadStatistics()
+        self._lock = threading.Lock()
+
+    def iter_batches(self, lines):
+        """
+        Groups the lines into batches of about batch_size bytes.
+        Yields tuples of (number of statements, batch data),
+        the arguments of load_batch
+        """
+        batch = []
+        size = 0
+        statements = 0
+        for line in lines:
+            if isinstance(line, str):
+                line = line.encode('utf8')
+            if not line.endswith(b'\n'):
+                line += b'\n'
+            stripped = line.strip()
+            if stripped and not stripped.startswith(b'#'):
+                statements += 1
+            batch.append(line)
+            size += len(line)
+            if size >= self.batch_size:
+                yield statements, b''.join(batch)
+                batch = []
+                size = 0
+                statements = 0
+        if statements:
+            yield statements, b''.join(batch)
+
+    def adapt(self, commit_seconds):
+        """Adapts the batch size to the latency of the last commit"""
+        if commit_seconds <= 0:
+            ratio = 2.0
+        else:
+            ratio = min(2.0, max(0.5, self.target_commit_seconds / commit_seconds))
+        batch_size = int(self.batch_size * ratio)
+        self.batch_size = min(self.max_batch_size, max(self.min_batch_size, batch_size))
+
+    def load_batch(self, statements, triple_data, repo_id=None):
+        """
+        Commits a single batch in a transaction of its own
+        :param repo_id: (optional) Repository to load into, if not the one of the loader
+        """
+        if repo_id is None:
+            api = self.rdf4j.get_api(self.repo_id, repo_uri=self.repo_uri)
+        else:
+            api = self.rdf4j.get_api(repo_id)
+        start = time.monotonic()
+        try:
+            api.add_triple_data_to_repo(triple_data, self.content_type, auth=self.auth)
+        except Exception as e:
+            with self._lock:
+                self.statistics.errors.append(e)
+            return
+        commit_seconds = time.monotonic() - start
+        with self._lock:
+            self.statistics.batches += 1
+            self.statistics.triples += statements
+            self.statistics.bytes += len(triple_data)
+            self.statistics.commit_seconds += commit_seconds
+            self.adapt(commit_seconds)
+
+    def load(self, lines):
+        """
+        Loads the lines into the repository.
+        :param lines: Iterable of lines, e.g. a file opened in binary mode
+        :return: LoadStatistics
+        :raises: BulkLoadError if a batch could not be committed
+        """
+        # Limit the batches held in memory to two per worker
+        slots = threading.BoundedSemaphore(self.workers * 2)
+
+        def release(future):
+            slots.release()
+
+        start = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for batch in self.iter_batches(lines):
+                slots.acquire()
+                if self.statistics.errors:
+                    slots.release()
+                    break
+                future = executor.submit(self.load_batch, *batch)
+                future.add_done_callback(release)
+        self.statistics.seconds = time.monotonic() - start
+
+        if self.statistics.errors:
+            raise BulkLoadError(self.statistics)
+        return self.statistics
@@ -0,0 +1,118 @@
+"""
+In-process cache of query results
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from pyrdf4j.constants import DEFAULT_CACHE_SIZE, DEFAULT_CACHE_TTL
+
+
+def auth_principal(auth):
+    """The user name of the credentials, used to separate the cache entries of users"""
+    if auth is None:
+        return None
+    if isinstance(auth, tuple):
+        return auth[0]
+    return getattr(auth, 'username', repr(auth))
+
+
+class QueryCache:
+    """
+    Thread-safe LRU cache of query results with a time to live.
+
+    The entries are keyed by (repository, query, accept type, auth principal).
+    Writes to a repository invalidate all its entries. Results of queries
+    which were running while a write happened are not stored, since they
+    may already be stale.
+    """
+
+    def __init__(self, maxsize=DEFAULT_CACHE_SIZE, ttl=DEFAULT_CACHE_TTL, max_bytes=None):
+        """
+        :param maxsize: (optional) Maximal number of cached results
+        :param ttl: (optional) Seconds a result stays valid, None for no expiry
+        :param max_bytes: (optional) Maximal total size of the cached results
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes = 0
+        self._entries = OrderedDict()
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(repository, query, mime_type, auth):
+        return repository, query, mime_type, auth_principal(auth)
+
+    def generation(self, repository):
+        """The write generation of the repository, to be passed on to put"""
+        with self._lock:
+            return self._generations.get(repository, 0)
+
+    def get(self, key):
+        """Returns the cached result or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, value = entry
+                if expires is None or expires > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                self._remove(key)
+            self.misses += 1
+            return None
+
+    def put(self, key, value, generation=None):
+        """
+        Stores the result. If a generation is given and the repository
+        has been written since, the result is discarded.
+        """
+        with self._lock:
+            repository = key[0]
+            if generation is not None and generation != self._generations.get(repository, 0):
+                return
+            if key in self._entries:
+                self._remove(key)
+            expires = None if self.ttl is None else time.monotonic() + self.ttl
+            self._entries[key] = (expires, value)
+            self.bytes += len(value)
+            while len(self._entries) > self.maxsize or \
+                    (self.max_bytes is not None and self.bytes > self.max_bytes and len(self._entries) > 1):
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, repository):
+        """Drops all results of the repository"""
+        with self._lock:
+            self._generations[repository] = self._generations.get(repository, 0) + 1
+            for key in [key for key in self._entries if key[0] == repository]:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            for repository in {key[0] for key in self._entries}:
+                self._generations[repository] = self._generations.get(repository, 0) + 1
+            self._entries.clear()
+            self.bytes = 0
+
+    def _remove(self, key):
+        expires, value = self._entries.pop(key)
+        self.bytes -= len(value)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self.bytes,
+            }
+
+    def __len__(self):
+        return len(self._entries)
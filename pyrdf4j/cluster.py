@@ -0,0 +1,239 @@
+"""
+Sharding of repositories across several RDF4J servers
+"""
+import bisect
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+from pyrdf4j.api_repo import APIRepo
+from pyrdf4j.constants import DEFAULT_VNODES, DEFAULT_COPY_WORKERS
+from pyrdf4j.errors import CreateRepositoryError
+from pyrdf4j.rdf4j import RDF4J
+
+
+def ring_hash(key):
+    """Position of the key on the hash ring"""
+    return int.from_bytes(hashlib.md5(key.encode('utf8')).digest()[:8], 'big')
+
+
+class HashRing:
+    """
+    Consistent hash ring mapping keys to nodes. Every node is placed
+    on the ring vnodes times, so adding or removing a node only moves
+    about 1/N of the keys.
+    """
+
+    def __init__(self, nodes=(), vnodes=DEFAULT_VNODES):
+        """
+        :param nodes: (optional) Names of the nodes
+        :param vnodes: (optional) Number of positions per node
+        """
+        self.vnodes = vnodes
+        self.nodes = []
+        self._positions = []
+        self._owners = []
+        for node in nodes:
+            self.add(node)
+
+    def add(self, node):
+        if node in self.nodes:
+            return
+        self.nodes.append(node)
+        for i in range(self.vnodes):
+            position = ring_hash('{}#{}'.format(node, i))
+            index = bisect.bisect(self._positions, position)
+            self._positions.insert(index, position)
+            self._owners.insert(index, node)
+
+    def remove(self, node):
+        self.nodes.remove(node)
+        entries = [(position, owner) for position, owner in zip(self._positions, self._owners) if owner != node]
+        self._positions = [position for position, owner in entries]
+        self._owners = [owner for position, owner in entries]
+
+    def copy(self):
+        return HashRing(self.nodes, vnodes=self.vnodes)
+
+    def node_for(self, key):
+        """The node owning the key"""
+        if not self._positions:
+            raise KeyError('Hash ring has no nodes')
+        index = bisect.bisect(self._positions, ring_hash(key)) % len(self._positions)
+        return self._owners[index]
+
+
+def plan_moves(repositories, ring, overrides=None):
+    """
+    Lists the repositories not placed on their owning node.
+    :param repositories: Dict of node names to the IDs of their repositories
+    :param ring: HashRing of the target placement
+    :param overrides: (optional) Mapping of repository IDs to fixed node names
+    :return: List of (repo_id, source node, target node)
+    """
+    if overrides is None:
+        overrides = {}
+    moves = []
+    for node, repo_ids in repositories.items():
+        for repo_id in repo_ids:
+            target = overrides.get(repo_id) or ring.node_for(repo_id)
+            if target != node:
+                moves.append((repo_id, node, target))
+    return moves
+
+
+def _routed(name):
+    """Delegates the RDF4J method to the server holding the repository, its first argument"""
+    def method(self, repo_id, *args, **kwargs):
+        return getattr(self.node_for(repo_id), name)(repo_id, *args, **kwargs)
+
+    method.__name__ = name
+    method.__doc__ = getattr(RDF4J, name).__doc__
+    return method
+
+
+class ShardedRDF4J:
+    """
+    Cluster aware counterpart of the RDF4J facade. Each repository is
+    placed on one of several servers by consistent hashing of its ID.
+    An override mapping pins single repositories to a server of choice.
+    All repository operations are routed transparently.
+    """
+
+    def __init__(self, rdf4j_bases, api=APIRepo, auth=None, overrides=None, vnodes=DEFAULT_VNODES,
+                 **server_params):
+        """
+        :param rdf4j_bases: Base URIs of the RDF4J servers
+        :param api: (optional) API class used to access the repositories
+        :param auth: (optional) Default credentials for all requests
+        :param overrides: (optional) Mapping of repository IDs to server base URIs,
+            taking precedence over the hash ring, e.g. a dict or a database backed mapping
+        :param vnodes: (optional) Virtual nodes per server on the hash ring
+        :param server_params: (optional) Parameters passed on to every RDF4J instance
+        """
+        self._node_params = dict(api=api, auth=auth, **server_params)
+        self.nodes = {base: RDF4J(base, **self._node_params) for base in rdf4j_bases}
+        self.ring = HashRing(rdf4j_bases, vnodes=vnodes)
+        if overrides is None:
+            overrides = {}
+        self.overrides = overrides
+        # Repositories pinned to their new server by an unfinished rebalance
+        self._pinned = set()
+
+    def node_base(self, repo_id):
+        """Base URI of the server holding the repository"""
+        return self.overrides.get(repo_id) or self.ring.node_for(repo_id)
+
+    def node_for(self, repo_id):
+        """RDF4J instance of the server holding the repository"""
+        return self.nodes[self.node_base(repo_id)]
+
+    get_api = _routed('get_api')
+    transaction = _routed('transaction')
+    create_repository = _routed('create_repository')
+    drop_repository = _routed('drop_repository')
+    empty_repository = _routed('empty_repository')
+    bulk_load_from_uri = _routed('bulk_load_from_uri')
+    fetch_source = _routed('fetch_source')
+    load_source = _routed('load_source')
+    bulk_load = _routed('bulk_load')
+    graph_from_uri = _routed('graph_from_uri')
+    sync_from_uri = _routed('sync_from_uri')
+    add_data_to_repo = _routed('add_data_to_repo')
+    get_graph = _routed('get_graph')
+    put_graph = _routed('put_graph')
+    delete_graph = _routed('delete_graph')
+    import_statements = _routed('import_statements')
+    export_statements = _routed('export_statements')
+    query_repository = _routed('query_repository')
+    iter_query = _routed('iter_query')
+    paginated_query = _routed('paginated_query')
+    get_triple_data_from_query = _routed('get_triple_data_from_query')
+    get_turtle_from_query = _routed('get_turtle_from_query')
+
+    create_repositories = RDF4J.create_repositories
+    drop_repositories = RDF4J.drop_repositories
+    _provision = RDF4J._provision
+
+    def copy_repository(self, source_repository, target_repository, auth=None, **kwargs):
+        """
+        Copies all statements of the source into the target repository,
+        streaming them between the servers if they are placed apart.
+        """
+        return self.node_for(source_repository).copy_repository(
+            source_repository, target_repository, auth=auth,
+            target_rdf4j=self.node_for(target_repository), **kwargs)
+
+    def move_data_between_repositorys(self, target_repository, source_repository, auth=None, repo_type='memory'):
+        self.create_repository(source_repository, accept_existing=True, auth=auth, repo_type=repo_type)
+        self.create_repository(target_repository, accept_existing=True, auth=auth, repo_type=repo_type)
+        return self.copy_repository(source_repository, target_repository, auth=auth)[0]
+
+    def list_repositories(self, auth=None):
+        """
+        :return: Dict of server base URIs to the IDs of their repositories
+        """
+        return {base: node.list_repositories(auth=auth) for base, node in self.nodes.items()}
+
+    def move_repository(self, repo_id, source_base, target_base, auth=None, drop=True):
+        """
+        Streams a repository from one server onto another, creating it
+        there with the same configuration.
+        :param drop: (optional) Drop the repository on the source server afterwards
+        """
+        source = self.nodes[source_base]
+        target = self.nodes[target_base]
+        config = source.get_api(repo_id).get_config(auth=auth)
+        response = target.get_api(repo_id).create_repository(config, auth=auth)
+        if response.status_code != HTTPStatus.NO_CONTENT:
+            raise CreateRepositoryError(str(response.status_code) + ': ' + str(response.content))
+        source.copy_repository(repo_id, repo_id, auth=auth, target_rdf4j=target)
+        if drop:
+            source.drop_repository(repo_id, auth=auth)
+
+    def rebalance(self, ring=None, auth=None, drop=True, workers=DEFAULT_COPY_WORKERS):
+        """
+        Moves every repository not placed on its owning server.
+        Writes to the moving repositories have to be paused meanwhile.
+        Each repository is pinned to its new server in the overrides as soon
+        as it is moved, so if another move fails the moved ones stay
+        reachable. Calling rebalance again finishes the remaining moves.
+        :param ring: (optional) Target placement, the current ring by default.
+            It becomes the current ring once all repositories are moved.
+        :param workers: (optional) Number of repositories moved in parallel
+        :return: List of the moves as (repo_id, source base, target base)
+        """
+        if ring is None:
+            ring = self.ring
+        overrides = self.overrides
+        if self._pinned:
+            # Pins of an unfinished rebalance do not constrain the placement
+            overrides = {repo_id: base for repo_id, base in overrides.items() if repo_id not in self._pinned}
+        moves = plan_moves(self.list_repositories(auth=auth), ring, overrides=overrides)
+        self._pinned.update(repo_id for repo_id, source, target in moves if repo_id not in self.overrides)
+
+        def move(repo_id, source, target):
+            self.move_repository(repo_id, source, target, auth=auth, drop=drop)
+            self.overrides[repo_id] = target
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(move, repo_id, source, target) for repo_id, source, target in moves]
+            for future in futures:
+                future.result()
+        self.ring = ring
+        # The ring routes the moved repositories from now on
+        for repo_id in self._pinned:
+            self.overrides.pop(repo_id, None)
+        self._pinned.clear()
+        return moves
+
+    def add_node(self, rdf4j_base, auth=None, drop=True, workers=DEFAULT_COPY_WORKERS):
+        """
+        Adds a server to the cluster and streams the repositories
+        it now owns onto it.
+        :return: List of the moves as (repo_id, source base, target base)
+        """
+        self.nodes[rdf4j_base] = RDF4J(rdf4j_base, **self._node_params)
+        ring = self.ring.copy()
+        ring.add(rdf4j_base)
+        return self.rebalance(ring, auth=auth, drop=drop, workers=workers)
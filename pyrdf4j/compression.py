@@ -0,0 +1,147 @@
+"""
+Compressed transfers: gzip encoded request bodies and accounting of the
+bytes saved by compressed requests and responses
+"""
+import threading
+import zlib
+from collections import deque, namedtuple
+
+from pyrdf4j.constants import DEFAULT_CHUNK_SIZE, DEFAULT_CHARSET, DEFAULT_COMPRESS_LEVEL, \
+    DEFAULT_COMPRESSION_HISTORY
+
+# Directions of a transfer
+UPLOAD = 'upload'
+DOWNLOAD = 'download'
+
+
+class Transfer(namedtuple('Transfer', ['direction', 'uri', 'raw_bytes', 'wire_bytes'])):
+    """A compressed transfer with its uncompressed and its transmitted size"""
+
+    @property
+    def ratio(self):
+        if not self.wire_bytes:
+            return 1.0
+        return self.raw_bytes / self.wire_bytes
+
+    @property
+    def saved(self):
+        return self.raw_bytes - self.wire_bytes
+
+
+class CompressionStatistics:
+    """
+    Thread-safe account of the compressed transfers of a server.
+    The most recent transfers are kept, the totals cover all of them.
+    """
+
+    def __init__(self, history=DEFAULT_COMPRESSION_HISTORY):
+        """
+        :param history: (optional) Number of recent transfers kept
+        """
+        self.transfers = deque(maxlen=history)
+        self.count = {UPLOAD: 0, DOWNLOAD: 0}
+        self.raw_bytes = {UPLOAD: 0, DOWNLOAD: 0}
+        self.wire_bytes = {UPLOAD: 0, DOWNLOAD: 0}
+        self._lock = threading.Lock()
+
+    def record(self, direction, uri, raw_bytes, wire_bytes):
+        transfer = Transfer(direction, uri, raw_bytes, wire_bytes)
+        with self._lock:
+            self.transfers.append(transfer)
+            self.count[direction] += 1
+            self.raw_bytes[direction] += raw_bytes
+            self.wire_bytes[direction] += wire_bytes
+        return transfer
+
+    @property
+    def saved(self):
+        """Bytes saved by all compressed transfers"""
+        with self._lock:
+            return sum(self.raw_bytes.values()) - sum(self.wire_bytes.values())
+
+    def ratio(self, direction=None):
+        """Overall compression ratio, of the given direction or of all transfers"""
+        with self._lock:
+            directions = [direction] if direction else [UPLOAD, DOWNLOAD]
+            wire_bytes = sum(self.wire_bytes[name] for name in directions)
+            if not wire_bytes:
+                return 1.0
+            return sum(self.raw_bytes[name] for name in directions) / wire_bytes
+
+    def __repr__(self):
+        return '<CompressionStatistics uploads={} downloads={} saved={} ratio={:.2f}>'.format(
+            self.count[UPLOAD], self.count[DOWNLOAD], self.saved, self.ratio())
+
+
+def iter_chunks(data, chunk_size=DEFAULT_CHUNK_SIZE, charset=DEFAULT_CHARSET):
+    """Yields a request body as chunks of bytes, without copying buffered data"""
+    if isinstance(data, str):
+        data = data.encode(charset)
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        view = memoryview(data)
+        for start in range(0, len(view), chunk_size):
+            yield view[start:start + chunk_size]
+    elif hasattr(data, 'read'):
+        while True:
+            chunk = data.read(chunk_size)
+            if not chunk:
+                break
+            if isinstance(chunk, str):
+                chunk = chunk.encode(charset)
+            yield chunk
+    else:
+        for chunk in data:
+            if isinstance(chunk, str):
+                chunk = chunk.encode(charset)
+            yield chunk
+
+
+def iter_gzip(data, level=DEFAULT_COMPRESS_LEVEL, chunk_size=DEFAULT_CHUNK_SIZE, charset=DEFAULT_CHARSET,
+              on_done=None):
+    """
+    Compresses a request body on the fly. The body is read and compressed
+    chunk by chunk, so no compressed copy of it is kept in memory.
+    :param data: Bytes, str, a file like object or an iterable of chunks
+    :param on_done: (optional) Called with the raw and the compressed size once the body is sent
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    raw_bytes = 0
+    wire_bytes = 0
+    for chunk in iter_chunks(data, chunk_size=chunk_size, charset=charset):
+        raw_bytes += len(chunk)
+        compressed = compressor.compress(chunk)
+        if compressed:
+            wire_bytes += len(compressed)
+            yield compressed
+    compressed = compressor.flush()
+    wire_bytes += len(compressed)
+    yield compressed
+    if on_done is not None:
+        on_done(raw_bytes, wire_bytes)
+
+
+def count_decoded(response, on_done):
+    """
+    Counts the decoded bytes read from a streamed response.
+    On close of the response on_done is called with the decoded
+    and the transmitted size.
+    """
+    raw = response.raw
+    read = raw.read
+    close = response.close
+    counted = {'decoded': 0, 'done': False}
+
+    def counting_read(*args, **kwargs):
+        data = read(*args, **kwargs)
+        counted['decoded'] += len(data)
+        return data
+
+    def recording_close():
+        if not counted['done'] and raw.tell():
+            counted['done'] = True
+            on_done(counted['decoded'], raw.tell())
+        close()
+
+    raw.read = counting_read
+    response.close = recording_close
+    return response
@@ -12,10 +12,86 @@ VIEWER_USER = 'viewer'
 VIEWER_PASS = 'pw3'
 
 DEFAULT_QUERY_MIME_TYPE = 'application/sparql-query'
+# used for sending SPARQL Update operations
+DEFAULT_UPDATE_MIME_TYPE = 'application/sparql-update'
 # used for generating RDF-DATA by CONSTRUCT Statement
 DEFAULT_RESPONSE_TRIPLE_MIME_TYPE = 'application/x-turtle'
 # used for getting query results by SELECT Statement
 DEFAULT_QUERY_RESPONSE_MIME_TYPE = 'application/sparql-results+json'
 DEFAULT_CONTENT_TYPE = 'application/x-turtle'
+# used for transferring RDF-DATA between repositories and for exports
+BINARY_RDF_MIME_TYPE = 'application/x-binary-rdf'
 
 DEFAULT_CHARSET = 'utf-8'
+
+# Connection pool of the Server: number of per host pools to cache
+DEFAULT_POOL_CONNECTIONS = 10
+# Connection pool of the Server: maximal number of connections kept alive per host
+DEFAULT_POOL_MAXSIZE = 10
+
+# Size of the chunks read from a streamed response
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# Compressed transfers: zlib level of gzip encoded request bodies
+DEFAULT_COMPRESS_LEVEL = 6
+# Compressed transfers: number of recent transfers kept in the statistics
+DEFAULT_COMPRESSION_HISTORY = 1000
+
+# Line based RDF formats which can be split into batches at line boundaries
+LINE_BASED_MIME_TYPES = [
+    'application/n-triples',
+    'text/plain',
+    'application/n-quads',
+    'text/x-nquads',
+]
+
+# Bulk loader: number of batches committed in parallel
+DEFAULT_BULK_LOAD_WORKERS = 4
+# Bulk loader: initial, minimal and maximal size of a batch in bytes
+DEFAULT_BATCH_SIZE = 4 * 1024 * 1024
+DEFAULT_MIN_BATCH_SIZE = 256 * 1024
+DEFAULT_MAX_BATCH_SIZE = 64 * 1024 * 1024
+# Bulk loader: commit latency in seconds the batch size is adapted to
+DEFAULT_TARGET_COMMIT_SECONDS = 2.0
+
+# Repository copy: number of contexts copied in parallel
+DEFAULT_COPY_WORKERS = 4
+
+# Query cache: maximal number of cached results
+DEFAULT_CACHE_SIZE = 1024
+# Query cache: seconds a cached result stays valid
+DEFAULT_CACHE_TTL = 300
+
+# Read replicas: consecutive failures after which a replica is marked down
+DEFAULT_REPLICA_FAILURE_THRESHOLD = 3
+# Read replicas: seconds a replica stays down before it is tried again
+DEFAULT_REPLICA_DOWN_SECONDS = 30
+# Read replicas: number of recent latencies kept for the hedging percentile
+DEFAULT_LATENCY_WINDOW = 100
+# Read replicas: latencies needed before requests are hedged
+DEFAULT_HEDGE_MIN_SAMPLES = 20
+
+# Cluster: virtual nodes per server on the consistent hash ring
+DEFAULT_VNODES = 64
+
+# Partitioned datasets: number of repositories a dataset is split into
+DEFAULT_PARTITIONS = 4
+
+# Bulk repository provisioning: number of repositories created or dropped in parallel
+DEFAULT_PROVISION_WORKERS = 8
+
+# Delta sync: size of the statement fingerprints in bytes
+FINGERPRINT_SIZE = 16
+
+# Harvester: number of sources downloaded in parallel
+DEFAULT_DOWNLOAD_WORKERS = 8
+# Harvester: number of sources loaded in parallel into one RDF4J server
+DEFAULT_WRITE_WORKERS = 2
+# Harvester: seconds to wait for a source to connect and for each of its reads
+DEFAULT_DOWNLOAD_TIMEOUT = 60
+
+# Metrics: upper bounds in seconds of the latency histogram buckets
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Paginated queries: number of rows requested per page
+DEFAULT_PAGE_SIZE = 10000
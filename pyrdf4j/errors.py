@@ -45,9 +45,25 @@ class RepositoryTypeUnknown(Exception):
     """RepositoryTypeUnknown"""
 
 
+class RepositoryTemplateError(Exception):
+    """RepositoryTemplateError"""
+
+
 class QueryFailed(Exception):
     """QueryFailed"""
 
 
 class DataBaseNotReachable(Exception):
     """Database not reachable"""
+
+
+class QueryNotPartitionable(Exception):
+    """QueryNotPartitionable"""
+
+
+class SyncError(Exception):
+    """SyncError"""
+
+
+class PaginationError(Exception):
+    """PaginationError"""
@@ -0,0 +1,236 @@
+"""
+Parallel harvesting of many sources into repositories or contexts
+"""
+import threading
+import time
+import traceback
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from pyrdf4j.constants import DEFAULT_DOWNLOAD_WORKERS, DEFAULT_WRITE_WORKERS, DEFAULT_DOWNLOAD_TIMEOUT, \
+    LINE_BASED_MIME_TYPES
+from pyrdf4j.errors import SyncError
+from pyrdf4j.sync import ContextSync, iter_lines
+from pyrdf4j.validators import SkippedSource
+
+# States of a harvest job
+PENDING = 'pending'
+LOADED = 'loaded'
+SKIPPED = 'skipped'
+FAILED = 'failed'
+
+HarvestJob = namedtuple('HarvestJob', ['repo_id', 'uri', 'content_type', 'options'], defaults=(None,))
+HarvestJob.__doc__ = """
+A source to harvest into a repository. The options are
+    repository creation: repo_type, repo_label, overwrite, accept_existing, create (default True)
+    download: gunzip, conditional
+    load: clear_repository, context, base_uri, sync
+"""
+
+
+class SourceDownload:
+    """
+    A fetched source ready to be loaded into the triplestore
+    """
+
+    def __init__(self, uri, response, triple_data, digest, validators=None):
+        """
+        :param uri: URI of the source
+        :param response: Response to the GET of the source
+        :param triple_data: Content of the source, or an iterable of its chunks
+        :param digest: Hash object of the content
+        :param validators: (optional) ValidatorStore to record the source in once it is loaded
+        """
+        self.uri = uri
+        self.response = response
+        self.triple_data = triple_data
+        self.digest = digest
+        self.validators = validators
+
+    def close(self):
+        self.response.close()
+
+
+class HarvestResult:
+    """
+    Outcome of a harvest job with its timing and size
+    """
+
+    def __init__(self, job):
+        self.job = job
+        self.status = PENDING
+        self.bytes = 0
+        self.download_seconds = 0.0
+        self.load_seconds = 0.0
+        self.response = None
+        self.error = None
+        self.traceback = None
+
+    @property
+    def ok(self):
+        return self.status in [LOADED, SKIPPED]
+
+    @property
+    def seconds(self):
+        return self.download_seconds + self.load_seconds
+
+    def fail(self, error):
+        self.status = FAILED
+        self.error = error
+        self.traceback = traceback.format_exc()
+
+    def __repr__(self):
+        return '<HarvestResult {} {} status={} bytes={} download={:.3f}s load={:.3f}s error={!r}>'.format(
+            self.job.repo_id, self.job.uri, self.status, self.bytes, self.download_seconds,
+            self.load_seconds, self.error)
+
+
+class Harvester:
+    """
+    Harvests many sources in parallel. Downloads run on a pool of their own,
+    loads on a pool per RDF4J server, so neither a slow source nor a busy
+    server holds up the jobs of the others. Downloaded sources are kept in
+    memory until a write slot of their server becomes free.
+
+        harvester = Harvester(rdf4j, auth=auth)
+        results = harvester.harvest([
+            ('portal_a', 'https://example.org/a.ttl', 'text/turtle'),
+            ('portals', 'https://example.org/b.nt', 'application/n-triples', {'context': 'https://example.org/b'}),
+        ])
+    """
+
+    def __init__(self, rdf4j, auth=None, download_workers=DEFAULT_DOWNLOAD_WORKERS,
+                 write_workers=DEFAULT_WRITE_WORKERS, timeout=DEFAULT_DOWNLOAD_TIMEOUT):
+        """
+        :param rdf4j: RDF4J or ShardedRDF4J instance to load into
+        :param auth: (optional) Credentials for the triplestore
+        :param download_workers: (optional) Number of sources downloaded in parallel
+        :param write_workers: (optional) Number of sources loaded in parallel into one server
+        :param timeout: (optional) Seconds to wait for a source to connect and for each of its reads
+        """
+        self.rdf4j = rdf4j
+        self.auth = auth
+        self.download_workers = download_workers
+        self.write_workers = write_workers
+        self.timeout = timeout
+        self._writers = {}
+        self._created = {}
+        self._lock = threading.Lock()
+
+    def server_of(self, repo_id):
+        """Base URI of the server holding the repository"""
+        if hasattr(self.rdf4j, 'node_base'):
+            return self.rdf4j.node_base(repo_id)
+        return self.rdf4j.server.RDF4J_base
+
+    def _writer(self, repo_id):
+        base = self.server_of(repo_id)
+        with self._lock:
+            if base not in self._writers:
+                self._writers[base] = ThreadPoolExecutor(max_workers=self.write_workers)
+            return self._writers[base]
+
+    def harvest(self, jobs):
+        """
+        Runs the jobs and waits for all of them. Failing jobs do not stop the others.
+        :param jobs: Iterable of HarvestJob or tuples of (repo_id, uri, content_type[, options])
+        :return: List of HarvestResult in the order of the jobs
+        """
+        results = [HarvestResult(HarvestJob(*job)) for job in jobs]
+        self._created = {}
+        try:
+            with ThreadPoolExecutor(max_workers=self.download_workers) as downloads:
+                futures = [downloads.submit(self._download, result) for result in results]
+                loads = [future.result() for future in futures]
+            for load in loads:
+                if load is not None:
+                    load.result()
+        finally:
+            with self._lock:
+                writers, self._writers = self._writers, {}
+            for writer in writers.values():
+                writer.shutdown()
+        return results
+
+    def _download(self, result):
+        """Fetches the source and hands it over to the writers of its server"""
+        job = result.job
+        options = job.options or {}
+        start = time.monotonic()
+        try:
+            source = self.rdf4j.fetch_source(
+                job.repo_id,
+                job.uri,
+                gunzip=options.get('gunzip'),
+                context=options.get('context'),
+                conditional=options.get('conditional', True),
+                timeout=self.timeout,
+            )
+        except Exception as error:
+            result.fail(error)
+            return None
+        finally:
+            result.download_seconds = time.monotonic() - start
+
+        if isinstance(source, SkippedSource):
+            result.status = SKIPPED
+            result.response = source
+            return None
+        result.bytes = len(source.response.content)
+        return self._writer(job.repo_id).submit(self._load, result, source)
+
+    def _create(self, job):
+        """Creates the repository of the job, once per harvest"""
+        options = job.options or {}
+        with self._lock:
+            created = self._created.setdefault(job.repo_id, {'lock': threading.Lock(), 'done': False})
+        with created['lock']:
+            if created['done']:
+                return
+            self.rdf4j.create_repository(
+                job.repo_id,
+                repo_type=options.get('repo_type', 'memory'),
+                repo_label=options.get('repo_label'),
+                overwrite=options.get('overwrite', False),
+                accept_existing=options.get('accept_existing', True),
+                auth=self.auth,
+            )
+            created['done'] = True
+
+    def _load(self, result, source):
+        job = result.job
+        options = job.options or {}
+        start = time.monotonic()
+        try:
+            if options.get('create', True):
+                self._create(job)
+            if options.get('sync'):
+                result.response = self._sync(job, source)
+            else:
+                result.response = self.rdf4j.load_source(
+                    job.repo_id,
+                    source,
+                    job.content_type,
+                    clear_repository=options.get('clear_repository', False),
+                    auth=self.auth,
+                    base_uri=options.get('base_uri'),
+                    context=options.get('context'),
+                )
+            result.status = LOADED
+        except Exception as error:
+            result.fail(error)
+        finally:
+            source.close()
+            result.load_seconds = time.monotonic() - start
+
+    def _sync(self, job, source):
+        """Sends only the changes of a line based source, see ContextSync"""
+        if job.content_type not in LINE_BASED_MIME_TYPES:
+            raise SyncError('Content type {} is not line based'.format(job.content_type))
+        context = (job.options or {}).get('context') or job.uri
+        api = self.rdf4j.get_api(job.repo_id)
+        statistics = ContextSync(api, context, auth=self.auth).sync(iter_lines([source.triple_data]))
+        if source.validators is not None:
+            source.validators.update(source.uri, job.repo_id, source.response, source.digest.hexdigest(),
+                                     context=(job.options or {}).get('context'))
+        return statistics
@@ -0,0 +1,313 @@
+"""
+Instrumentation of the requests sent by a Server: hooks before and after
+every request and around transactions, a metrics collector with a
+Prometheus exporter and optional OpenTelemetry tracing.
+"""
+import bisect
+import threading
+import time
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from pyrdf4j.constants import DEFAULT_LATENCY_BUCKETS
+
+try:
+    from opentelemetry import trace
+except ImportError:  # pragma: no cover
+    trace = None
+
+# Outcomes of a transaction
+COMMIT = 'commit'
+ROLLBACK = 'rollback'
+FAILED = 'failed'
+
+PROMETHEUS_MIME_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def describe_request(method, uri, params=None):
+    """
+    The repository and the kind of operation of a request, e.g.
+    ('books', 'query') or ('books', 'PUT transaction ADD').
+    The operation leaves out IDs, so it is fit as metric label.
+    :return: Tuple of repository ID (None if the request is not on a repository) and operation
+    """
+    url = urlparse(uri)
+    segments = [segment for segment in url.path.split('/') if segment]
+    if 'repositories' not in segments:
+        return None, '{} {}'.format(method, segments[-1] if segments else '/')
+    index = segments.index('repositories')
+    rest = segments[index + 1:]
+    if not rest:
+        return None, '{} repositories'.format(method)
+    repository, rest = rest[0], rest[1:]
+    if not rest:
+        return repository, {'GET': 'query', 'POST': 'query', 'PUT': 'create', 'DELETE': 'drop'}.get(method, method)
+    if rest[0] == 'transactions' and len(rest) > 1:
+        action = parse_qs(url.query).get('action', [None])[0]
+        if action is None and isinstance(params, dict):
+            action = params.get('action')
+        return repository, '{} transaction {}'.format(method, action or '').rstrip()
+    return repository, '{} {}'.format(method, '/'.join(rest))
+
+
+class RequestRecord:
+    """
+    A request passed to the hooks of the instruments.
+    Status, sizes, duration and error are filled in after the request.
+    """
+
+    def __init__(self, method, uri, repository, operation):
+        self.method = method
+        self.uri = uri
+        self.repository = repository
+        self.operation = operation
+        self.start = time.monotonic()
+        self.seconds = None
+        self.status = None
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.error = None
+
+    def __repr__(self):
+        return '<RequestRecord {} {} status={} seconds={}>'.format(self.method, self.uri, self.status, self.seconds)
+
+
+class Instrumentation:
+    """
+    Base class of the instruments of a Server. All hooks do nothing by default.
+    Hooks are called from the threads sending the requests.
+    """
+
+    def before_request(self, record):
+        """
+        Called before a request is sent
+        :return: State handed to after_request
+        """
+        return None
+
+    def after_request(self, record, state):
+        """Called once the response arrived or the request failed"""
+
+    def transaction_started(self, transaction_uri, repository):
+        """Called after a transaction was started"""
+
+    def transaction_finished(self, transaction_uri, repository, outcome):
+        """Called after a transaction was committed, rolled back or failed to commit"""
+
+
+class Histogram:
+    """Cumulative histogram of observed values"""
+
+    def __init__(self, buckets=DEFAULT_LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """Pairs of upper bound and number of values up to it, ending with +Inf"""
+        total = 0
+        result = []
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+
+def _labels(**labels):
+    escaped = []
+    for name, value in labels.items():
+        value = str('' if value is None else value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        escaped.append('{}="{}"'.format(name, value))
+    return '{' + ','.join(escaped) + '}'
+
+
+def _bound(value):
+    return '+Inf' if value == float('inf') else repr(float(value))
+
+
+class MetricsCollector(Instrumentation):
+    """
+    Collects request counts, latency histograms and transferred bytes per
+    repository and operation, errors and transaction lifetimes.
+    """
+
+    def __init__(self, buckets=DEFAULT_LATENCY_BUCKETS):
+        """
+        :param buckets: (optional) Upper bounds in seconds of the latency histograms
+        """
+        self.buckets = buckets
+        self.requests = {}
+        self.latency = {}
+        self.bytes_sent = {}
+        self.bytes_received = {}
+        self.errors = {}
+        self.transactions = {}
+        self._open_transactions = {}
+        self._lock = threading.Lock()
+
+    def after_request(self, record, state):
+        key = (record.repository, record.operation)
+        with self._lock:
+            if record.error is not None:
+                error_key = key + (type(record.error).__name__,)
+                self.errors[error_key] = self.errors.get(error_key, 0) + 1
+            else:
+                status_key = key + (record.status,)
+                self.requests[status_key] = self.requests.get(status_key, 0) + 1
+            if key not in self.latency:
+                self.latency[key] = Histogram(self.buckets)
+            self.latency[key].observe(record.seconds)
+            self.bytes_sent[key] = self.bytes_sent.get(key, 0) + record.bytes_sent
+            self.bytes_received[key] = self.bytes_received.get(key, 0) + record.bytes_received
+
+    def transaction_started(self, transaction_uri, repository):
+        with self._lock:
+            self._open_transactions[transaction_uri] = time.monotonic()
+
+    def transaction_finished(self, transaction_uri, repository, outcome):
+        with self._lock:
+            start = self._open_transactions.pop(transaction_uri, None)
+            if start is None:
+                return
+            key = (repository, outcome)
+            if key not in self.transactions:
+                self.transactions[key] = Histogram(self.buckets)
+            self.transactions[key].observe(time.monotonic() - start)
+
+    @property
+    def open_transactions(self):
+        with self._lock:
+            return len(self._open_transactions)
+
+    def prometheus(self):
+        """The metrics in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            lines.append('# HELP pyrdf4j_requests_total Requests answered by the server')
+            lines.append('# TYPE pyrdf4j_requests_total counter')
+            for (repository, operation, status), count in sorted(self.requests.items(), key=str):
+                lines.append('pyrdf4j_requests_total{} {}'.format(
+                    _labels(repository=repository, operation=operation, status=status), count))
+
+            lines.append('# HELP pyrdf4j_request_errors_total Requests failed without response')
+            lines.append('# TYPE pyrdf4j_request_errors_total counter')
+            for (repository, operation, error), count in sorted(self.errors.items(), key=str):
+                lines.append('pyrdf4j_request_errors_total{} {}'.format(
+                    _labels(repository=repository, operation=operation, error=error), count))
+
+            for name, help_text, values in [
+                ('pyrdf4j_request_bytes_sent_total', 'Bytes of the request bodies', self.bytes_sent),
+                ('pyrdf4j_response_bytes_received_total', 'Bytes of the response bodies', self.bytes_received),
+            ]:
+                lines.append('# HELP {} {}'.format(name, help_text))
+                lines.append('# TYPE {} counter'.format(name))
+                for (repository, operation), count in sorted(values.items(), key=str):
+                    lines.append('{}{} {}'.format(name, _labels(repository=repository, operation=operation), count))
+
+            lines.append('# HELP pyrdf4j_request_seconds Latency of the requests')
+            lines.append('# TYPE pyrdf4j_request_seconds histogram')
+            for (repository, operation), histogram in sorted(self.latency.items(), key=str):
+                lines.extend(self._histogram('pyrdf4j_request_seconds', histogram,
+                                             repository=repository, operation=operation))
+
+            lines.append('# HELP pyrdf4j_transaction_seconds Lifetime of the transactions')
+            lines.append('# TYPE pyrdf4j_transaction_seconds histogram')
+            for (repository, outcome), histogram in sorted(self.transactions.items(), key=str):
+                lines.extend(self._histogram('pyrdf4j_transaction_seconds', histogram,
+                                             repository=repository, outcome=outcome))
+
+            lines.append('# HELP pyrdf4j_open_transactions Transactions started but not finished')
+            lines.append('# TYPE pyrdf4j_open_transactions gauge')
+            lines.append('pyrdf4j_open_transactions {}'.format(len(self._open_transactions)))
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def _histogram(name, histogram, **labels):
+        lines = []
+        for bound, count in histogram.cumulative():
+            lines.append('{}_bucket{} {}'.format(name, _labels(le=_bound(bound), **labels), count))
+        lines.append('{}_sum{} {}'.format(name, _labels(**labels), histogram.sum))
+        lines.append('{}_count{} {}'.format(name, _labels(**labels), histogram.count))
+        return lines
+
+
+def serve_prometheus(collector, port, address=''):
+    """
+    Serves the metrics of the collector for scraping by Prometheus from a daemon thread
+    :return: The HTTP server, stop it by shutdown()
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+
+        def do_GET(self):
+            body = collector.prometheus().encode('utf8')
+            self.send_response(HTTPStatus.OK)
+            self.send_header('Content-Type', PROMETHEUS_MIME_TYPE)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((address, port), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+class TracingInstrumentation(Instrumentation):
+    """
+    Reports every request and every transaction as OpenTelemetry client span.
+    Requires the opentelemetry-api package.
+    """
+
+    def __init__(self, tracer=None):
+        """
+        :param tracer: (optional) OpenTelemetry tracer, the one of the global tracer provider by default
+        """
+        if trace is None:
+            raise ImportError('Tracing requires the opentelemetry-api package.')
+        if tracer is None:
+            tracer = trace.get_tracer('pyrdf4j')
+        self.tracer = tracer
+        self._transactions = {}
+        self._lock = threading.Lock()
+
+    def before_request(self, record):
+        attributes = {'http.method': record.method, 'http.url': record.uri, 'rdf4j.operation': record.operation}
+        if record.repository is not None:
+            attributes['rdf4j.repository'] = record.repository
+        return self.tracer.start_span('rdf4j ' + record.operation, kind=trace.SpanKind.CLIENT, attributes=attributes)
+
+    def after_request(self, record, span):
+        if record.error is not None:
+            span.record_exception(record.error)
+            span.set_status(trace.Status(trace.StatusCode.ERROR, str(record.error)))
+        else:
+            span.set_attribute('http.status_code', record.status)
+            if record.status >= HTTPStatus.BAD_REQUEST:
+                span.set_status(trace.Status(trace.StatusCode.ERROR))
+        span.set_attribute('rdf4j.bytes_sent', record.bytes_sent)
+        span.set_attribute('rdf4j.bytes_received', record.bytes_received)
+        span.end()
+
+    def transaction_started(self, transaction_uri, repository):
+        span = self.tracer.start_span('rdf4j transaction', kind=trace.SpanKind.CLIENT,
+                                      attributes={'rdf4j.repository': repository or ''})
+        with self._lock:
+            self._transactions[transaction_uri] = span
+
+    def transaction_finished(self, transaction_uri, repository, outcome):
+        with self._lock:
+            span = self._transactions.pop(transaction_uri, None)
+        if span is not None:
+            span.set_attribute('rdf4j.outcome', outcome)
+            span.end()
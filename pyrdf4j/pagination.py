@@ -0,0 +1,318 @@
+"""
+Paginated SELECT queries.
+
+A large result is fetched page by page, each page by a query of its own,
+so neither the server nor the client has to hold the whole result at once.
+Pages are addressed either by LIMIT/OFFSET or, given a sort key, by keyset:
+the next page starts at the key of the last row, which the server can
+find without skipping the rows of all previous pages. The row of the key
+itself is fetched again and dropped, so keys which are not unique are
+detected rather than losing the rows sharing the key. The next page is
+fetched in the background while the rows of the current one are consumed.
+
+The position after the last row handed out is kept as Cursor, from which
+an interrupted iteration can be resumed.
+"""
+import json
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from pyrdf4j.constants import DEFAULT_PAGE_SIZE
+from pyrdf4j.errors import PaginationError
+from pyrdf4j.partition import TOKEN_PATTERN
+from pyrdf4j.results import RESULT_MIME_TYPES, iter_bindings
+from pyrdf4j.sync import escape_literal
+
+XSD = 'http://www.w3.org/2001/XMLSchema#'
+
+# Datatypes of literals compared by value, all others are compared by their lexical form
+ORDERED_DATATYPES = {XSD + name for name in [
+    'integer', 'decimal', 'double', 'float', 'long', 'int', 'short', 'byte', 'nonNegativeInteger',
+    'positiveInteger', 'nonPositiveInteger', 'negativeInteger', 'unsignedLong', 'unsignedInt',
+    'unsignedShort', 'unsignedByte', 'dateTime', 'date', 'boolean',
+]}
+
+# Solution modifiers which conflict with keyset pagination
+KEYSET_CONFLICTS = {'GROUP', 'HAVING', 'ORDER', 'LIMIT', 'OFFSET', 'VALUES'}
+# Solution modifiers which conflict with LIMIT/OFFSET pagination
+OFFSET_CONFLICTS = {'LIMIT', 'OFFSET', 'VALUES'}
+
+Cursor = namedtuple('Cursor', ['offset', 'key'], defaults=(0, None))
+Cursor.__doc__ = """
+Position in a paginated result: the number of rows handed out and, for
+keyset pagination, the values of the sort key of the last of them in
+SPARQL JSON form. It may be stored as JSON and restored by Cursor(**data).
+"""
+
+
+def split_query(query):
+    """
+    Splits a SELECT query at the closing brace of its WHERE clause
+    :return: Tuple of the query up to the brace, the rest of the query
+        and the keywords of the solution modifiers in the rest
+    :raises: PaginationError if the query is no SELECT query
+    """
+    depth = 0
+    select = False
+    end = None
+    modifiers = []
+    position = 0
+    while position < len(query):
+        match = TOKEN_PATTERN.match(query, position)
+        if match is None:
+            raise PaginationError('Cannot tokenize query at: ' + query[position:position + 20])
+        kind, text = match.lastgroup, match.group()
+        if end is not None:
+            if kind == 'word':
+                modifiers.append(text.upper())
+        elif kind == 'word' and depth == 0 and text.upper() == 'SELECT':
+            select = True
+        elif kind == 'punct' and text == '{':
+            depth += 1
+        elif kind == 'punct' and text == '}':
+            depth -= 1
+            if depth == 0:
+                end = match.start()
+        position = match.end()
+    if not select or end is None:
+        raise PaginationError('Only SELECT queries can be paginated')
+    return query[:end], query[end:], modifiers
+
+
+def sparql_term(term):
+    """
+    A term in SPARQL JSON form in the syntax of a SPARQL query
+    :raises: PaginationError for blank nodes, whose labels cannot be referred to
+    """
+    if term['type'] == 'uri':
+        return '<{}>'.format(term['value'])
+    if term['type'] in ('literal', 'typed-literal'):
+        literal = '"{}"'.format(escape_literal(term['value']))
+        if 'xml:lang' in term:
+            return literal + '@' + term['xml:lang']
+        if term.get('datatype'):
+            return literal + '^^<{}>'.format(term['datatype'])
+        return literal
+    raise PaginationError('Terms of type {} cannot be part of a sort key'.format(term['type']))
+
+
+def sort_key(term):
+    """
+    Sortable stand-in of a term in SPARQL JSON form following the order of
+    ORDER BY as far as the keyset FILTER relies on it: IRIs before literals,
+    numeric literals by value, other literals by their lexical form.
+    """
+    if term['type'] == 'uri':
+        return 1, 0, 0.0, term['value']
+    if term.get('datatype') in ORDERED_DATATYPES:
+        try:
+            return 2, 0, float(term['value']), ''
+        except ValueError:
+            return 2, 1, 0.0, term['value']
+    return 2, 2, 0.0, term['value']
+
+
+def _after(variable, term):
+    """Filter expression matching the values of the variable sorted after the term"""
+    term_syntax = sparql_term(term)
+    if term['type'] == 'uri':
+        # IRIs sort before literals
+        return '(isLiteral({0}) || (isIRI({0}) && STR({0}) > "{1}"))'.format(
+            variable, escape_literal(term['value']))
+    if term['type'] in ('literal', 'typed-literal') and term.get('datatype') in ORDERED_DATATYPES:
+        return '({} > {})'.format(variable, term_syntax)
+    return '(isLiteral({0}) && STR({0}) > "{1}")'.format(variable, escape_literal(term['value']))
+
+
+def keyset_filter(order_by, key):
+    """
+    FILTER selecting the rows of the key and those sorted after it
+    :param order_by: Names of the sort variables
+    :param key: Values of the sort variables of the last row in SPARQL JSON form
+    """
+    alternatives = []
+    for index, (name, term) in enumerate(zip(order_by, key)):
+        conditions = ['sameTerm(?{}, {})'.format(previous, sparql_term(value))
+                      for previous, value in zip(order_by[:index], key[:index])]
+        conditions.append(_after('?' + name, term))
+        alternatives.append('(' + ' && '.join(conditions) + ')')
+    alternatives.append('(' + ' && '.join('sameTerm(?{}, {})'.format(name, sparql_term(value))
+                                          for name, value in zip(order_by, key)) + ')')
+    return 'FILTER ({})'.format(' || '.join(alternatives))
+
+
+def offset_page(query, limit, offset):
+    """
+    The query restricted to one page by LIMIT and OFFSET
+    :raises: PaginationError if the query has a LIMIT, OFFSET or trailing VALUES clause
+    """
+    head, tail, modifiers = split_query(query)
+    conflicts = OFFSET_CONFLICTS.intersection(modifiers)
+    if conflicts:
+        raise PaginationError('Cannot paginate a query with {}'.format(', '.join(sorted(conflicts))))
+    page = '{}{}\nLIMIT {}'.format(head, tail.rstrip(), limit)
+    if offset:
+        page += ' OFFSET {}'.format(offset)
+    return page
+
+
+def keyset_page(query, order_by, key, limit):
+    """
+    The query restricted to the page starting at the key by a FILTER, ordered by the sort variables
+    :raises: PaginationError if the query has solution modifiers
+    """
+    head, tail, modifiers = split_query(query)
+    conflicts = KEYSET_CONFLICTS.intersection(modifiers)
+    if conflicts:
+        raise PaginationError('Cannot paginate a query with {} by keyset'.format(', '.join(sorted(conflicts))))
+    if key is not None:
+        head = '{}\n{}\n'.format(head.rstrip(), keyset_filter(order_by, key))
+    return '{}{}\nORDER BY {}\nLIMIT {}'.format(
+        head, tail.rstrip(), ' '.join('?' + name for name in order_by), limit)
+
+
+class PaginatedQuery:
+    """
+    Iterates over the rows of a SELECT query fetched page by page:
+
+        pages = rdf4j.paginated_query('repo', query, page_size=5000, order_by=['s'])
+        try:
+            for binding in pages:
+                ...
+        except QueryFailed:
+            saved = pages.cursor
+
+        for binding in rdf4j.paginated_query('repo', query, page_size=5000, order_by=['s'], cursor=saved):
+            ...
+
+    Iterating again over the same instance also resumes from its cursor.
+    Without sort key pages are addressed by LIMIT/OFFSET. This is only
+    stable if the query has an ORDER BY clause or the repository does
+    not change meanwhile. With sort key the variables must be bound in
+    every row and identify the rows uniquely, e.g. ['s', 'p', 'o'],
+    otherwise PaginationError is raised.
+    """
+
+    def __init__(self, api, query, page_size=DEFAULT_PAGE_SIZE, order_by=None, cursor=None, auth=None,
+                 result_format='json', prefetch=True):
+        """
+        :param api: API of the repository to query
+        :param query: The SELECT query, without LIMIT and OFFSET
+        :param page_size: (optional) Number of rows per page
+        :param order_by: (optional) Names of the variables to paginate by keyset on
+        :param cursor: (optional) Cursor to resume from
+        :param result_format: (optional) 'json', 'tsv', 'binary' or, without sort key, 'csv'
+        :param prefetch: (optional) Fetch the next page in the background
+        """
+        if result_format not in RESULT_MIME_TYPES:
+            raise ValueError('Unknown result format {}'.format(result_format))
+        if order_by and result_format == 'csv':
+            raise ValueError('The csv result format carries no term types for the sort key')
+        if page_size < 1:
+            raise ValueError('The page size must be positive')
+        self.api = api
+        self.query = query
+        self.page_size = page_size
+        self.order_by = list(order_by) if order_by else None
+        self.cursor = cursor if cursor is not None else Cursor()
+        self.auth = auth
+        self.result_format = result_format
+        self.prefetch = prefetch
+        self.pages = 0
+
+        # Checks the query up front rather than on the first page
+        self.page_query(self.cursor)
+
+    def page_query(self, cursor):
+        """The query of the page starting at the cursor"""
+        if self.order_by:
+            # Past the first page the row of the key comes again
+            limit = self.page_size if cursor.key is None else self.page_size + 1
+            return keyset_page(self.query, self.order_by, cursor.key, limit)
+        return offset_page(self.query, self.page_size, cursor.offset)
+
+    def fetch(self, cursor):
+        """
+        Fetches the page starting at the cursor
+        :return: List of bindings
+        :raises: PaginationError if the page does not continue after the cursor
+        """
+        response = self.api.stream_query(
+            self.page_query(cursor), mime_type=RESULT_MIME_TYPES[self.result_format], auth=self.auth)
+        try:
+            if self.result_format == 'json':
+                # A page is bounded, decoding it at once is faster than streaming
+                rows = json.loads(response.raw.read())['results']['bindings']
+            else:
+                rows = list(iter_bindings(response.raw, self.result_format))
+        finally:
+            response.close()
+        if self.order_by:
+            rows = self.check_keys(cursor, rows)
+        if len(rows) > self.page_size:
+            raise PaginationError('The server ignored the LIMIT of the page')
+        return rows
+
+    def check_keys(self, cursor, rows):
+        """
+        Drops the row of the cursor from the start of a keyset page and checks
+        that the page continues after the key of the cursor without repeating keys
+        :raises: PaginationError if keys repeat or the page starts before the cursor
+        """
+        previous = cursor.key
+        if previous is not None and rows:
+            first = self.key(rows[0])
+            if first == previous:
+                rows = rows[1:]
+            elif [sort_key(term) for term in first] < [sort_key(term) for term in previous]:
+                raise PaginationError('Page does not continue after the key {}, '
+                                      'the server ignored the FILTER'.format(previous))
+            else:
+                # The row of the key was removed meanwhile, the extra row belongs to the next page
+                rows = rows[:self.page_size]
+        for row in rows:
+            key = self.key(row)
+            if key == previous:
+                raise PaginationError('Sort key {} is not unique: {}'.format(self.order_by, key))
+            previous = key
+        return rows
+
+    def advance(self, cursor, rows):
+        """The cursor after the rows"""
+        return Cursor(cursor.offset + len(rows), self.key(rows[-1]) if rows else cursor.key)
+
+    def key(self, row):
+        if not self.order_by:
+            return None
+        try:
+            return [row[name] for name in self.order_by]
+        except KeyError as error:
+            raise PaginationError('Sort variable {} is not bound'.format(error.args[0]))
+
+    def __iter__(self):
+        executor = ThreadPoolExecutor(max_workers=1) if self.prefetch else None
+        future = None
+        cursor = self.cursor
+        try:
+            rows = self.fetch(cursor)
+            while True:
+                self.pages += 1
+                last = len(rows) < self.page_size
+                following = self.advance(cursor, rows)
+                if not last and executor is not None:
+                    future = executor.submit(self.fetch, following)
+                for index, row in enumerate(rows, 1):
+                    self.cursor = Cursor(cursor.offset + index, self.key(row))
+                    yield row
+                if last:
+                    return
+                if future is not None:
+                    rows, future = future.result(), None
+                else:
+                    rows = self.fetch(following)
+                cursor = following
+        finally:
+            if future is not None:
+                future.cancel()
+            if executor is not None:
+                executor.shutdown(wait=False)
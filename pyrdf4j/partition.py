@@ -0,0 +1,389 @@
+"""
+Partitioning of one logical dataset across several repositories
+by the hash of the statement subjects.
+
+Statements of the same subject always land in the same partition,
+so queries whose triple patterns all share one subject (star queries)
+are answered by querying every partition and merging the results.
+"""
+import hashlib
+import json
+import re
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from pyrdf4j.bulk_loader import BulkLoader
+from pyrdf4j.constants import DEFAULT_PARTITIONS, DEFAULT_BATCH_SIZE
+from pyrdf4j.errors import QueryNotPartitionable
+
+TOKEN_PATTERN = re.compile(r'''
+    (?P<ws>\s+)
+  | (?P<iri><[^<>"{}|^`\\\s]*>)
+  | (?P<string>"""(?:[^"\\]|\\.|"(?!""))*"""|\'\'\'(?:[^'\\]|\\.|'(?!''))*\'\'\'
+        |"(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*')
+  | (?P<comment>\#[^\n]*)
+  | (?P<var>[?$][A-Za-z0-9_]+)
+  | (?P<bnode>_:[A-Za-z0-9_.-]+)
+  | (?P<pname>(?:[A-Za-z][\w.-]*)?:[\w.:%-]*)
+  | (?P<number>[+-]?(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][+-]?[0-9]+)?)
+  | (?P<word>[A-Za-z][\w-]*)
+  | (?P<punct>\^\^|<<|>>|&&|\|\||!=|<=|>=|[{}().;,\[\]|/^*+?!=<>@-])
+''', re.X)
+
+# Graph patterns which may combine statements of different subjects
+UNSUPPORTED_KEYWORDS = {'GRAPH', 'UNION', 'MINUS', 'SERVICE', 'VALUES', 'SELECT', 'EXISTS', 'NOT'}
+# Solution modifiers which cannot be applied to merged partial results
+UNSUPPORTED_MODIFIERS = {'ORDER', 'OFFSET', 'GROUP', 'HAVING', 'VALUES'}
+
+TERM_KINDS = ('iri', 'pname', 'var', 'bnode')
+
+StarQuery = namedtuple('StarQuery', ['subject', 'distinct', 'limit'])
+
+
+def tokenize(query):
+    """Splits a SPARQL query into (kind, text) tokens, dropping whitespace and comments"""
+    tokens = []
+    position = 0
+    while position < len(query):
+        match = TOKEN_PATTERN.match(query, position)
+        if match is None:
+            raise QueryNotPartitionable('Cannot tokenize query at: ' + query[position:position + 20])
+        position = match.end()
+        if match.lastgroup not in ('ws', 'comment'):
+            tokens.append((match.lastgroup, match.group()))
+    return tokens
+
+
+class StarQueryParser:
+    """
+    Checks that a SELECT query only consists of triple patterns,
+    FILTERs, BINDs and OPTIONALs sharing a single subject.
+    """
+
+    def __init__(self, query):
+        self.tokens = tokenize(query)
+        self.position = 0
+        self.prefixes = {}
+        self.subjects = set()
+
+    def peek(self):
+        if self.position < len(self.tokens):
+            return self.tokens[self.position]
+        return None, None
+
+    def next(self):
+        token = self.peek()
+        if token[0] is None:
+            raise QueryNotPartitionable('Unexpected end of query')
+        self.position += 1
+        return token
+
+    def expect(self, text):
+        kind, value = self.next()
+        if value.upper() != text:
+            raise QueryNotPartitionable('Expected {} instead of {}'.format(text, value))
+
+    def keyword(self):
+        kind, value = self.peek()
+        if kind == 'word':
+            return value.upper()
+        return None
+
+    def skip_parentheses(self):
+        self.expect('(')
+        depth = 1
+        while depth:
+            kind, value = self.next()
+            if kind == 'punct' and value == '(':
+                depth += 1
+            elif kind == 'punct' and value == ')':
+                depth -= 1
+            elif kind == 'word' and value.upper() in UNSUPPORTED_KEYWORDS:
+                raise QueryNotPartitionable('{} is not supported'.format(value))
+
+    def term(self, kind, value):
+        """Normalizes a subject term, expanding prefixed names"""
+        if kind == 'pname':
+            prefix, local = value.split(':', 1)
+            if prefix not in self.prefixes:
+                raise QueryNotPartitionable('Unknown prefix ' + prefix)
+            return '<' + self.prefixes[prefix] + local + '>'
+        if kind == 'var':
+            return '?' + value[1:]
+        return value
+
+    def parse(self):
+        """
+        :return: StarQuery
+        :raises: QueryNotPartitionable
+        """
+        while self.keyword() in ('PREFIX', 'BASE'):
+            if self.next()[1].upper() == 'PREFIX':
+                prefix = self.next()[1]
+                self.prefixes[prefix[:-1]] = self.next()[1][1:-1]
+            else:
+                self.next()
+
+        self.expect('SELECT')
+        distinct = self.keyword() in ('DISTINCT', 'REDUCED')
+        if distinct:
+            self.next()
+        while True:
+            kind, value = self.peek()
+            if value == '{' or self.keyword() in ('WHERE', 'FROM'):
+                break
+            if value == '(':
+                raise QueryNotPartitionable('Projection expressions are not supported')
+            self.next()
+        while self.keyword() == 'FROM':
+            self.next()
+            if self.keyword() == 'NAMED':
+                self.next()
+            self.next()
+        if self.keyword() == 'WHERE':
+            self.next()
+        self.expect('{')
+        self.group()
+
+        limit = None
+        while self.peek()[0] is not None:
+            keyword = self.keyword()
+            if keyword == 'LIMIT':
+                self.next()
+                limit = int(self.next()[1])
+            else:
+                raise QueryNotPartitionable('Solution modifier {} is not supported'.format(self.next()[1]))
+
+        if len(self.subjects) != 1:
+            raise QueryNotPartitionable('Triple patterns do not share a single subject')
+        return StarQuery(self.subjects.pop(), distinct, limit)
+
+    def group(self):
+        """Parses a group graph pattern after its opening brace"""
+        while True:
+            kind, value = self.next()
+            if value == '}':
+                return
+            if value == '.':
+                continue
+            if kind == 'word' and value.upper() == 'FILTER':
+                if self.peek()[1] != '(':
+                    self.next()
+                self.skip_parentheses()
+            elif kind == 'word' and value.upper() == 'BIND':
+                self.skip_parentheses()
+            elif kind == 'word' and value.upper() == 'OPTIONAL':
+                self.expect('{')
+                self.group()
+            elif kind in TERM_KINDS:
+                self.subjects.add(self.term(kind, value))
+                self.predicate_object_list()
+            else:
+                raise QueryNotPartitionable('{} is not supported'.format(value))
+
+    def predicate_object_list(self):
+        while True:
+            kind, value = self.next()
+            if kind not in TERM_KINDS and value != 'a':
+                raise QueryNotPartitionable('Unsupported predicate ' + value)
+            if self.peek()[1] in ('/', '|', '*', '+', '?', '^'):
+                raise QueryNotPartitionable('Property paths are not supported')
+            self.object()
+            while self.peek()[1] == ',':
+                self.next()
+                self.object()
+            if self.peek()[1] != ';':
+                return
+            while self.peek()[1] == ';':
+                self.next()
+            if self.peek()[1] in ('.', '}'):
+                return
+
+    def object(self):
+        kind, value = self.next()
+        if kind == 'string':
+            if self.peek()[1] == '@':
+                self.next()
+                self.next()
+                while self.peek()[1] == '-':
+                    self.next()
+                    self.next()
+            elif self.peek()[1] == '^^':
+                self.next()
+                self.next()
+        elif kind in TERM_KINDS or kind == 'number' or value in ('true', 'false'):
+            pass
+        else:
+            raise QueryNotPartitionable('Unsupported object ' + value)
+
+
+def parse_star_query(query):
+    """
+    Checks that the query is a star shaped SELECT query.
+    :return: StarQuery with the shared subject (a variable or an IRI in
+        N-Triples syntax), whether the query is DISTINCT and its LIMIT
+    :raises: QueryNotPartitionable
+    """
+    return StarQueryParser(query).parse()
+
+
+def subject_of_line(line):
+    """The subject of a N-Triples or N-Quads line in N-Triples syntax"""
+    if line.startswith(b'<<'):
+        return line[:line.index(b'>>') + 2]
+    if line.startswith(b'<'):
+        return line[:line.index(b'>') + 1]
+    return line.split(None, 1)[0]
+
+
+class PartitionedLoader(BulkLoader):
+    """
+    Bulk loader routing every statement by its subject into the
+    batches of the partition it belongs to.
+    """
+
+    def __init__(self, dataset, **kwargs):
+        super().__init__(dataset.rdf4j, None, **kwargs)
+        self.dataset = dataset
+
+    def iter_batches(self, lines):
+        """Yields tuples of (number of statements, batch data, repository ID)"""
+        count = len(self.dataset.repo_ids)
+        batches = [[] for i in range(count)]
+        sizes = [0] * count
+        statements = [0] * count
+        for line in lines:
+            if isinstance(line, str):
+                line = line.encode('utf8')
+            if not line.endswith(b'\n'):
+                line += b'\n'
+            stripped = line.strip()
+            if not stripped or stripped.startswith(b'#'):
+                continue
+            index = self.dataset.partition_index(subject_of_line(stripped))
+            batches[index].append(line)
+            sizes[index] += len(line)
+            statements[index] += 1
+            if sizes[index] >= self.batch_size:
+                yield statements[index], b''.join(batches[index]), self.dataset.repo_ids[index]
+                batches[index] = []
+                sizes[index] = 0
+                statements[index] = 0
+        for index in range(count):
+            if statements[index]:
+                yield statements[index], b''.join(batches[index]), self.dataset.repo_ids[index]
+
+
+class PartitionedDataset:
+    """
+    One logical dataset split by subject hash into several repositories
+    named '<name>_<index>'. With a ShardedRDF4J as facade the partitions
+    are spread across several servers.
+
+    Notice: Blank nodes are scoped to their partition, so a blank node
+    used as object is not joined with the statements of the same
+    blank node as subject in another partition.
+    """
+
+    def __init__(self, rdf4j, name, partitions=DEFAULT_PARTITIONS):
+        """
+        :param rdf4j: RDF4J or ShardedRDF4J facade
+        :param name: Name of the dataset, prefix of the repository IDs
+        :param partitions: (optional) Number of partitions
+        """
+        self.rdf4j = rdf4j
+        self.name = name
+        self.repo_ids = ['{}_{}'.format(name, index) for index in range(partitions)]
+
+    def partition_index(self, subject):
+        """
+        :param subject: Subject in N-Triples syntax, e.g. '<http://example.org/s>'
+        :return: Index of the partition holding the statements of the subject
+        """
+        if isinstance(subject, str):
+            subject = subject.encode('utf8')
+        digest = hashlib.md5(subject).digest()
+        return int.from_bytes(digest[:8], 'big') % len(self.repo_ids)
+
+    def partition_of(self, subject):
+        """ID of the repository holding the statements of the subject"""
+        return self.repo_ids[self.partition_index(subject)]
+
+    def _map(self, function, repo_ids):
+        with ThreadPoolExecutor(max_workers=len(repo_ids)) as executor:
+            return list(executor.map(function, repo_ids))
+
+    def create(self, repo_type='memory', auth=None, accept_existing=False, **kwargs):
+        """Creates the repositories of all partitions"""
+        return self._map(
+            lambda repo_id: self.rdf4j.create_repository(
+                repo_id, repo_type=repo_type, auth=auth, accept_existing=accept_existing, **kwargs),
+            self.repo_ids)
+
+    def drop(self, auth=None, accept_not_exist=False):
+        """Drops the repositories of all partitions"""
+        return self._map(
+            lambda repo_id: self.rdf4j.drop_repository(repo_id, auth=auth, accept_not_exist=accept_not_exist),
+            self.repo_ids)
+
+    def empty(self, auth=None):
+        """Removes all statements of all partitions"""
+        return self._map(lambda repo_id: self.rdf4j.empty_repository(repo_id, auth=auth), self.repo_ids)
+
+    def load(self, lines, content_type='application/n-triples', auth=None, workers=None,
+             batch_size=DEFAULT_BATCH_SIZE, **kwargs):
+        """
+        Routes N-Triples or N-Quads by subject into the partitions,
+        loading the batches of all partitions concurrently.
+        :param lines: Iterable of lines, e.g. a file opened in binary mode
+        :param workers: (optional) Number of batches committed in parallel,
+            one per partition by default
+        :param kwargs: (optional) Further parameters of the BulkLoader
+        :return: LoadStatistics
+        :raises: BulkLoadError if a batch could not be committed
+        """
+        if workers is None:
+            workers = len(self.repo_ids)
+        loader = PartitionedLoader(
+            self,
+            content_type=content_type,
+            auth=auth,
+            workers=workers,
+            batch_size=batch_size,
+            **kwargs
+        )
+        return loader.load(lines)
+
+    def query(self, query, auth=None):
+        """
+        Evaluates a star shaped SELECT query on the partitions in parallel
+        and merges the results. Queries for a fixed subject IRI only go to
+        its partition.
+        :return: The results in the SPARQL JSON structure
+        :raises: QueryNotPartitionable if the patterns do not share one subject
+            or the query uses solution modifiers other than DISTINCT and LIMIT
+        """
+        star = parse_star_query(query)
+        if star.subject.startswith('<'):
+            repo_ids = [self.partition_of(star.subject)]
+        else:
+            repo_ids = self.repo_ids
+
+        results = self._map(lambda repo_id: self.rdf4j.query_repository(repo_id, query, auth=auth), repo_ids)
+
+        bindings = []
+        seen = set()
+        for result in results:
+            for binding in result['results']['bindings']:
+                if star.distinct:
+                    key = json.dumps(binding, sort_keys=True)
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                bindings.append(binding)
+        if star.limit is not None:
+            bindings = bindings[:star.limit]
+        return {
+            'head': results[0]['head'],
+            'results': {'bindings': bindings},
+        }
@@ -1,16 +1,27 @@
 import json
-import sys
-import traceback
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from http import HTTPStatus
 
 import requests
 
 from pyrdf4j.api_repo import APIRepo
-from pyrdf4j.constants import DEFAULT_QUERY_RESPONSE_MIME_TYPE, DEFAULT_RESPONSE_TRIPLE_MIME_TYPE
+from pyrdf4j.binary_rdf import iter_binary_rdf, iter_binary_rdf_statements
+from pyrdf4j.binary_results import read_binary_results
+from pyrdf4j.bulk_loader import BulkLoader
+from pyrdf4j.constants import DEFAULT_QUERY_RESPONSE_MIME_TYPE, DEFAULT_RESPONSE_TRIPLE_MIME_TYPE, \
+    DEFAULT_CHUNK_SIZE, DEFAULT_BULK_LOAD_WORKERS, DEFAULT_BATCH_SIZE, BINARY_RDF_MIME_TYPE, \
+    DEFAULT_COPY_WORKERS, DEFAULT_PROVISION_WORKERS, LINE_BASED_MIME_TYPES, DEFAULT_PAGE_SIZE
 from pyrdf4j.errors import URINotReachable, TerminatingError, BulkLoadError, \
-    CreateRepositoryAlreadyExists, CreateRepositoryError, DropRepositoryError
+    CreateRepositoryAlreadyExists, CreateRepositoryError, DropRepositoryError, QueryFailed, SyncError
+from pyrdf4j.harvester import SourceDownload
+from pyrdf4j.pagination import PaginatedQuery
 from pyrdf4j.server import Server, Transaction
 from pyrdf4j.repo_types import repo_config_factory
+from pyrdf4j.results import RESULT_MIME_TYPES, iter_bindings
+from pyrdf4j.sync import ContextSync, iter_lines
+from pyrdf4j.util import is_gzip_source, iter_gunzip
+from pyrdf4j.validators import NOT_MODIFIED, UNCHANGED_CONTENT, SkippedSource, content_hash, iter_hashed
 
 
 class RDF4J:
@@ -18,18 +29,54 @@ class RDF4J:
     High level API to the RDF4J
     """
 
-    def __init__(self, rdf4j_base=None, api=APIRepo):
+    def __init__(self, rdf4j_base=None, api=APIRepo, auth=None, query_cache=None, validator_store=None,
+                 **server_params):
+        """
+        :param rdf4j_base: (optional) Base URI of the RDF4J server
+        :param api: (optional) API class used to access the repositories
+        :param auth: (optional) Default credentials for all requests to the server
+        :param query_cache: (optional) QueryCache for query results. Writes through
+            this instance invalidate the cached results of the repository.
+        :param validator_store: (optional) ValidatorStore making bulk_load_from_uri
+            skip sources which did not change since they were loaded
+        :param server_params: (optional) Connection pool parameters passed on to the Server.
+            Read replicas are given as replicas=[base URI, ...] or as a ReplicaSet.
+        """
 
-        self.server = Server(rdf4j_base)
+        self.server = Server(rdf4j_base, auth=auth, **server_params)
         self.api_class = api
         self.apis = {}
+        self._apis_lock = threading.Lock()
+        self.query_cache = query_cache
+        self.validator_store = validator_store
 
     def get_api(self, repo_id, repo_uri=None):
-        if repo_id in self.apis:
-            pass
-        else:
-            self.apis[repo_id] = self.api_class(self.server, repo_id, repo_uri=repo_uri)
-        return self.apis[repo_id]
+        """
+        The API of the repository. The APIs are cached and do not keep
+        per call state, so they may be used from many threads at once.
+        """
+        with self._apis_lock:
+            if repo_id in self.apis:
+                pass
+            else:
+                self.apis[repo_id] = self.api_class(self.server, repo_id, repo_uri=repo_uri, cache=self.query_cache)
+            return self.apis[repo_id]
+
+    def transaction(self, repo_id, auth=None, repo_uri=None):
+        """
+        Groups many add, delete, update and query operations on the
+        repository into one transaction:
+
+            with rdf4j.transaction('repo', auth=auth) as transaction:
+                transaction.add(triple_data, 'text/turtle')
+                transaction.update('DELETE WHERE {?s <http://example.org/p> ?o}')
+
+        The transaction is committed on exit and rolled back on exceptions.
+        :param repo_id: ID of the repository
+        :return: RepositoryTransaction
+        """
+        api = self.get_api(repo_id, repo_uri=repo_uri)
+        return api.transaction(auth=auth)
 
     def bulk_load_from_uri(
             self,
@@ -40,6 +87,11 @@ class RDF4J:
             repo_uri=None,
             auth=None,
             base_uri=None,
+            stream=False,
+            gunzip=None,
+            chunk_size=DEFAULT_CHUNK_SIZE,
+            context=None,
+            conditional=True,
     ):
         """
         Load the triple_data from the harvest uri
@@ -47,37 +99,201 @@ class RDF4J:
         :param repo_id:
         :param target_uri:
         :param content_type:
-        :return:
+        :param stream: (optional) If enabled the triple_data is not buffered
+            but passed chunk by chunk from the harvest uri to the triplestore
+        :param gunzip: (optional) Decompress a gzip source on the fly.
+            If None, gzip sources are detected by media type or '.gz' suffix
+        :param chunk_size: (optional) Size of the chunks in streaming mode
+        :param context: (optional) IRI of the named graph to load into.
+            Together with clear_repository only this graph is replaced.
+        :param conditional: (optional) Skip the source if the validator store
+            knows it unchanged, by a conditional GET or by the hash of its content.
+            The content hash is only compared before the load if the source is buffered.
+        :return: the response, or a SkippedSource if the source did not change
         """
+        source = self.fetch_source(repo_id, target_uri, stream=stream, gunzip=gunzip, chunk_size=chunk_size,
+                                   context=context, conditional=conditional)
+        if isinstance(source, SkippedSource):
+            return source
+        return self.load_source(repo_id, source, content_type, clear_repository=clear_repository,
+                                repo_uri=repo_uri, auth=auth, base_uri=base_uri, context=context)
+
+    def fetch_source(
+            self,
+            repo_id,
+            target_uri,
+            stream=False,
+            gunzip=None,
+            chunk_size=DEFAULT_CHUNK_SIZE,
+            context=None,
+            conditional=True,
+            timeout=None,
+    ):
+        """
+        GETs the harvest uri, the first half of bulk_load_from_uri
+        :param repo_id: ID of the repository the source is loaded into
+        :param timeout: (optional) Seconds to wait for the connection and for each read
+        :return: SourceDownload to be passed on to load_source,
+            or a SkippedSource if the source did not change
+        """
+        validators = self.validator_store if conditional else None
+        headers = {}
+        if validators is not None:
+            headers = validators.conditional_headers(target_uri, repo_id, context)
 
         # Load the triple_data from the harvest target_uri
         try:
-            response = requests.get(target_uri)
-        except requests.exceptions.ConnectionError as e:
-            exc_type, exc_value, exc_traceback = sys.exc_info()
-            # todo: Logger
-            print("GET termiated due to error %s %s" % (exc_type, exc_value))
-            for line in traceback.format_tb(exc_traceback):
-                print("Traceback:%s" % line[:-1])
+            response = requests.get(target_uri, stream=stream, headers=headers, timeout=timeout)
+        except requests.exceptions.ConnectionError as error:
             raise URINotReachable(
-                'Database not reachable. Tried GET on {uri}'.format(uri=target_uri))
+                'Database not reachable. Tried GET on {uri}'.format(uri=target_uri)) from error
+        if validators is not None and response.status_code == HTTPStatus.NOT_MODIFIED:
+            response.close()
+            return validators.skip(target_uri, repo_id, NOT_MODIFIED)
         if response.status_code != HTTPStatus.OK:
-            raise URINotReachable(response.content)
-        triple_data = response.content
-
+            try:
+                # The body of a streamed response is gone once it is closed
+                raise URINotReachable(response.content)
+            finally:
+                response.close()
+
+        if gunzip is None:
+            gunzip = is_gzip_source(target_uri, response)
+
+        digest = content_hash()
+        if stream:
+            # A generator as request body is send chunked
+            triple_data = response.iter_content(chunk_size=chunk_size)
+            if validators is not None:
+                triple_data = iter_hashed(triple_data, digest)
+            if gunzip:
+                triple_data = iter_gunzip(triple_data)
+        else:
+            triple_data = response.content
+            if validators is not None:
+                digest.update(triple_data)
+                known = validators.get(target_uri, repo_id, context)
+                if known is not None and known['sha256'] == digest.hexdigest():
+                    # Remember the new ETag and Last-Modified of the unchanged content
+                    validators.update(target_uri, repo_id, response, digest.hexdigest(), context=context)
+                    response.close()
+                    return validators.skip(target_uri, repo_id, UNCHANGED_CONTENT)
+            if gunzip:
+                triple_data = b''.join(iter_gunzip([triple_data]))
+
+        return SourceDownload(target_uri, response, triple_data, digest, validators=validators)
+
+    def load_source(
+            self,
+            repo_id,
+            source,
+            content_type,
+            clear_repository=False,
+            repo_uri=None,
+            auth=None,
+            base_uri=None,
+            context=None,
+    ):
+        """
+        Pushes a fetched source into the triplestore, the second half of bulk_load_from_uri
+        :param source: SourceDownload returned by fetch_source
+        :return: the response
+        """
         api = self.get_api(repo_id, repo_uri=repo_uri)
 
-        if clear_repository:
-            return api.replace_triple_data_in_repo(triple_data, content_type, auth=auth, base_uri=base_uri)
-
-        #        response = self.create_repository(repo_id, auth=auth)
-        #        if response.status_code == HTTPStatus.CONFLICT:
-        #            if b'REPOSITORY EXISTS' in response.content:
-        #                pass
-        #        elif response.status_code != HTTPStatus.OK:
-        #            raise TerminatingError
+        try:
+            if clear_repository:
+                result = api.replace_triple_data_in_repo(
+                    source.triple_data, content_type, auth=auth, base_uri=base_uri, context=context)
+            else:
+                result = api.add_triple_data_to_repo(
+                    source.triple_data, content_type, auth=auth, base_uri=base_uri, context=context)
+            if source.validators is not None:
+                source.validators.update(source.uri, repo_id, source.response, source.digest.hexdigest(),
+                                         context=context)
+            return result
+        finally:
+            source.close()
+
+    def bulk_load(
+            self,
+            repo_id,
+            lines,
+            content_type='application/n-triples',
+            repo_uri=None,
+            auth=None,
+            workers=DEFAULT_BULK_LOAD_WORKERS,
+            batch_size=DEFAULT_BATCH_SIZE,
+            **kwargs,
+    ):
+        """
+        Load N-Triples or N-Quads in size bounded batches,
+        each committed in its own transaction by a pool of workers.
+        :param repo_id: ID of the repository to load into
+        :param lines: Iterable of lines, e.g. a file opened in binary mode
+        :param content_type: (optional) A line based RDF media type
+        :param workers: (optional) Number of batches committed in parallel
+        :param batch_size: (optional) Initial batch size in bytes
+        :param kwargs: (optional) Further parameters of the BulkLoader
+        :return: LoadStatistics with the aggregated throughput
+        :raises: BulkLoadError if a batch could not be committed
+        """
+        loader = BulkLoader(
+            self,
+            repo_id,
+            content_type=content_type,
+            repo_uri=repo_uri,
+            auth=auth,
+            workers=workers,
+            batch_size=batch_size,
+            **kwargs
+        )
+        return loader.load(lines)
+
+    def sync_from_uri(
+            self,
+            repo_id,
+            target_uri,
+            content_type='application/n-triples',
+            context=None,
+            repo_uri=None,
+            auth=None,
+            gunzip=None,
+            chunk_size=DEFAULT_CHUNK_SIZE,
+    ):
+        """
+        Harvests the uri and brings the stored copy of the source up to date
+        by adding and removing only the changed statements in one transaction.
+        :param content_type: (optional) A line based RDF media type of the source
+        :param context: (optional) IRI of the context holding the copy, the target_uri by default
+        :param gunzip: (optional) Decompress a gzip source on the fly.
+            If None, gzip sources are detected by media type or '.gz' suffix
+        :return: SyncStatistics
+        :raises: SyncError if the source is not line based
+        """
+        if content_type not in LINE_BASED_MIME_TYPES:
+            raise SyncError('Content type {} is not line based'.format(content_type))
+        if context is None:
+            context = target_uri
 
-        return api.add_triple_data_to_repo(triple_data, content_type, auth=auth, base_uri=base_uri)
+        try:
+            response = requests.get(target_uri, stream=True)
+        except requests.exceptions.ConnectionError:
+            raise URINotReachable(
+                'Database not reachable. Tried GET on {uri}'.format(uri=target_uri))
+        try:
+            if response.status_code != HTTPStatus.OK:
+                raise URINotReachable(response.content)
+            if gunzip is None:
+                gunzip = is_gzip_source(target_uri, response)
+            chunks = response.iter_content(chunk_size=chunk_size)
+            if gunzip:
+                chunks = iter_gunzip(chunks)
+
+            api = self.get_api(repo_id, repo_uri=repo_uri)
+            return ContextSync(api, context, auth=auth).sync(iter_lines(chunks))
+        finally:
+            response.close()
 
     def graph_from_uri(self,
                        repository_id,
@@ -89,18 +305,31 @@ class RDF4J:
                        overwrite=False,
                        accept_existing=True,
                        clear_repository=False,
+                       stream=False,
+                       gunzip=None,
+                       context=None,
+                       sync=False,
                        **kwargs):
         """
         :param repository_id:
         :param uri:
         :param content_type:
         :param clear_repository:
-        :return:
+        :param stream: (optional) Pass the triple_data through without buffering it
+        :param gunzip: (optional) Decompress a gzip source on the fly
+        :param context: (optional) IRI of the named graph to load into
+        :param sync: (optional) Only send the changes against the stored copy of a
+            line based source, kept in the context or a context named by the uri
+        :return: the response, SyncStatistics in sync mode
         """
         self.create_repository(repository_id, accept_existing=accept_existing, repo_type=repo_type,
                                repo_label=repo_label, auth=auth, overwrite=overwrite, **kwargs)
+        if sync:
+            return self.sync_from_uri(repository_id, target_uri, content_type, context=context, auth=auth,
+                                      gunzip=gunzip)
         response = self.bulk_load_from_uri(
-            repository_id, target_uri, content_type, clear_repository=clear_repository, auth=auth)
+            repository_id, target_uri, content_type, clear_repository=clear_repository, auth=auth,
+            stream=stream, gunzip=gunzip, context=context)
         return response
 
     def create_repository(self,
@@ -157,6 +386,60 @@ class RDF4J:
 
         return response
 
+    def create_repositories(self, repo_ids, repo_type='memory', auth=None, workers=DEFAULT_PROVISION_WORKERS,
+                            **kwargs):
+        """
+        Creates many repositories concurrently.
+        :param repo_ids: IDs of the repositories to create
+        :param repo_type: (Optional) Configuration template type name
+        :param workers: (Optional) Number of repositories created in parallel
+        :param kwargs: Further parameters of create_repository,
+            e.g. accept_existing or template parameters
+        :return: Dict of the repository IDs to the response, or to the
+            exception if the creation failed
+        """
+        return self._provision(
+            lambda repo_id: self.create_repository(repo_id, repo_type=repo_type, auth=auth, **kwargs),
+            repo_ids,
+            workers)
+
+    def drop_repositories(self, repo_ids, accept_not_exist=False, auth=None, workers=DEFAULT_PROVISION_WORKERS):
+        """
+        Drops many repositories concurrently.
+        :return: Dict of the repository IDs to the response, or to the
+            exception if the drop failed
+        """
+        return self._provision(
+            lambda repo_id: self.drop_repository(repo_id, accept_not_exist=accept_not_exist, auth=auth),
+            repo_ids,
+            workers)
+
+    @staticmethod
+    def _provision(operation, repo_ids, workers):
+        def run(repo_id):
+            try:
+                return operation(repo_id)
+            except Exception as e:
+                return e
+
+        repo_ids = list(repo_ids)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return dict(zip(repo_ids, executor.map(run, repo_ids)))
+
+    def list_repositories(self, auth=None):
+        """
+        :return: IDs of the repositories of the server, without the SYSTEM repository
+        """
+        headers = {'Accept': DEFAULT_QUERY_RESPONSE_MIME_TYPE}
+        response = self.server.get(self.server.RDF4J_base + 'repositories', headers=headers, auth=auth)
+        if response.status_code != HTTPStatus.OK:
+            raise QueryFailed(response.content)
+        return [
+            binding['id']['value']
+            for binding in json.loads(response.content)['results']['bindings']
+            if binding['id']['value'] != 'SYSTEM'
+        ]
+
     def drop_repository(self, repo_id, accept_not_exist=False, auth=None):
         """
         :param repo_id: ID of the repository to drop
@@ -167,6 +450,8 @@ class RDF4J:
         api = self.get_api(repo_id)
 
         response = api.drop_repository(auth=auth)
+        if self.validator_store is not None:
+            self.validator_store.forget_repository(repo_id)
         if response.status_code in [HTTPStatus.NO_CONTENT]:
             return response
         elif response.status_code in [HTTPStatus.NOT_FOUND]:
@@ -196,17 +481,96 @@ class RDF4J:
                                auth=auth,
                                repo_type=repo_type)
 
+        responses = self.copy_repository(source_repository, target_repository, auth=auth)
+
+        return responses[0]
+
+    def copy_statements(self, source_repository, target_repository, contexts=None, auth=None,
+                        chunk_size=DEFAULT_CHUNK_SIZE, target_rdf4j=None):
+        """
+        Streams statements from the source repository into a transaction
+        on the target repository, preserving their contexts. The statements
+        are passed through in binary RDF chunk by chunk, so memory use
+        does not depend on the size of the repository.
+        :param contexts: (optional) Restrict the copy to these contexts.
+            None in the list denotes the default graph.
+        :param target_rdf4j: (optional) RDF4J instance of another server
+            holding the target repository
+        :return: response of the target repository
+        """
+        if target_rdf4j is None:
+            target_rdf4j = self
         api_source = self.get_api(source_repository)
-        triple_data = api_source.query_repository("CONSTRUCT {?s ?o ?p} WHERE {?s ?o ?p}",
-                                                  auth=auth,
-                                                  mime_type=DEFAULT_RESPONSE_TRIPLE_MIME_TYPE)
-        api_target = self.get_api(target_repository)
-        response = api_target.add_triple_data_to_repo(
-            triple_data,
-            DEFAULT_RESPONSE_TRIPLE_MIME_TYPE,
-            auth=auth)
+        api_target = target_rdf4j.get_api(target_repository)
 
-        return response
+        response = api_source.stream_statements(mime_type=BINARY_RDF_MIME_TYPE, auth=auth, contexts=contexts)
+        try:
+            return api_target.add_triple_data_to_repo(
+                response.iter_content(chunk_size=chunk_size),
+                BINARY_RDF_MIME_TYPE,
+                auth=auth)
+        finally:
+            response.close()
+
+    def copy_repository(self, source_repository, target_repository, auth=None, per_context=False,
+                        workers=DEFAULT_COPY_WORKERS, target_rdf4j=None):
+        """
+        Copies all statements with their contexts from the source
+        into the target repository with bounded memory.
+        :param source_repository: ID of the repository to copy from
+        :param target_repository: ID of the repository to copy into
+        :param per_context: (optional) Copy every context in a transaction
+            of its own, running up to workers copies in parallel
+        :param workers: (optional) Number of contexts copied in parallel
+        :param target_rdf4j: (optional) RDF4J instance of another server
+            holding the target repository
+        :return: List of the responses of the target repository, one per transfer
+        """
+        if not per_context:
+            return [self.copy_statements(source_repository, target_repository, auth=auth,
+                                         target_rdf4j=target_rdf4j)]
+
+        contexts = [None] + self.get_api(source_repository).get_contexts(auth=auth)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(self.copy_statements, source_repository, target_repository,
+                                contexts=[context], auth=auth, target_rdf4j=target_rdf4j)
+                for context in contexts
+            ]
+            return [future.result() for future in futures]
+
+    def export_statements(self, repo_id, query=None, auth=None, repo_uri=None):
+        """
+        Streams statements in binary RDF and yields them one by one
+        as tuples of (subject, predicate, object, context).
+        :param repo_id: ID of the repository to export from
+        :param query: (optional) CONSTRUCT query selecting the statements.
+            If omitted all statements of the repository are exported.
+        :return: Generator of statements with the terms in SPARQL JSON form
+        """
+        api = self.get_api(repo_id, repo_uri=repo_uri)
+
+        if query is None:
+            response = api.stream_statements(mime_type=BINARY_RDF_MIME_TYPE, auth=auth)
+        else:
+            response = api.stream_query(query, mime_type=BINARY_RDF_MIME_TYPE, auth=auth)
+        try:
+            for statement in iter_binary_rdf_statements(response.raw):
+                yield statement
+        finally:
+            response.close()
+
+    def import_statements(self, repo_id, statements, auth=None, repo_uri=None):
+        """
+        Encodes the statements in binary RDF on the fly and adds them to the repository.
+        :param repo_id: ID of the repository to import into
+        :param statements: Iterable of (subject, predicate, object[, context])
+            tuples with the terms in SPARQL JSON form
+        :return: response
+        """
+        api = self.get_api(repo_id, repo_uri=repo_uri)
+
+        return api.add_triple_data_to_repo(iter_binary_rdf(statements), BINARY_RDF_MIME_TYPE, auth=auth)
 
     def get_turtle_from_query(self, repo_id, query, auth=None):
         """
@@ -242,32 +606,121 @@ class RDF4J:
 
         return api.query_repository(query, mime_type=mime_type, auth=auth)
 
-    def empty_repository(self, repository, auth=None):
+    def empty_repository(self, repository, auth=None, contexts=None, reset=False):
         """
         :param repository:
+        :param contexts: (optional) Only clear these contexts.
+            None in the list denotes the default graph. An empty list
+            clears nothing, no request is sent and None is returned.
+        :param reset: (optional) Drop and re-create the repository instead
+            of deleting its statements
         :return:
         """
         # self.create_repository(repository, auth=auth)
         api = self.get_api(repository)
-        return api.empty_repository(auth=auth)
+        if self.validator_store is not None:
+            self.validator_store.forget_repository(repository)
+        return api.empty_repository(auth=auth, contexts=contexts, reset=reset)
 
-    def query_repository(self, repo_id, query, auth=None):
+    def query_repository(self, repo_id, query, auth=None, result_format='json'):
+        """
+        :param repo_id: ID of the repository to query
+        :param query: The SELECT query
+        :param result_format: (optional) Transfer format of the results, 'json' or 'binary'.
+            The binary results table is more compact and faster to decode.
+        :return: The results in the SPARQL JSON structure
+        """
         api = self.get_api(repo_id)
 
+        if result_format == 'binary':
+            response = api.stream_query(query, mime_type=RESULT_MIME_TYPES['binary'], auth=auth)
+            try:
+                return read_binary_results(response.raw)
+            finally:
+                response.close()
+
         res = api.query_repository(query, auth=auth)
 
         json_data = json.loads(res)
 
         return json_data
 
+    def iter_query(self, repo_id, query, auth=None, result_format='json', repo_uri=None):
+        """
+        Streams the results of a SELECT query and yields the bindings row by row.
+        Memory use does not depend on the number of rows.
+        :param repo_id: ID of the repository to query
+        :param query: The SELECT query
+        :param result_format: (optional) 'json' (requires ijson), 'tsv', 'csv' or 'binary'
+        :return: Generator of the bindings in SPARQL JSON form (plain strings for csv)
+        """
+        if result_format not in RESULT_MIME_TYPES:
+            raise ValueError('Unknown result format {}'.format(result_format))
+
+        api = self.get_api(repo_id, repo_uri=repo_uri)
+
+        response = api.stream_query(query, mime_type=RESULT_MIME_TYPES[result_format], auth=auth)
+        try:
+            for binding in iter_bindings(response.raw, result_format):
+                yield binding
+        finally:
+            response.close()
+
+    def paginated_query(self, repo_id, query, page_size=DEFAULT_PAGE_SIZE, order_by=None, cursor=None, auth=None,
+                        result_format='json', prefetch=True, repo_uri=None):
+        """
+        Fetches the results of a SELECT query page by page, each page by a
+        query of its own, and iterates over them as one sequence of bindings.
+        The next page is fetched in the background while the current one is consumed.
+        :param repo_id: ID of the repository to query
+        :param query: The SELECT query, without LIMIT and OFFSET
+        :param page_size: (optional) Number of rows per page
+        :param order_by: (optional) Names of variables identifying the rows uniquely.
+            Pages are then selected by keyset (rows after the last key) instead of LIMIT/OFFSET.
+        :param cursor: (optional) Cursor of an interrupted iteration to resume from
+        :param result_format: (optional) 'json', 'tsv', 'binary' or, without order_by, 'csv'
+        :param prefetch: (optional) Fetch the next page in the background
+        :return: PaginatedQuery, iterable over the bindings, its cursor attribute
+            holding the position after the last binding handed out
+        """
+        api = self.get_api(repo_id, repo_uri=repo_uri)
+        return PaginatedQuery(api, query, page_size=page_size, order_by=order_by, cursor=cursor, auth=auth,
+                              result_format=result_format, prefetch=prefetch)
+
     def add_data_to_repo(
             self,
             repo_id,
             triple_data,
             content_type,
             repo_uri=None,
-            auth=None):
+            auth=None,
+            context=None):
+
+        api = self.get_api(repo_id, repo_uri=repo_uri)
+
+        return api.add_triple_data_to_repo(triple_data, content_type, auth=auth, context=context)
+
+    def get_graph(self, repo_id, graph=None, mime_type=None, auth=None, repo_uri=None):
+        """
+        Fetches the statements of one graph by the Graph Store protocol
+        :param graph: (optional) IRI of the named graph, the default graph if None
+        :return: The statements as bytes
+        """
+        api = self.get_api(repo_id, repo_uri=repo_uri)
+        return api.get_graph(graph=graph, mime_type=mime_type, auth=auth)
 
+    def put_graph(self, repo_id, triple_data, content_type, graph=None, auth=None, repo_uri=None):
+        """
+        Replaces the statements of one graph by the Graph Store protocol
+        :param graph: (optional) IRI of the named graph, the default graph if None
+        """
         api = self.get_api(repo_id, repo_uri=repo_uri)
+        return api.put_graph(triple_data, content_type, graph=graph, auth=auth)
 
-        return api.add_triple_data_to_repo(triple_data, content_type, auth=auth)
+    def delete_graph(self, repo_id, graph=None, auth=None, repo_uri=None):
+        """
+        Removes one graph by the Graph Store protocol
+        :param graph: (optional) IRI of the named graph, the default graph if None
+        """
+        api = self.get_api(repo_id, repo_uri=repo_uri)
+        return api.delete_graph(graph=graph, auth=auth)
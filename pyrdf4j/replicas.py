@@ -0,0 +1,157 @@
+"""
+Routing of read requests across read-only replicas of a RDF4J server
+"""
+import threading
+import time
+from collections import deque
+
+from pyrdf4j.constants import DEFAULT_REPLICA_FAILURE_THRESHOLD, DEFAULT_REPLICA_DOWN_SECONDS, \
+    DEFAULT_LATENCY_WINDOW, DEFAULT_HEDGE_MIN_SAMPLES
+
+
+class Replica:
+    """A read-only replica and its health"""
+
+    def __init__(self, base):
+        """
+        :param base: Base URI of the replica, e.g. 'http://replica:8080/rdf4j-server/'
+        """
+        self.base = base
+        self.outstanding = 0
+        self.failures = 0
+        self.down_until = 0.0
+        self.requests = 0
+        self.errors = 0
+
+    @property
+    def healthy(self):
+        return self.down_until <= time.monotonic()
+
+    def stats(self):
+        return {
+            'base': self.base,
+            'healthy': self.healthy,
+            'outstanding': self.outstanding,
+            'requests': self.requests,
+            'errors': self.errors,
+        }
+
+
+class ReplicaSet:
+    """
+    Thread-safe set of read replicas.
+
+    Requests go to the healthy replica with the fewest outstanding requests.
+    A replica failing failure_threshold times in a row, by a connection
+    error, a server error or a latency above max_latency, is marked down
+    for down_seconds and tried again afterwards.
+
+    With hedge_percentile set, a read still running after that percentile
+    of the recent latencies is repeated on a second replica and the first
+    answer is used.
+
+    Replicas lag behind the primary, so reads routed to them may not see
+    the latest writes.
+    """
+
+    def __init__(
+            self,
+            bases,
+            failure_threshold=DEFAULT_REPLICA_FAILURE_THRESHOLD,
+            down_seconds=DEFAULT_REPLICA_DOWN_SECONDS,
+            max_latency=None,
+            hedge_percentile=None,
+            hedge_min_samples=DEFAULT_HEDGE_MIN_SAMPLES,
+            latency_window=DEFAULT_LATENCY_WINDOW,
+    ):
+        """
+        :param bases: Base URIs of the replicas
+        :param failure_threshold: (optional) Consecutive failures marking a replica down
+        :param down_seconds: (optional) Seconds a replica stays down
+        :param max_latency: (optional) Seconds after which a response counts as failure
+        :param hedge_percentile: (optional) Latency percentile (0-100) after which
+            a read is hedged to a second replica. None disables hedging.
+        :param hedge_min_samples: (optional) Latencies needed before hedging starts
+        :param latency_window: (optional) Number of recent latencies kept
+        """
+        self.replicas = [Replica(base) for base in bases]
+        self.failure_threshold = failure_threshold
+        self.down_seconds = down_seconds
+        self.max_latency = max_latency
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.latencies = deque(maxlen=latency_window)
+        self.hedged = 0
+        self._lock = threading.Lock()
+
+    def choose(self, exclude=()):
+        """
+        Reserves the healthy replica with the fewest outstanding requests.
+        The caller has to report the outcome by finish.
+        :param exclude: (optional) Replicas already tried
+        :return: The Replica or None if no healthy replica is left
+        """
+        with self._lock:
+            candidates = [
+                replica for replica in self.replicas
+                if replica.healthy and replica not in exclude
+            ]
+            if not candidates:
+                return None
+            replica = min(candidates, key=lambda candidate: candidate.outstanding)
+            replica.outstanding += 1
+            replica.requests += 1
+            return replica
+
+    def finish(self, replica, latency, ok):
+        """
+        Records the outcome of a request to the replica
+        :param latency: Seconds the request took
+        :param ok: False on connection or server errors
+        """
+        with self._lock:
+            replica.outstanding -= 1
+            if ok:
+                self.latencies.append(latency)
+            if ok and (self.max_latency is None or latency <= self.max_latency):
+                replica.failures = 0
+                return
+            replica.errors += 1
+            replica.failures += 1
+            if replica.failures >= self.failure_threshold:
+                self._mark_down(replica)
+
+    def mark_down(self, replica):
+        with self._lock:
+            self._mark_down(replica)
+
+    def _mark_down(self, replica):
+        replica.down_until = time.monotonic() + self.down_seconds
+        replica.failures = 0
+
+    def mark_up(self, replica):
+        with self._lock:
+            replica.down_until = 0.0
+            replica.failures = 0
+
+    def count_hedge(self):
+        with self._lock:
+            self.hedged += 1
+
+    def hedge_delay(self):
+        """Seconds after which a read is hedged, None if hedging is off"""
+        if self.hedge_percentile is None:
+            return None
+        with self._lock:
+            if len(self.latencies) < self.hedge_min_samples:
+                return None
+            latencies = sorted(self.latencies)
+        index = min(len(latencies) - 1, int(len(latencies) * self.hedge_percentile / 100))
+        return latencies[index]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hedged': self.hedged,
+                'replicas': [replica.stats() for replica in self.replicas],
+            }
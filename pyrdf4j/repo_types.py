@@ -1,8 +1,11 @@
 """
 Repository configurations templates. Like the Server workbench offers.
 """
+import string
+from functools import lru_cache
+from types import MappingProxyType
 
-from pyrdf4j.errors import RepositoryTypeUnknown
+from pyrdf4j.errors import RepositoryTypeUnknown, RepositoryTemplateError
 
 from pathlib import Path
 
@@ -37,7 +40,7 @@ REPO_TYPES = [
 
 # Default parameter values for the templates.
 # Please consult the Server documentation on details to these parameters.
-DEFAULTS = {
+DEFAULTS = MappingProxyType({
     'persist': 'false',
     'iterationCacheSyncThreshold': 10000,
     'evaluationStrategyFactory':
@@ -52,7 +55,69 @@ DEFAULTS = {
     'rule_query': 'This is bogus',
     'matcher_query': 'This is bogus',
     'force_sync': 'true',
-}
+})
+
+# Parameters every template receives besides the DEFAULTS
+IDENTITY_PARAMS = ('repo_id', 'repo_label')
+
+
+class TemplateRegistry:
+    """
+    The repository configuration templates, read and validated once.
+    The registry is immutable and may be shared between threads.
+    """
+
+    def __init__(self, folder=TEMPLATE_FOLDER, repo_types=REPO_TYPES, defaults=DEFAULTS):
+        """
+        :param folder: (optional) Folder holding the '<repo_type>.ttl' templates
+        :param repo_types: (optional) Names of the templates to load
+        :param defaults: (optional) Default values of the template parameters
+        :raises: RepositoryTemplateError if a template is missing or
+            uses a parameter without default value
+        """
+        self.defaults = MappingProxyType(dict(defaults))
+        templates = {}
+        fields = {}
+        for repo_type in repo_types:
+            template_path = Path(folder) / '{}{}'.format(repo_type, '.ttl')
+            try:
+                with open(template_path) as template_file:
+                    template = template_file.read()
+            except OSError as e:
+                raise RepositoryTemplateError('Cannot read template {}: {}'.format(template_path, e))
+            names = frozenset(
+                name for literal, name, spec, conversion in string.Formatter().parse(template)
+                if name is not None
+            )
+            unknown = names - set(self.defaults) - set(IDENTITY_PARAMS)
+            if unknown:
+                raise RepositoryTemplateError(
+                    'Template {} uses parameters without default: {}'.format(repo_type, ', '.join(sorted(unknown))))
+            templates[repo_type] = template
+            fields[repo_type] = names
+        self.templates = MappingProxyType(templates)
+        self.fields = MappingProxyType(fields)
+
+    def render(self, repo_type, repo_id, repo_label, **kwargs):
+        """
+        Fills the template of the repo_type
+        :param kwargs: Parameters overriding the defaults for this call only
+        :return: The configuration as TTL
+        :raises: RepositoryTypeUnknown
+        """
+        if repo_type not in self.templates:
+            raise RepositoryTypeUnknown(repo_type)
+        params = dict(self.defaults)
+        params.update(kwargs)
+        params['repo_id'] = repo_id.replace('-', '_')
+        params['repo_label'] = repo_label
+        return self.templates[repo_type].format(**params)
+
+
+@lru_cache(maxsize=None)
+def template_registry():
+    """The shared TemplateRegistry of the bundled templates, loaded on first use"""
+    return TemplateRegistry()
 
 
 def repo_config_factory(repo_type, repo_id, repo_label, **kwargs):
@@ -64,17 +129,4 @@ def repo_config_factory(repo_type, repo_id, repo_label, **kwargs):
     # Check if the repo_type is a known template
     if repo_type not in REPO_TYPES:
         raise RepositoryTypeUnknown
-    # Get the path to the template
-    template_path = TEMPLATE_FOLDER / '{}{}'.format(repo_type, '.ttl')
-    # Open the template file and read it
-    with open(template_path) as template_file:
-        template = template_file.read()
-
-    # get the default values for the template
-    params = DEFAULTS
-    # Overwrite them with the given kwargs
-    params.update(kwargs)
-    # Fill the params in the template
-    ttl = template.format(repo_id=repo_id.replace('-', '_'), repo_label=repo_label, **params)
-    # return the final TTL
-    return ttl
+    return template_registry().render(repo_type, repo_id, repo_label, **kwargs)
@@ -0,0 +1,154 @@
+"""
+Streaming parsers for SPARQL SELECT results.
+
+All parsers yield one binding per row in the shape of the SPARQL JSON
+results format, e.g. {'s': {'type': 'uri', 'value': 'http://example.org'}}.
+Only the CSV format, which carries no term types, yields plain strings.
+"""
+import csv
+import io
+import re
+
+from pyrdf4j.binary_results import MIME_TYPE as BINARY_MIME_TYPE, iter_binary_bindings
+
+try:
+    import ijson
+except ImportError:  # pragma: no cover
+    ijson = None
+
+XSD = 'http://www.w3.org/2001/XMLSchema#'
+
+# Result formats of a SELECT query and their media types
+RESULT_MIME_TYPES = {
+    'json': 'application/sparql-results+json',
+    'tsv': 'text/tab-separated-values',
+    'csv': 'text/csv',
+    'binary': BINARY_MIME_TYPE,
+}
+
+ESCAPES = {
+    't': '\t',
+    'b': '\b',
+    'n': '\n',
+    'r': '\r',
+    'f': '\f',
+    '"': '"',
+    "'": "'",
+    '\\': '\\',
+}
+
+ESCAPE_PATTERN = re.compile(r'\\(u[0-9A-Fa-f]{4}|U[0-9A-Fa-f]{8}|.)')
+
+INTEGER_PATTERN = re.compile(r'^[+-]?[0-9]+$')
+DECIMAL_PATTERN = re.compile(r'^[+-]?[0-9]*\.[0-9]+$')
+DOUBLE_PATTERN = re.compile(r'^[+-]?([0-9]+(\.[0-9]*)?|\.[0-9]+)[eE][+-]?[0-9]+$')
+
+
+def unescape(value):
+    """Resolves the escape sequences of a N-Triples string"""
+    def replace(match):
+        escape = match.group(1)
+        if escape[0] in 'uU':
+            return chr(int(escape[1:], 16))
+        return ESCAPES.get(escape, escape)
+
+    if '\\' not in value:
+        return value
+    return ESCAPE_PATTERN.sub(replace, value)
+
+
+def parse_term(term):
+    """
+    Translates a RDF term in N-Triples syntax as used by the TSV
+    results format into its SPARQL JSON form.
+    Returns None for an empty (unbound) term.
+    """
+    if not term:
+        return None
+    if term.startswith('<<'):
+        return {'type': 'triple', 'value': term}
+    if term.startswith('<') and term.endswith('>'):
+        return {'type': 'uri', 'value': unescape(term[1:-1])}
+    if term.startswith('_:'):
+        return {'type': 'bnode', 'value': term[2:]}
+    if term.startswith('"'):
+        end = term.rindex('"')
+        result = {'type': 'literal', 'value': unescape(term[1:end])}
+        suffix = term[end + 1:]
+        if suffix.startswith('@'):
+            result['xml:lang'] = suffix[1:]
+        elif suffix.startswith('^^<'):
+            result['datatype'] = suffix[3:-1]
+        return result
+    # Abbreviated literals
+    if term in ('true', 'false'):
+        return {'type': 'literal', 'value': term, 'datatype': XSD + 'boolean'}
+    if INTEGER_PATTERN.match(term):
+        return {'type': 'literal', 'value': term, 'datatype': XSD + 'integer'}
+    if DECIMAL_PATTERN.match(term):
+        return {'type': 'literal', 'value': term, 'datatype': XSD + 'decimal'}
+    if DOUBLE_PATTERN.match(term):
+        return {'type': 'literal', 'value': term, 'datatype': XSD + 'double'}
+    return {'type': 'literal', 'value': term}
+
+
+def iter_json_bindings(stream):
+    """
+    Yields the bindings of a SPARQL JSON result read
+    incrementally from the file like stream.
+    """
+    if ijson is None:
+        raise ImportError(
+            'Streaming the JSON results format requires the ijson package. '
+            'Install it or use the tsv or csv result format.')
+    for binding in ijson.items(stream, 'results.bindings.item'):
+        yield binding
+
+
+def iter_tsv_bindings(stream):
+    """
+    Yields the bindings of a SPARQL TSV result read
+    line by line from the text stream.
+    """
+    names = None
+    for line in stream:
+        line = line.rstrip('\r\n')
+        if names is None:
+            names = [name.lstrip('?$') for name in line.split('\t')]
+            continue
+        binding = {}
+        for name, term in zip(names, line.split('\t')):
+            value = parse_term(term)
+            if value is not None:
+                binding[name] = value
+        yield binding
+
+
+def iter_csv_bindings(stream):
+    """
+    Yields the bindings of a SPARQL CSV result read
+    row by row from the text stream. The values are plain strings.
+    """
+    names = None
+    for row in csv.reader(stream):
+        if names is None:
+            names = row
+            continue
+        yield {name: value for name, value in zip(names, row) if value != ''}
+
+
+def iter_bindings(stream, result_format):
+    """
+    Yields the bindings read from the binary file like stream
+    in the given result format ('json', 'tsv', 'csv' or 'binary').
+    """
+    if result_format == 'json':
+        return iter_json_bindings(stream)
+    if result_format == 'binary':
+        return iter_binary_bindings(stream)
+    text = io.TextIOWrapper(stream, encoding='utf8', newline='')
+    if result_format == 'tsv':
+        return iter_tsv_bindings(text)
+    if result_format == 'csv':
+        return iter_csv_bindings(text)
+    raise ValueError('Unknown result format {}'.format(result_format))
@@ -1,24 +1,35 @@
 # -*- coding: utf-8 -*-
 """RDF4J Rest-API access"""
 import sys
+import threading
+import time
 import traceback
+from concurrent.futures import ThreadPoolExecutor, TimeoutError, wait, FIRST_COMPLETED
 from http import HTTPStatus
 
 import requests
+import requests.adapters
 
+from pyrdf4j.compression import CompressionStatistics, UPLOAD, DOWNLOAD, iter_gzip, count_decoded
 from pyrdf4j.constants import RDF4J_BASE, DEFAULT_CONTENT_TYPE, DEFAULT_QUERY_MIME_TYPE, \
-    DEFAULT_QUERY_RESPONSE_MIME_TYPE
-from pyrdf4j.errors import CannotStartTransaction, CannotCommitTransaction, TerminatingError, \
-    CannotRollbackTransaction, QueryFailed, DataBaseNotReachable
+    DEFAULT_QUERY_RESPONSE_MIME_TYPE, DEFAULT_POOL_CONNECTIONS, DEFAULT_POOL_MAXSIZE, DEFAULT_CHARSET, \
+    DEFAULT_COMPRESS_LEVEL
+from pyrdf4j.errors import CannotStartTransaction, CannotCommitTransaction, CannotRollbackTransaction, \
+    QueryFailed, DataBaseNotReachable
+from pyrdf4j.metrics import RequestRecord, describe_request, COMMIT, ROLLBACK, FAILED
+from pyrdf4j.replicas import ReplicaSet
 
 
 class Transaction():
     """
     Decorator to brace a transaction around a triple store operation.
-    It is required that the repository target_uri is the
-    first arg (after self) of the decorated function
+    The transaction URI is passed to the decorated function as
+    keyword argument transaction_uri. The API object itself is not
+    altered, so it may be shared between threads.
+    If the caller passes a transaction_uri of its own, the operation
+    joins that transaction and leaves commit and rollback to the caller.
     Returns: The response to the actual triple store operation
-    Raises: Raises TerminatingError if a rollback was necessary
+    Raises: Reraises the error of the operation after rolling back
 
     """
 
@@ -29,40 +40,36 @@ class Transaction():
         def wrapper(*args, **kwargs):
             # get the self of the caller
             caller_self = args[0]
+            # join a running transaction
+            if kwargs.get('transaction_uri') is not None:
+                return func(*args, **kwargs)
             # get auth information
             if 'auth' in kwargs:
                 auth = kwargs['auth']
             else:
                 auth = None
-            # get the repo_uri from the server id
-            uri = caller_self.uri
-            repo_uri = caller_self.repo_uri
             # open a transaction for the repo_uri and retrieve the transaction target_uri
-            transaction_uri = caller_self.server.start_transaction(uri, auth=auth)
-            caller_self.uri = transaction_uri
-            caller_self.repo_uri = transaction_uri
-            # Watch for exceptions in the operation.
-            # Wrong return codes have to raise TerminatingError
-            # to trigger a rollback
+            transaction_uri = caller_self.server.start_transaction(caller_self.repo_uri, auth=auth)
+            kwargs['transaction_uri'] = transaction_uri
+            # Watch for exceptions in the operation. Wrong return codes raise
+            # TerminatingError, streamed bodies may fail with any exception
+            # while they are read, e.g. on a broken source connection.
             try:
                 # do the actual database operation and remember the response.
-                # Notice the replacement of the repo_uri by the transaction_uri
-                response = func(caller_self, *args[1:], **kwargs)
-            except TerminatingError as e:
-                # I case of a terminating error roll back the transaction
+                response = func(*args, **kwargs)
+            except BaseException:
+                # Roll back, so no transaction is left open on the server
                 try:
                     caller_self.server.rollback(transaction_uri, auth=auth)
                 except CannotRollbackTransaction:
                     pass
-                caller_self.uri = uri
-                caller_self.repo_uri = repo_uri
                 # Reraise the original error
-                raise e
+                raise
 
             # commit the transaction
             caller_self.server.commit(transaction_uri, auth=auth)
-            caller_self.uri = uri
-            caller_self.repo_uri = repo_uri
+            # The committed changes outdate cached query results
+            caller_self.invalidate_cache()
 
             # Return the response to the actual database operation
             return response
@@ -70,128 +77,358 @@ class Transaction():
         return wrapper
 
 
+def _close_response(future):
+    """Releases the connection of the response of a superseded hedged request"""
+    if future.exception() is None:
+        future.result().close()
+
+
 class Server:
     """
-    Represent a RDF4J server instance
-    """
+    Represent a RDF4J server instance.
+
+    All requests to the server share one pool of keep-alive connections.
+    Every thread gets its own requests session, but all sessions are mounted
+    on the same connection adapter, so an instance may be shared between
+    threads and by all APIs created by the RDF4J facade.
+
+    Read-only replicas of the server may be given. Reads sent by the
+    read method are then spread across them, while writes and
+    transactions stay on the primary server at RDF4J_base.
+
+    With compression enabled, uploads flagged by compress=True are sent
+    gzip encoded and the compression of all transfers is accounted in
+    the compression statistics. Responses are always requested with
+    Accept-Encoding and decoded while they are read.
 
-    def __init__(self, RDF4J_base=None):
+    Instruments, e.g. a MetricsCollector, are notified before and after
+    every request and when transactions start and finish. Without
+    instruments the requests are sent without any bookkeeping.
+    """
 
+    def __init__(
+            self,
+            RDF4J_base=None,
+            auth=None,
+            pool_connections=DEFAULT_POOL_CONNECTIONS,
+            pool_maxsize=DEFAULT_POOL_MAXSIZE,
+            max_retries=0,
+            replicas=None,
+            compress=False,
+            compress_level=DEFAULT_COMPRESS_LEVEL,
+            instruments=None,
+    ):
+        """
+        :param RDF4J_base: (optional) Base URI of the RDF4J server
+        :param auth: (optional) Default credentials used if a request brings no auth of its own
+        :param pool_connections: (optional) Number of per host connection pools to cache
+        :param pool_maxsize: (optional) Maximal number of keep-alive connections per host
+        :param max_retries: (optional) Number of retries on failed connection attempts
+        :param replicas: (optional) Base URIs of read-only replicas or a ReplicaSet
+        :param compress: (optional) Send uploads gzip encoded. The server, or a proxy
+            in front of it, has to accept the Content-Encoding of request bodies.
+        :param compress_level: (optional) zlib level of the compression
+        :param instruments: (optional) List of Instrumentation instances
+        """
         self.repository_uris = {}
         if RDF4J_base is not None:
             self.RDF4J_base = RDF4J_base
         else:
             self.RDF4J_base = RDF4J_BASE
 
-    @staticmethod
-    def get(uri, **params):
-        """Low level GET request"""
+        self.auth = auth
+        self.adapter = requests.adapters.HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=max_retries,
+        )
+        self._local = threading.local()
+
+        if replicas is not None and not isinstance(replicas, ReplicaSet):
+            replicas = ReplicaSet(replicas)
+        self.replicas = replicas
+        # Runs the competing requests of hedged reads
+        self._hedge_executor = ThreadPoolExecutor() if replicas is not None else None
+
+        self.compress = compress
+        self.compress_level = compress_level
+        self.compression = CompressionStatistics()
+
+        self.instruments = list(instruments or [])
+
+    @property
+    def session(self):
+        """The requests session of the current thread"""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.mount('http://', self.adapter)
+            session.mount('https://', self.adapter)
+            session.headers['Connection'] = 'keep-alive'
+            session.auth = self.auth
+            self._local.session = session
+        return session
+
+    def close(self):
+        """Close all pooled connections"""
+        if self._hedge_executor is not None:
+            self._hedge_executor.shutdown(wait=False)
+        self.adapter.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.close()
+
+    def request(self, method, uri, compress=False, **params):
+        """
+        Low level request utilizing the connection pool
+        :param compress: (optional) The data is an upload to be sent compressed,
+            if compression is enabled for the server
+        """
+        if compress and self.compress and params.get('data') is not None:
+            params = self._compress_body(uri, params)
+        if self.instruments:
+            return self._instrumented_request(method, uri, params)
+        return self._send(method, uri, params)
+
+    def _send(self, method, uri, params):
         try:
-            response = requests.get(uri, params=params['data'], **params)
-            return response
+            response = self.session.request(method, uri, **params)
         except requests.exceptions.ConnectionError as e:
             exc_type, exc_value, exc_traceback = sys.exc_info()
             # todo: Logger
-            print("GET termiated due to error %s %s" % (exc_type, exc_value))
+            print("%s termiated due to error %s %s" % (method, exc_type, exc_value))
             for line in traceback.format_tb(exc_traceback):
                 print("Traceback:%s" % line[:-1])
             raise DataBaseNotReachable(
-                'Database not reachable. Tried GET on {uri} with params {params}'.format(
+                'Database not reachable. Tried {method} on {uri} with params {params}'.format(
+                    method=method,
                     uri=uri,
                     params=params
                 )
             )
+        if self.compress and response.headers.get('Content-Encoding', '').lower() in ['gzip', 'deflate']:
+            self._account_response(uri, response, params.get('stream', False))
+        return response
 
-    @staticmethod
-    def post(uri, **params):
-        """Low level POST request"""
+    def _instrumented_request(self, method, uri, params):
+        """Sends the request, reporting it to the instruments"""
+        record = RequestRecord(method, uri, *describe_request(method, uri, params.get('params')))
+        data = params.get('data')
+        if isinstance(data, (bytes, bytearray, str)):
+            record.bytes_sent = len(data)
+        elif data is not None and not isinstance(data, dict):
+            params = dict(params, data=self._count_sent(record, data))
+
+        states = [instrument.before_request(record) for instrument in self.instruments]
         try:
-            response = requests.post(uri, **params)
+            response = self._send(method, uri, params)
+        except Exception as error:
+            record.error = error
+            raise
+        else:
+            record.status = response.status_code
+            if params.get('stream'):
+                record.bytes_received = int(response.headers.get('Content-Length') or 0)
+            else:
+                record.bytes_received = len(response.content)
             return response
-        except requests.exceptions.ConnectionError as e:
-            exc_type, exc_value, exc_traceback = sys.exc_info()
-            # todo: Logger
-            print("POST termiated due to error %s %s" % (exc_type, exc_value))
-            for line in traceback.format_tb(exc_traceback):
-                print("Traceback:%s" % line[:-1])
-            raise DataBaseNotReachable(
-                'Database not reachable. Tried POST on {uri} with params {params}'.format(
-                    uri=uri,
-                    params=params
-                )
-            )
+        finally:
+            record.seconds = time.monotonic() - record.start
+            for instrument, state in zip(self.instruments, states):
+                instrument.after_request(record, state)
 
     @staticmethod
-    def put(uri, **params):
+    def _count_sent(record, chunks):
+        for chunk in chunks:
+            record.bytes_sent += len(chunk)
+            yield chunk
+
+    def _notify_transaction(self, hook, transaction_uri, *args):
+        repository = describe_request('PUT', transaction_uri)[0]
+        for instrument in self.instruments:
+            getattr(instrument, hook)(transaction_uri, repository, *args)
+
+    def _compress_body(self, uri, params):
+        """Replaces the data by a gzip encoding stream of it"""
+        params = dict(params)
+        headers = dict(params.get('headers') or {})
+        charset = DEFAULT_CHARSET
+        for header, value in headers.items():
+            if header.lower() == 'content-type' and 'charset=' in value:
+                charset = value.split('charset=', 1)[1].split(';')[0].strip()
+
+        def record(raw_bytes, wire_bytes):
+            self.compression.record(UPLOAD, uri, raw_bytes, wire_bytes)
+
+        headers['Content-Encoding'] = 'gzip'
+        params['headers'] = headers
+        params['data'] = iter_gzip(params['data'], level=self.compress_level, charset=charset, on_done=record)
+        return params
+
+    def _account_response(self, uri, response, stream):
+        """Records the compression of a response, a streamed one as soon as it is closed"""
+        def record(raw_bytes, wire_bytes):
+            self.compression.record(DOWNLOAD, uri, raw_bytes, wire_bytes)
+
+        if stream:
+            count_decoded(response, record)
+        else:
+            record(len(response.content), response.raw.tell())
+
+    def get(self, uri, **params):
+        """Low level GET request. The data is sent as query parameters."""
+        if 'params' not in params:
+            params['params'] = params.pop('data', None)
+        return self.request('GET', uri, **params)
+
+    def post(self, uri, **params):
+        """Low level POST request"""
+        return self.request('POST', uri, **params)
+
+    def put(self, uri, **params):
         """Low level PUT request"""
-        try:
-            response = requests.put(uri, **params)
-            return response
-        except requests.exceptions.ConnectionError as e:
-            exc_type, exc_value, exc_traceback = sys.exc_info()
-            # todo: Logger
-            print("PUT termiated due to error %s %s" % (exc_type, exc_value))
-            for line in traceback.format_tb(exc_traceback):
-                print("Traceback:%s" % line[:-1])
-            raise DataBaseNotReachable(
-                'Database not reachable. Tried PUT on {uri} with params {params}'.format(
-                    uri=uri,
-                    params=params
-                )
-            )
+        return self.request('PUT', uri, **params)
 
-    @staticmethod
-    def delete(uri, **params):
+    def delete(self, uri, **params):
         """Low level DELETE request"""
-        try:
-            response = requests.delete(uri, **params)
+        return self.request('DELETE', uri, **params)
+
+    def read(self, method, uri, **params):
+        """
+        Read-only request, served by a replica if there are any.
+        Falls back to the next replica on connection and server errors
+        and to the primary if no healthy replica is left.
+        """
+        if self.replicas is None or not uri.startswith(self.RDF4J_base):
+            return self.request(method, uri, **params)
+
+        path = uri[len(self.RDF4J_base):]
+        tried = []
+        while True:
+            replica = self.replicas.choose(exclude=tried)
+            if replica is None:
+                return self.request(method, uri, **params)
+            tried.append(replica)
+            try:
+                response = self._hedged_request(replica, tried, method, path, **params)
+            except DataBaseNotReachable:
+                continue
+            if response.status_code >= HTTPStatus.INTERNAL_SERVER_ERROR:
+                response.close()
+                continue
             return response
-        except requests.exceptions.ConnectionError as e:
-            exc_type, exc_value, exc_traceback = sys.exc_info()
-            # todo: Logger
-            print("DELETE termiated due to error %s %s" % (exc_type, exc_value))
-            for line in traceback.format_tb(exc_traceback):
-                print("Traceback:%s" % line[:-1])
-            raise DataBaseNotReachable(
-                'Database not reachable. Tried DELETE on {uri} with params {params}'.format(
-                    uri=uri,
-                    params=params
-                )
-            )
 
-    @staticmethod
-    def start_transaction(repo_uri, auth=None):
+    def _replica_request(self, replica, method, path, **params):
+        """Request to a reserved replica, reporting the outcome to the ReplicaSet"""
+        start = time.monotonic()
+        try:
+            response = self.request(method, replica.base + path, **params)
+        except DataBaseNotReachable:
+            self.replicas.finish(replica, time.monotonic() - start, ok=False)
+            raise
+        ok = response.status_code < HTTPStatus.INTERNAL_SERVER_ERROR
+        self.replicas.finish(replica, time.monotonic() - start, ok=ok)
+        return response
+
+    def _hedged_request(self, replica, tried, method, path, **params):
+        """
+        Request to the replica. If it takes longer than the hedging delay,
+        the request is repeated on a second replica and the first
+        response is returned.
+        """
+        delay = self.replicas.hedge_delay()
+        if delay is None:
+            return self._replica_request(replica, method, path, **params)
+
+        first = self._hedge_executor.submit(self._replica_request, replica, method, path, **params)
+        try:
+            return first.result(timeout=delay)
+        except TimeoutError:
+            pass
+
+        second_replica = self.replicas.choose(exclude=tried)
+        if second_replica is None:
+            return first.result()
+        tried.append(second_replica)
+        self.replicas.count_hedge()
+        second = self._hedge_executor.submit(self._replica_request, second_replica, method, path, **params)
+
+        done, pending = wait([first, second], return_when=FIRST_COMPLETED)
+        winner = done.pop()
+        loser = second if winner is first else first
+        if winner.exception() is None and winner.result().status_code < HTTPStatus.INTERNAL_SERVER_ERROR:
+            loser.add_done_callback(_close_response)
+            return winner.result()
+
+        # The winner failed, the answer of the loser counts
+        _close_response(winner)
+        response = loser.result()
+        if response.status_code >= HTTPStatus.INTERNAL_SERVER_ERROR:
+            # Both failed, the caller only looks at the status
+            response.close()
+        return response
+
+    def check_replicas(self, auth=None):
+        """
+        Probes the protocol endpoint of every replica,
+        marking unreachable replicas down and reachable ones up
+        :return: Dict of replica base URIs to their health
+        """
+        health = {}
+        for replica in self.replicas.replicas:
+            try:
+                response = self.request('GET', replica.base + 'protocol', auth=auth)
+                healthy = response.status_code == HTTPStatus.OK
+            except DataBaseNotReachable:
+                healthy = False
+            if healthy:
+                self.replicas.mark_up(replica)
+            else:
+                self.replicas.mark_down(replica)
+            health[replica.base] = healthy
+        return health
+
+    def start_transaction(self, repo_uri, auth=None):
         # start a transaction and return the associated transaction URI
         # returns : The transaction URI
 
-        response = requests.post(
+        response = self.post(
             repo_uri + '/transactions',
             auth=auth
         )
         if response.status_code != HTTPStatus.CREATED:
             raise CannotStartTransaction(response.content)
 
-        return response.headers['Location']
+        transaction_uri = response.headers['Location']
+        if self.instruments:
+            self._notify_transaction('transaction_started', transaction_uri)
+        return transaction_uri
 
-    @staticmethod
-    def commit(transcation_uri, auth=None):
+    def commit(self, transcation_uri, auth=None):
         # commit a transaction and return the response status
-        response = requests.put(
+        response = self.put(
             transcation_uri + '?action=COMMIT',
             auth=auth
         )
+        if self.instruments:
+            outcome = COMMIT if response.status_code == HTTPStatus.OK else FAILED
+            self._notify_transaction('transaction_finished', transcation_uri, outcome)
         if response.status_code != HTTPStatus.OK:
             raise CannotCommitTransaction
 
         return response.status_code
 
-    @staticmethod
-    def rollback(transcation_uri, auth=None):
+    def rollback(self, transcation_uri, auth=None):
         # Rollback a transaction and return the response status
-        response = requests.delete(
+        response = self.delete(
             transcation_uri + '?action=ROLLBACK',
             auth=auth
         )
+        if self.instruments:
+            self._notify_transaction('transaction_finished', transcation_uri, ROLLBACK)
         if response.status_code != HTTPStatus.OK:
             raise CannotRollbackTransaction
 
@@ -0,0 +1,307 @@
+"""
+Incremental synchronisation of a context with the current state of its source.
+
+The statements of the source and of the stored context are reduced to
+fingerprints of their canonical N-Triples form. Only the difference of
+both sets is sent to the server, adding and removing statements in one
+transaction, so traffic and indexing work scale with the size of the change.
+
+Blank node labels are not stable between two harvests, so statements with
+blank nodes are compared as a group, each blank node relabelled by a hash of
+its surroundings. If the group changed, or its blank nodes cannot be told
+apart that way, all blank node statements of the context are replaced.
+Source lines which are no statements are skipped and counted.
+"""
+import hashlib
+import re
+import time
+from collections import Counter
+from http import HTTPStatus
+
+from pyrdf4j.constants import FINGERPRINT_SIZE, DEFAULT_CHARSET
+from pyrdf4j.errors import QueryFailed
+from pyrdf4j.util import encode_context
+
+NTRIPLES_MIME_TYPE = 'application/n-triples'
+
+TERM_PATTERN = re.compile(rb'''
+    \s*(?:
+        (?P<iri><[^>]*>)
+      | (?P<bnode>_:[^\s<"]+?)(?=[\s<"]|\.?$)
+      | (?P<literal>"(?:[^"\\]|\\.)*")(?:@(?P<lang>[A-Za-z0-9-]+)|\^\^(?P<datatype><[^>]*>))?
+    )
+''', re.X)
+
+ESCAPE_PATTERN = re.compile(r'\\(?:u([0-9A-Fa-f]{4})|U([0-9A-Fa-f]{8})|(.))', re.S)
+
+ECHARS = {'t': '\t', 'b': '\b', 'n': '\n', 'r': '\r', 'f': '\f', '"': '"', "'": "'", '\\': '\\'}
+
+XSD_STRING = b'<http://www.w3.org/2001/XMLSchema#string>'
+
+# Removes the blank node statements of a context
+DELETE_BNODES = 'DELETE {{ GRAPH {graph} {{ ?s ?p ?o }} }} WHERE {{ GRAPH {graph} {{ ?s ?p ?o ' \
+                'FILTER(isBlank(?s) || isBlank(?o)) }} }}'
+
+
+def _unescape(match):
+    code = match.group(1) or match.group(2)
+    if code:
+        return chr(int(code, 16))
+    return ECHARS.get(match.group(3), '\\' + match.group(3))
+
+
+def unescape(text):
+    """Resolves the escape sequences of a N-Triples term"""
+    return ESCAPE_PATTERN.sub(_unescape, text)
+
+
+def escape_literal(text):
+    """Escapes the lexical form of a literal with the minimal set of escape sequences"""
+    return text.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n').replace('\r', '\\r')
+
+
+def parse_terms(line):
+    """
+    Splits a N-Triples or N-Quads line into the canonical forms of its terms.
+    :return: List of terms, empty for blank and comment lines
+    :raises: ValueError if the line is not a statement
+    """
+    line = line.strip()
+    if not line or line.startswith(b'#'):
+        return []
+    terms = []
+    position = 0
+    while True:
+        match = TERM_PATTERN.match(line, position)
+        if match is None:
+            break
+        position = match.end()
+        if match.group('iri'):
+            terms.append(unescape(match.group('iri').decode(DEFAULT_CHARSET)).encode(DEFAULT_CHARSET))
+        elif match.group('bnode'):
+            terms.append(match.group('bnode'))
+        else:
+            lexical = escape_literal(unescape(match.group('literal')[1:-1].decode(DEFAULT_CHARSET)))
+            term = '"' + lexical + '"'
+            if match.group('lang'):
+                term += '@' + match.group('lang').decode(DEFAULT_CHARSET).lower()
+            elif match.group('datatype') and match.group('datatype') != XSD_STRING:
+                term += '^^' + unescape(match.group('datatype').decode(DEFAULT_CHARSET))
+            terms.append(term.encode(DEFAULT_CHARSET))
+    if len(terms) not in (3, 4) or line[position:].strip() != b'.':
+        raise ValueError('Not a N-Triples statement: {!r}'.format(line))
+    return terms
+
+
+def canonical_statement(line):
+    """
+    Canonical N-Triples form of a N-Triples or N-Quads statement, without its
+    context. Escapes, language tags and xsd:string datatypes are normalised,
+    so equal statements written differently share their canonical form.
+    :return: The statement as bytes, None for blank and comment lines
+    """
+    terms = parse_terms(line)
+    if not terms:
+        return None
+    return b' '.join(terms[:3]) + b' .\n'
+
+
+def has_bnode(statement):
+    """Checks if the subject or object of the canonical statement is a blank node"""
+    subject, predicate, obj = statement[:-3].split(b' ', 2)
+    return subject.startswith(b'_:') or obj.startswith(b'_:')
+
+
+def canonical_bnodes(statements):
+    """
+    Relabels the blank nodes of the canonical statements independent of their
+    labels in the source: every blank node is labelled by a hash of the
+    statements around it, refined round by round with the labels of its
+    neighbours until no more blank nodes are told apart. Two groups of
+    statements with the same result are equal up to the naming of the blank nodes.
+    :param statements: Distinct canonical statements with blank nodes
+    :return: Counter of the fingerprints of the relabelled statements, or None
+        if some blank nodes cannot be told apart, e.g. in symmetric structures
+    """
+    triples = [statement[:-3].split(b' ', 2) for statement in statements]
+    labels = {term: b'' for triple in triples for term in (triple[0], triple[2]) if term.startswith(b'_:')}
+
+    def relabel(term):
+        return b'_:' + labels[term].hex().encode('ascii') if term in labels else term
+
+    distinct = 1
+    while True:
+        surroundings = {bnode: [] for bnode in labels}
+        for subject, predicate, obj in triples:
+            if subject in labels:
+                surroundings[subject].append(b'S ' + predicate + b' ' + relabel(obj))
+            if obj in labels:
+                surroundings[obj].append(b'O ' + relabel(subject) + b' ' + predicate)
+        labels = {
+            bnode: hashlib.blake2b(labels[bnode] + b'\n'.join(sorted(surrounding)),
+                                   digest_size=FINGERPRINT_SIZE).digest()
+            for bnode, surrounding in surroundings.items()
+        }
+        refined = len(set(labels.values()))
+        if refined == distinct:
+            break
+        distinct = refined
+    if distinct < len(labels):
+        return None
+    return Counter(fingerprint(b' '.join(relabel(term) if index != 1 else term
+                                         for index, term in enumerate(triple)) + b' .\n')
+                   for triple in triples)
+
+
+def fingerprint(statement):
+    """Compact fingerprint of a canonical statement"""
+    return hashlib.blake2b(statement, digest_size=FINGERPRINT_SIZE).digest()
+
+
+def iter_lines(chunks):
+    """Splits an iterable of chunks into lines"""
+    rest = b''
+    for chunk in chunks:
+        lines = (rest + chunk).split(b'\n')
+        rest = lines.pop()
+        for line in lines:
+            yield line
+    if rest:
+        yield rest
+
+
+class SyncStatistics:
+    """
+    Figures of a delta synchronisation
+    """
+
+    def __init__(self):
+        self.source = 0
+        self.stored = 0
+        self.added = 0
+        self.removed = 0
+        self.bnodes_replaced = False
+        self.skipped = 0
+        self.seconds = 0.0
+
+    @property
+    def unchanged(self):
+        return self.source - self.added
+
+    def __repr__(self):
+        return '<SyncStatistics source={} stored={} added={} removed={} bnodes_replaced={} skipped={} ' \
+               'seconds={:.3f}>'.format(self.source, self.stored, self.added, self.removed,
+                                        self.bnodes_replaced, self.skipped, self.seconds)
+
+
+class ContextSync:
+    """
+    Synchronises one context of a repository with a source given as N-Triples or N-Quads lines
+    """
+
+    def __init__(self, api, context, auth=None):
+        """
+        :param api: API of the repository
+        :param context: IRI of the context holding the copy of the source
+        :param auth: (optional) Credentials used for all requests
+        """
+        self.api = api
+        self.context = context
+        self.auth = auth
+        self.statistics = SyncStatistics()
+
+    def iter_stored(self):
+        """
+        Yields the canonical statements of the stored context. They are read
+        from the primary server, a lagging replica would spoil the difference.
+        """
+        response = self.api.server.get(
+            self.api.repo_uri + '/statements',
+            params={'context': encode_context(self.context)},
+            headers={'Accept': NTRIPLES_MIME_TYPE},
+            auth=self.auth,
+            stream=True,
+        )
+        try:
+            if response.status_code != HTTPStatus.OK:
+                raise QueryFailed(response.content)
+            for line in response.iter_lines():
+                statement = canonical_statement(line)
+                if statement is not None:
+                    yield statement
+        finally:
+            response.close()
+
+    def sync(self, lines):
+        """
+        Brings the stored context in line with the source lines
+        :param lines: Iterable of N-Triples or N-Quads lines, the context of quads is ignored
+        :return: SyncStatistics
+        """
+        start = time.monotonic()
+        statistics = self.statistics
+
+        stored = set()
+        stored_bnodes = set()
+        for statement in self.iter_stored():
+            statistics.stored += 1
+            if has_bnode(statement):
+                stored_bnodes.add(statement)
+            else:
+                stored.add(fingerprint(statement))
+
+        seen = set()
+        additions = []
+        bnode_statements = {}
+        for line in lines:
+            if isinstance(line, str):
+                line = line.encode(DEFAULT_CHARSET)
+            try:
+                statement = canonical_statement(line)
+            except ValueError:
+                statistics.skipped += 1
+                continue
+            if statement is None:
+                continue
+            if has_bnode(statement):
+                bnode_statements[statement] = None
+                continue
+            key = fingerprint(statement)
+            if key in seen:
+                continue
+            seen.add(key)
+            statistics.source += 1
+            if key not in stored:
+                additions.append(statement)
+
+        removed = stored - seen
+        removals = []
+        if removed:
+            removals = [
+                statement for statement in self.iter_stored()
+                if not has_bnode(statement) and fingerprint(statement) in removed
+            ]
+        replace_bnodes = False
+        if bnode_statements or stored_bnodes:
+            source_bnodes = canonical_bnodes(bnode_statements)
+            replace_bnodes = source_bnodes is None or source_bnodes != canonical_bnodes(stored_bnodes)
+        statistics.source += len(bnode_statements)
+
+        if removals or additions or replace_bnodes:
+            graph = encode_context(self.context)
+            with self.api.transaction(auth=self.auth) as transaction:
+                if removals:
+                    transaction.delete(b''.join(removals), NTRIPLES_MIME_TYPE, context=self.context)
+                if replace_bnodes:
+                    transaction.update(DELETE_BNODES.format(graph=graph))
+                    additions.extend(bnode_statements)
+                if additions:
+                    transaction.add(b''.join(additions), NTRIPLES_MIME_TYPE, context=self.context)
+
+        statistics.added = len(additions)
+        statistics.removed = len(removals)
+        statistics.bnodes_replaced = replace_bnodes
+        if replace_bnodes:
+            statistics.removed += len(stored_bnodes)
+        statistics.seconds = time.monotonic() - start
+        return statistics
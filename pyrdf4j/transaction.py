@@ -0,0 +1,175 @@
+"""
+Transactions spanning several operations on a repository
+"""
+from http import HTTPStatus
+
+from pyrdf4j.constants import DEFAULT_CHARSET, DEFAULT_QUERY_MIME_TYPE, DEFAULT_QUERY_RESPONSE_MIME_TYPE, \
+    DEFAULT_UPDATE_MIME_TYPE
+from pyrdf4j.errors import TerminatingError, QueryFailed, CannotRollbackTransaction
+from pyrdf4j.util import encode_context
+
+
+class RepositoryTransaction:
+    """
+    A transaction kept open across many operations on a repository.
+
+    Used as context manager the transaction is started on enter,
+    committed on exit and rolled back if the block raises:
+
+        with rdf4j.transaction('repo', auth=auth) as transaction:
+            transaction.add(triple_data, 'text/turtle')
+            transaction.delete(other_data, 'text/turtle')
+            transaction.update('DELETE WHERE {?s <http://example.org/p> ?o}')
+            result = transaction.query('SELECT * WHERE {?s ?p ?o}')
+
+    All operations see the uncommitted changes of the transaction and
+    are sent over the pooled connections of the server.
+    """
+
+    def __init__(self, api, auth=None):
+        """
+        :param api: API of the repository
+        :param auth: (optional) Credentials used for all operations of the transaction
+        """
+        self.api = api
+        self.server = api.server
+        self.auth = auth
+        self.uri = None
+
+    def begin(self):
+        """Starts the transaction and returns its URI"""
+        if self.uri is not None:
+            raise TerminatingError('Transaction already started')
+        self.uri = self.server.start_transaction(self.api.repo_uri, auth=self.auth)
+        return self.uri
+
+    def commit(self):
+        """Commits the transaction"""
+        status = self.server.commit(self._transaction_uri(), auth=self.auth)
+        self.uri = None
+        # Writes may also have joined the transaction through its URI,
+        # e.g. add_triple_data_to_repo(transaction_uri=transaction.uri)
+        self.api.invalidate_cache()
+        return status
+
+    def rollback(self):
+        """Rolls back the transaction"""
+        status = self.server.rollback(self._transaction_uri(), auth=self.auth)
+        self.uri = None
+        return status
+
+    def _transaction_uri(self):
+        if self.uri is None:
+            raise TerminatingError('Transaction not started')
+        return self.uri
+
+    def _action(self, action, data=None, headers=None, params=None, stream=False, compress=False):
+        response = self.server.put(
+            self._transaction_uri(),
+            params=dict(params or {}, action=action),
+            data=data,
+            headers=headers,
+            auth=self.auth,
+            stream=stream,
+            compress=compress,
+        )
+        return response
+
+    def add(self, triple_data, content_type, charset=None, base_uri=None, context=None):
+        """
+        Adds the triple_data to the repository
+        :param triple_data: RDF data, or an iterable of chunks sent chunked
+        :param content_type: Media type of the triple_data
+        :param context: (optional) IRI of the named graph to add the statements to
+        :return: response
+        :raises: TerminatingError if the data is rejected
+        """
+        if charset is None:
+            charset = DEFAULT_CHARSET
+        params = {}
+        if base_uri:
+            params['baseURI'] = base_uri
+        if context is not None:
+            params['context'] = encode_context(context)
+
+        headers = {'Content-Type': content_type + '; charset=' + charset}
+        response = self._action('ADD', data=triple_data, headers=headers, params=params, compress=True)
+        if response.status_code != HTTPStatus.OK:
+            raise TerminatingError(response.content)
+        return response
+
+    def delete(self, triple_data, content_type, charset=None, context=None):
+        """
+        Removes the statements of the triple_data from the repository
+        :param context: (optional) Only remove the statements from this named graph
+        :return: response
+        :raises: TerminatingError if the data is rejected
+        """
+        if charset is None:
+            charset = DEFAULT_CHARSET
+        params = {}
+        if context is not None:
+            params['context'] = encode_context(context)
+
+        headers = {'Content-Type': content_type + '; charset=' + charset}
+        response = self._action('DELETE', data=triple_data, headers=headers, params=params, compress=True)
+        if response.status_code != HTTPStatus.OK:
+            raise TerminatingError(response.content)
+        return response
+
+    def update(self, update, charset=None):
+        """
+        Executes a SPARQL Update operation
+        :return: response
+        :raises: TerminatingError if the update fails
+        """
+        if charset is None:
+            charset = DEFAULT_CHARSET
+
+        headers = {'Content-Type': DEFAULT_UPDATE_MIME_TYPE + '; charset=' + charset}
+        response = self._action('UPDATE', data=update.encode(charset), headers=headers)
+        if response.status_code not in [HTTPStatus.OK, HTTPStatus.NO_CONTENT]:
+            raise TerminatingError(response.content)
+        return response
+
+    def query(self, query, mime_type=None, charset=None):
+        """
+        Evaluates a query against the state of the transaction
+        :param mime_type: (optional) Media type of the result
+        :return: the raw result
+        :raises: QueryFailed
+        """
+        if charset is None:
+            charset = DEFAULT_CHARSET
+
+        if mime_type is None:
+            mime_type = DEFAULT_QUERY_RESPONSE_MIME_TYPE
+
+        headers = {
+            'Accept': mime_type,
+            'Content-Type': DEFAULT_QUERY_MIME_TYPE + '; charset=' + charset,
+        }
+        response = self._action('QUERY', data=query.encode(charset), headers=headers)
+        if response.status_code != HTTPStatus.OK:
+            raise QueryFailed(query)
+        return response.content
+
+    def size(self):
+        """Number of statements in the repository as seen by the transaction"""
+        response = self._action('SIZE')
+        if response.status_code != HTTPStatus.OK:
+            raise QueryFailed(response.content)
+        return int(response.content)
+
+    def __enter__(self):
+        self.begin()
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        if exc_type is None:
+            self.commit()
+            return
+        try:
+            self.rollback()
+        except CannotRollbackTransaction:
+            pass
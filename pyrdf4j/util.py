@@ -0,0 +1,109 @@
+"""Helpers"""
+import zlib
+from urllib.parse import urlparse
+
+# Media types of gzip compressed files
+GZIP_MIME_TYPES = ['application/gzip', 'application/x-gzip']
+
+
+def is_gzip_source(uri, response):
+    """
+    Checks if a source has to be decompressed by the client.
+    This is the case if the source is a gzip file which is not
+    transparently decoded already due to a Content-Encoding header.
+    """
+    if response.headers.get('Content-Encoding', '').lower() == 'gzip':
+        return False
+    content_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+    if content_type in GZIP_MIME_TYPES:
+        return True
+    return urlparse(uri).path.endswith('.gz')
+
+
+def encode_context(context):
+    """
+    Encodes a context (named graph) as value of the context parameter
+    of the RDF4J REST API. None denotes the default graph.
+    """
+    if context is None:
+        return 'null'
+    if context.startswith('<') or context.startswith('_:'):
+        return context
+    return '<{}>'.format(context)
+
+
+def graph_store_params(graph):
+    """
+    Query parameters addressing a graph of the Graph Store protocol.
+    None denotes the default graph.
+    """
+    if graph is None:
+        return {'default': ''}
+    if graph.startswith('<') and graph.endswith('>'):
+        graph = graph[1:-1]
+    return {'graph': graph}
+
+
+def read_exactly(stream, size):
+    """
+    Reads exactly size bytes from the file like stream.
+    Raises EOFError if the stream ends before.
+    """
+    data = stream.read(size)
+    if data is None:
+        data = b''
+    while len(data) < size:
+        chunk = stream.read(size - len(data))
+        if not chunk:
+            raise EOFError('Unexpected end of stream')
+        data += chunk
+    return data
+
+
+class Gunzip:
+    """
+    Incremental decompression of gzip compressed chunks.
+    Concatenated gzip members are supported.
+    """
+
+    def __init__(self):
+        self.decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+    def decompress(self, chunk):
+        result = []
+        while chunk:
+            result.append(self.decompressor.decompress(chunk))
+            if self.decompressor.eof:
+                # another gzip member may follow
+                chunk = self.decompressor.unused_data
+                self.decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            else:
+                chunk = b''
+        return b''.join(result)
+
+    def flush(self):
+        return self.decompressor.flush()
+
+
+def iter_gunzip(chunks):
+    """Decompresses an iterable of gzip compressed chunks on the fly"""
+    gunzip = Gunzip()
+    for chunk in chunks:
+        data = gunzip.decompress(chunk)
+        if data:
+            yield data
+    data = gunzip.flush()
+    if data:
+        yield data
+
+
+async def aiter_gunzip(chunks):
+    """Decompresses an async iterable of gzip compressed chunks on the fly"""
+    gunzip = Gunzip()
+    async for chunk in chunks:
+        data = gunzip.decompress(chunk)
+        if data:
+            yield data
+    data = gunzip.flush()
+    if data:
+        yield data
@@ -0,0 +1,121 @@
+"""
+Persistent validators of harvested sources for conditional harvesting
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import namedtuple
+
+# Reasons for skipping a source
+NOT_MODIFIED = 'not modified'
+UNCHANGED_CONTENT = 'unchanged content'
+
+SkippedSource = namedtuple('SkippedSource', ['uri', 'repo_id', 'reason'])
+
+
+def content_hash(data=b''):
+    """Hash object for the content of a source, fed chunk by chunk"""
+    return hashlib.sha256(data)
+
+
+def iter_hashed(chunks, digest):
+    """Passes the chunks through, feeding them into the hash object"""
+    for chunk in chunks:
+        digest.update(chunk)
+        yield chunk
+
+
+class ValidatorStore:
+    """
+    Thread-safe store of the ETag, Last-Modified and content hash of every
+    loaded source, per target repository and context. The store is kept
+    in a JSON file if a path is given, so it outlives the process.
+
+    A source is only recorded after it was loaded successfully, so a
+    failed load is repeated on the next harvest.
+    """
+
+    def __init__(self, path=None):
+        """
+        :param path: (optional) JSON file the validators are persisted in, in memory only if None
+        """
+        self.path = path
+        self.skipped = []
+        self._validators = {}
+        self._lock = threading.Lock()
+        if path is not None and os.path.exists(path):
+            with open(path, encoding='utf8') as file:
+                self._validators = json.load(file)
+
+    @staticmethod
+    def key(uri, repo_id, context=None):
+        return ' '.join([repo_id, context or '', uri])
+
+    def get(self, uri, repo_id, context=None):
+        """The validators of the source as dict of etag, last_modified and sha256, or None"""
+        with self._lock:
+            validators = self._validators.get(self.key(uri, repo_id, context))
+            return dict(validators) if validators is not None else None
+
+    def conditional_headers(self, uri, repo_id, context=None):
+        """Headers making the GET of the source conditional"""
+        validators = self.get(uri, repo_id, context) or {}
+        headers = {}
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+        return headers
+
+    def update(self, uri, repo_id, response, sha256, context=None):
+        """Records the validators of a loaded source"""
+        with self._lock:
+            self._validators[self.key(uri, repo_id, context)] = {
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'sha256': sha256,
+            }
+            self._save()
+
+    def skip(self, uri, repo_id, reason):
+        """Reports a skipped source"""
+        skipped = SkippedSource(uri, repo_id, reason)
+        with self._lock:
+            self.skipped.append(skipped)
+        return skipped
+
+    def forget(self, uri, repo_id, context=None):
+        """Drops the validators of the source, so it is loaded again on the next harvest"""
+        with self._lock:
+            if self._validators.pop(self.key(uri, repo_id, context), None) is not None:
+                self._save()
+
+    def forget_repository(self, repo_id):
+        """Drops the validators of all sources loaded into the repository, e.g. after emptying it"""
+        prefix = repo_id + ' '
+        with self._lock:
+            keys = [key for key in self._validators if key.startswith(prefix)]
+            for key in keys:
+                del self._validators[key]
+            if keys:
+                self._save()
+
+    def _save(self):
+        if self.path is None:
+            return
+        # Write a temporary file and rename it, a crash never leaves a truncated store
+        folder = os.path.dirname(os.path.abspath(self.path))
+        descriptor, temporary = tempfile.mkstemp(dir=folder, suffix='.tmp')
+        try:
+            with os.fdopen(descriptor, 'w', encoding='utf8') as file:
+                json.dump(self._validators, file, indent=1, sort_keys=True)
+            os.replace(temporary, self.path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+    def __len__(self):
+        with self._lock:
+            return len(self._validators)
@@ -40,6 +40,25 @@ class TestRDFLoading(TestCase):
 
         assert response.status_code == self.response_code_ok
 
+    def test_bulk_load_stream(self):
+        response = self.rdf4j.bulk_load_from_uri(
+            'test_bulk_load',
+            'https://opendata.potsdam.de/api/v2/catalog/exports/ttl',
+            'application/x-turtle',
+            auth=AUTH['admin'],
+            stream=True,
+        )
+
+        assert response.status_code == self.response_code_ok
+
+        QUERY = "CONSTRUCT {?s ?o ?p} WHERE {?s ?o ?p}"
+        response = self.rdf4j.get_triple_data_from_query(
+            'test_bulk_load',
+            QUERY,
+            auth=AUTH['viewer'],
+        )
+        self.assertTrue(len(response.decode('utf8')) > 100)
+
     def test_bulk_load_replace(self):
         response = self.rdf4j.bulk_load_from_uri(
             'test_bulk_load',
@@ -85,6 +104,15 @@ class TestRDFLoading(TestCase):
                           'application/x-turtle',
                           auth=AUTH['admin'])
 
+    def test_source_error_message(self):
+        source = RDF4J_BASE_TEST + 'repositories/test_missing_source/statements'
+        for stream in [False, True]:
+            with self.subTest(stream=stream):
+                with self.assertRaises(URINotReachable) as context:
+                    self.rdf4j.fetch_source('test_bulk_load', source, stream=stream)
+                self.assertTrue(context.exception.args[0])
+
+
 
 class TestRDFLoadingGraph(TestRDFLoading):
 
@@ -0,0 +1,134 @@
+import asyncio
+import json
+from http import HTTPStatus
+from unittest import TestCase
+
+from pyrdf4j.aio import AsyncRDF4J, AsyncAPIGraph, AsyncAPIRepo
+from tests.constants import AUTH, RDF4J_BASE_TEST
+
+DATA = '<http://www.opendatasoft.com> ' \
+       '<http://www.w3.org/1999/02/22-rdf-syntax-ns#type> ' \
+       '<http://xmlns.com/foaf/0.1/Agent> .'
+
+QUADS = '<http://example.org/s> <http://example.org/p> "o1" <http://example.org/g1> .\n' \
+        '<http://example.org/s> <http://example.org/p> "o2" .\n'
+
+QUERY = """SELECT DISTINCT ?s
+   WHERE {
+    ?s <http://www.w3.org/1999/02/22-rdf-syntax-ns#type> <http://xmlns.com/foaf/0.1/Agent>
+   }"""
+
+
+class TestAsyncRDF4J(TestCase):
+    """
+    Every test drives its coroutine by asyncio.run in a loop of its own,
+    which also holds the connection pool of the AsyncRDF4J.
+    """
+
+    api = AsyncAPIRepo
+    response_code_ok = HTTPStatus.OK
+
+    def run_async(self, test):
+        async def main():
+            self.rdf4j = AsyncRDF4J(RDF4J_BASE_TEST, api=self.api)
+            try:
+                await self.rdf4j.create_repository('test_aio', auth=AUTH['admin'], overwrite=True)
+                try:
+                    await test()
+                finally:
+                    await self.rdf4j.drop_repository('test_aio', auth=AUTH['admin'], accept_not_exist=True)
+            finally:
+                await self.rdf4j.close()
+
+        asyncio.run(main())
+
+    async def count(self):
+        response = await self.rdf4j.query_repository('test_aio', QUERY, auth=AUTH['viewer'])
+        return len(response['results']['bindings'])
+
+    def test_add_and_query(self):
+        async def test():
+            response = await self.rdf4j.add_data_to_repo('test_aio', DATA, 'text/turtle', auth=AUTH['admin'])
+            self.assertEqual(response.status_code, self.response_code_ok)
+
+            responses = await asyncio.gather(*[
+                self.rdf4j.query_repository('test_aio', QUERY, auth=AUTH['viewer'])
+                for i in range(20)
+            ])
+            for response in responses:
+                self.assertTrue('s' in response['head']['vars'])
+                self.assertTrue(len(response['results']['bindings']) == 1)
+
+        self.run_async(test)
+
+    def test_empty(self):
+        async def test():
+            await self.rdf4j.add_data_to_repo('test_aio', DATA, 'text/turtle', auth=AUTH['admin'])
+            await self.rdf4j.empty_repository('test_aio', auth=AUTH['admin'])
+            self.assertEqual(await self.count(), 0)
+
+        self.run_async(test)
+
+    def test_empty_no_contexts(self):
+        async def test():
+            await self.rdf4j.add_data_to_repo('test_aio', DATA, 'text/turtle', auth=AUTH['admin'])
+            self.assertIsNone(await self.rdf4j.empty_repository('test_aio', auth=AUTH['admin'], contexts=[]))
+            self.assertEqual(await self.count(), 1)
+
+        self.run_async(test)
+
+    def test_transaction(self):
+        async def test():
+            async with self.rdf4j.transaction('test_aio', auth=AUTH['admin']) as transaction:
+                await transaction.add(QUADS, 'application/n-quads')
+                await transaction.delete(QUADS.splitlines()[0], 'application/n-quads')
+                await transaction.add(DATA, 'text/turtle')
+                self.assertEqual(await transaction.size(), 2)
+                result = json.loads(await transaction.query(QUERY))
+                self.assertEqual(len(result['results']['bindings']), 1)
+                # not visible outside the transaction before the commit
+                self.assertEqual(await self.count(), 0)
+            self.assertEqual(await self.count(), 1)
+
+            async with self.rdf4j.transaction('test_aio', auth=AUTH['admin']) as transaction:
+                await transaction.update('CLEAR ALL')
+                self.assertEqual(await transaction.size(), 0)
+            self.assertEqual(await self.count(), 0)
+
+        self.run_async(test)
+
+    def test_transaction_rollback(self):
+        async def test():
+            with self.assertRaises(ValueError):
+                async with self.rdf4j.transaction('test_aio', auth=AUTH['admin']) as transaction:
+                    await transaction.add(DATA, 'text/turtle')
+                    raise ValueError
+            self.assertEqual(await self.count(), 0)
+
+        self.run_async(test)
+
+    def test_copy_repository(self):
+        async def test():
+            await self.rdf4j.add_data_to_repo('test_aio', QUADS, 'application/n-quads', auth=AUTH['admin'])
+            try:
+                for per_context in [False, True]:
+                    await self.rdf4j.create_repository('test_aio_copy', auth=AUTH['admin'], overwrite=True)
+                    responses = await self.rdf4j.copy_repository('test_aio', 'test_aio_copy', auth=AUTH['admin'],
+                                                                 per_context=per_context)
+                    self.assertEqual(len(responses), 2 if per_context else 1)
+                    api = self.rdf4j.get_api('test_aio_copy')
+                    self.assertEqual(await api.get_contexts(auth=AUTH['viewer']), ['http://example.org/g1'])
+                    response = await self.rdf4j.query_repository('test_aio_copy', 'SELECT ?o WHERE {?s ?p ?o}',
+                                                                 auth=AUTH['viewer'])
+                    self.assertEqual(sorted(binding['o']['value'] for binding in response['results']['bindings']),
+                                     ['o1', 'o2'])
+            finally:
+                await self.rdf4j.drop_repository('test_aio_copy', auth=AUTH['admin'], accept_not_exist=True)
+
+        self.run_async(test)
+
+
+class TestAsyncRDF4JGraph(TestAsyncRDF4J):
+
+    api = AsyncAPIGraph
+    response_code_ok = HTTPStatus.NO_CONTENT
@@ -0,0 +1,103 @@
+import io
+import struct
+from unittest import TestCase
+
+from pyrdf4j.binary_rdf import BinaryRDFReader, BinaryRDFWriter, iter_binary_rdf, \
+    iter_binary_rdf_statements
+from pyrdf4j.errors import TerminatingError
+
+S = {'type': 'uri', 'value': 'http://example.org/s'}
+P = {'type': 'uri', 'value': 'http://example.org/p'}
+G = {'type': 'uri', 'value': 'http://example.org/g'}
+B = {'type': 'bnode', 'value': 'b0'}
+
+STATEMENTS = [
+    (S, P, {'type': 'literal', 'value': 'plain'}, None),
+    (S, P, {'type': 'literal', 'value': 'Hallo \U0001F600', 'xml:lang': 'de'}, G),
+    (B, P, {'type': 'literal', 'value': '5', 'datatype': 'http://www.w3.org/2001/XMLSchema#int'}, G),
+    (S, P, B, None),
+    (S, P, {'type': 'triple', 'value': {'subject': S, 'predicate': P, 'object': B}}, None),
+]
+
+# Hand assembled document with the records BinaryRDFWriter never writes: a format
+# version 2 header with charset, a namespace declaration, values declared only
+# when they recur and an explicit xsd:string datatype.
+VERSION_2_DOCUMENT = (
+    b'BRDF\x00\x00\x00\x02\x00\x00\x00\x05UTF-8'
+    # PREFIX ex: <http://example.org/>
+    b'\x00\x00\x00\x00\x02ex\x00\x00\x00\x13http://example.org/'
+    # ex:s = #0, ex:p = #1
+    b'\x03\x00\x00\x00\x00\x01\x00\x00\x00\x14http://example.org/s'
+    b'\x03\x00\x00\x00\x01\x01\x00\x00\x00\x14http://example.org/p'
+    # #0 #1 "plain"
+    b'\x01\x06\x00\x00\x00\x00\x06\x00\x00\x00\x01\x03\x00\x00\x00\x05plain\x00'
+    # ex:g = #2
+    b'\x03\x00\x00\x00\x02\x01\x00\x00\x00\x14http://example.org/g'
+    # #0 #1 "Grüße"@de #2
+    b'\x01\x06\x00\x00\x00\x00\x06\x00\x00\x00\x01\x04\x00\x00\x00\x07Gr\xc3\xbc\xc3\x9fe\x00\x00\x00\x02de'
+    b'\x06\x00\x00\x00\x02'
+    # _:node1f3a = #3
+    b'\x03\x00\x00\x00\x03\x02\x00\x00\x00\x08node1f3a'
+    # #3 #1 "5"^^xsd:int #2
+    b'\x01\x06\x00\x00\x00\x03\x06\x00\x00\x00\x01'
+    b'\x05\x00\x00\x00\x015\x00\x00\x00\x24http://www.w3.org/2001/XMLSchema#int\x06\x00\x00\x00\x02'
+    # #0 #1 #3
+    b'\x01\x06\x00\x00\x00\x00\x06\x00\x00\x00\x01\x06\x00\x00\x00\x03\x00'
+    # #0 #1 "typed"^^xsd:string
+    b'\x01\x06\x00\x00\x00\x00\x06\x00\x00\x00\x01'
+    b'\x05\x00\x00\x00\x05typed\x00\x00\x00\x27http://www.w3.org/2001/XMLSchema#string\x00'
+    b'\x7f'
+)
+
+DECLARED_BNODE = {'type': 'bnode', 'value': 'node1f3a'}
+
+VERSION_2_STATEMENTS = [
+    (S, P, {'type': 'literal', 'value': 'plain'}, None),
+    (S, P, {'type': 'literal', 'value': 'Grüße', 'xml:lang': 'de'}, G),
+    (DECLARED_BNODE, P, {'type': 'literal', 'value': '5', 'datatype': 'http://www.w3.org/2001/XMLSchema#int'}, G),
+    (S, P, DECLARED_BNODE, None),
+    (S, P, {'type': 'literal', 'value': 'typed'}, None),
+]
+
+
+class TestBinaryRDF(TestCase):
+
+    def test_round_trip(self):
+        data = b''.join(iter_binary_rdf(STATEMENTS, chunk_size=10))
+        self.assertTrue(data.startswith(b'BRDF\x00\x00\x00\x01'))
+        self.assertEqual(list(iter_binary_rdf_statements(io.BytesIO(data))), STATEMENTS)
+
+    def test_triples(self):
+        data = b''.join(iter_binary_rdf([statement[:3] for statement in STATEMENTS]))
+        for statement in iter_binary_rdf_statements(io.BytesIO(data)):
+            self.assertIsNone(statement[3])
+
+    def test_value_ids_are_recycled(self):
+        writer = BinaryRDFWriter(max_value_ids=5)
+        statements = [
+            ({'type': 'uri', 'value': 'http://example.org/{}'.format(i)}, P, S, None)
+            for i in range(10)
+        ]
+        data = writer.header() + b''.join(writer.encode_statement(st) for st in statements) + writer.end()
+        self.assertTrue(len(writer.value_ids) <= 5)
+        self.assertEqual(list(iter_binary_rdf_statements(io.BytesIO(data))), statements)
+
+    def test_version_2(self):
+        label = 'Grüße'.encode('utf8')
+        data = b'BRDF' + struct.pack('>ii', 2, 5) + b'UTF-8' + \
+            b'\x01' + \
+            b'\x01' + struct.pack('>i', 20) + b'http://example.org/s' + \
+            b'\x01' + struct.pack('>i', 20) + b'http://example.org/p' + \
+            b'\x03' + struct.pack('>i', len(label)) + label + \
+            b'\x00' + \
+            b'\x7f'
+        reader = BinaryRDFReader(io.BytesIO(data))
+        self.assertEqual(list(reader), [(S, P, {'type': 'literal', 'value': 'Grüße'}, None)])
+
+    def test_version_2_document(self):
+        reader = BinaryRDFReader(io.BytesIO(VERSION_2_DOCUMENT))
+        self.assertEqual(list(reader), VERSION_2_STATEMENTS)
+        self.assertEqual(reader.namespaces, {'ex': 'http://example.org/'})
+
+    def test_wrong_magic_number(self):
+        self.assertRaises(TerminatingError, list, iter_binary_rdf_statements(io.BytesIO(b'BRTR\x00\x00\x00\x01')))
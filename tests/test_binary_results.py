@@ -0,0 +1,67 @@
+import io
+import struct
+from unittest import TestCase
+
+from pyrdf4j.binary_results import read_binary_results, iter_binary_bindings
+from pyrdf4j.errors import QueryFailed
+
+XSD_INT = 'http://www.w3.org/2001/XMLSchema#int'
+
+
+def string(value):
+    data = value.encode('utf8')
+    return struct.pack('>i', len(data)) + data
+
+
+def namespace(namespace_id, value):
+    return b'\x02' + struct.pack('>i', namespace_id) + string(value)
+
+
+def qname(namespace_id, local_name):
+    return b'\x03' + struct.pack('>i', namespace_id) + string(local_name)
+
+
+HEADER = b'BRTR' + struct.pack('>i', 4) + struct.pack('>i', 2) + string('s') + string('o')
+
+TABLE = HEADER + \
+    namespace(0, 'http://example.org/') + qname(0, 's1') + \
+    b'\x07' + string('Hallo') + string('de') + \
+    b'\x01' + \
+    b'\x08' + string('5') + namespace(1, 'http://www.w3.org/2001/XMLSchema#') + qname(1, 'int') + \
+    b'\x05' + string('b0') + b'\x00' + \
+    b'\x04' + string('urn:x') + b'\x06' + string('plain') + \
+    b'\x7f'
+
+
+class TestBinaryResults(TestCase):
+
+    def test_read(self):
+        result = read_binary_results(io.BytesIO(TABLE))
+        self.assertEqual(result['head']['vars'], ['s', 'o'])
+        self.assertEqual(result['results']['bindings'], [
+            {
+                's': {'type': 'uri', 'value': 'http://example.org/s1'},
+                'o': {'type': 'literal', 'value': 'Hallo', 'xml:lang': 'de'},
+            },
+            {
+                's': {'type': 'uri', 'value': 'http://example.org/s1'},
+                'o': {'type': 'literal', 'value': '5', 'datatype': XSD_INT},
+            },
+            {
+                's': {'type': 'bnode', 'value': 'b0'},
+            },
+            {
+                's': {'type': 'uri', 'value': 'urn:x'},
+                'o': {'type': 'literal', 'value': 'plain'},
+            },
+        ])
+
+    def test_error_record(self):
+        data = HEADER + b'\x7e\x02' + string('Query evaluation failed')
+        self.assertRaises(QueryFailed, list, iter_binary_bindings(io.BytesIO(data)))
+
+    def test_wrong_magic_number(self):
+        self.assertRaises(QueryFailed, list, iter_binary_bindings(io.BytesIO(b'BRDF\x00\x00\x00\x01')))
+
+    def test_truncated(self):
+        self.assertRaises(EOFError, list, iter_binary_bindings(io.BytesIO(TABLE[:-5])))
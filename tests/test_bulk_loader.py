@@ -0,0 +1,81 @@
+from unittest import TestCase
+
+from pyrdf4j.api_graph import APIGraph
+from pyrdf4j.bulk_loader import BulkLoader
+from pyrdf4j.errors import BulkLoadError
+from pyrdf4j.rdf4j import RDF4J
+from tests.constants import AUTH, RDF4J_BASE_TEST
+
+LINES = [
+    '<http://example.org/s{i}> <http://example.org/p> "o{i}" .'.format(i=i)
+    for i in range(1000)
+]
+
+
+class TestBatches(TestCase):
+
+    def setUp(self):
+        self.rdf4j = RDF4J(RDF4J_BASE_TEST)
+
+    def test_batches_are_size_bounded(self):
+        loader = BulkLoader(self.rdf4j, 'test_bulk_loader', batch_size=1000)
+        batches = list(loader.iter_batches(LINES + ['# comment', '']))
+        self.assertEqual(sum(statements for statements, data in batches), len(LINES))
+        for statements, data in batches:
+            self.assertTrue(data.endswith(b'\n'))
+            self.assertTrue(len(data) < 1000 + 100)
+
+    def test_adapt_batch_size(self):
+        loader = BulkLoader(
+            self.rdf4j, 'test_bulk_loader', batch_size=1000, min_batch_size=500,
+            max_batch_size=3000, target_commit_seconds=1.0)
+        loader.adapt(0.1)
+        self.assertEqual(loader.batch_size, 2000)
+        loader.adapt(0.1)
+        self.assertEqual(loader.batch_size, 3000)
+        loader.adapt(10.0)
+        self.assertEqual(loader.batch_size, 1500)
+        loader.adapt(10.0)
+        loader.adapt(10.0)
+        self.assertEqual(loader.batch_size, 500)
+
+    def test_content_type_not_line_based(self):
+        self.assertRaises(BulkLoadError, BulkLoader, self.rdf4j, 'test_bulk_loader', 'text/turtle')
+
+
+class TestBulkLoader(TestCase):
+
+    def setUp(self):
+        self.rdf4j = RDF4J(RDF4J_BASE_TEST)
+        self.rdf4j.create_repository('test_bulk_loader', auth=AUTH['admin'], overwrite=True)
+
+    def tearDown(self):
+        self.rdf4j.drop_repository(
+            'test_bulk_loader',
+            auth=AUTH['admin'],
+            accept_not_exist=True
+        )
+
+    def test_bulk_load(self):
+        statistics = self.rdf4j.bulk_load(
+            'test_bulk_loader',
+            LINES,
+            auth=AUTH['admin'],
+            workers=3,
+            batch_size=4096,
+            min_batch_size=1024,
+        )
+        self.assertEqual(statistics.triples, len(LINES))
+        self.assertTrue(statistics.batches > 1)
+        self.assertTrue(statistics.triples_per_second > 0)
+
+        QUERY = """SELECT ?s WHERE { ?s <http://example.org/p> ?o }"""
+        response = self.rdf4j.query_repository('test_bulk_loader', QUERY, auth=AUTH['admin'])
+        self.assertEqual(len(response['results']['bindings']), len(LINES))
+
+
+class TestBulkLoaderGraph(TestBulkLoader):
+
+    def setUp(self):
+        self.rdf4j = RDF4J(RDF4J_BASE_TEST, api=APIGraph)
+        self.rdf4j.create_repository('test_bulk_loader', auth=AUTH['admin'], overwrite=True)
@@ -0,0 +1,115 @@
+import time
+from http import HTTPStatus
+from unittest import TestCase
+
+from requests.auth import HTTPBasicAuth
+
+from pyrdf4j.cache import QueryCache
+from pyrdf4j.rdf4j import RDF4J
+from tests.constants import AUTH, RDF4J_BASE_TEST
+
+MIME_TYPE = 'application/sparql-results+json'
+
+
+class TestQueryCache(TestCase):
+
+    def test_hit_and_miss(self):
+        cache = QueryCache()
+        key = cache.key('repo', 'SELECT', MIME_TYPE, HTTPBasicAuth('viewer', 'pw3'))
+        self.assertIsNone(cache.get(key))
+        cache.put(key, b'result')
+        self.assertEqual(cache.get(key), b'result')
+        self.assertEqual(cache.stats()['hits'], 1)
+        self.assertEqual(cache.stats()['misses'], 1)
+
+    def test_principal_in_key(self):
+        cache = QueryCache()
+        cache.put(cache.key('repo', 'SELECT', MIME_TYPE, ('admin', 'pw1')), b'result')
+        self.assertIsNone(cache.get(cache.key('repo', 'SELECT', MIME_TYPE, ('viewer', 'pw3'))))
+
+    def test_lru_eviction(self):
+        cache = QueryCache(maxsize=2)
+        cache.put('a', b'1')
+        cache.put('b', b'2')
+        cache.get('a')
+        cache.put('c', b'3')
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), b'1')
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_byte_eviction(self):
+        cache = QueryCache(max_bytes=10)
+        cache.put('a', b'12345')
+        cache.put('b', b'12345')
+        cache.put('c', b'12345')
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.stats()['bytes'], 10)
+
+    def test_ttl(self):
+        cache = QueryCache(ttl=0.01)
+        cache.put('a', b'1')
+        time.sleep(0.02)
+        self.assertIsNone(cache.get('a'))
+
+    def test_invalidate(self):
+        cache = QueryCache()
+        cache.put(('repo', 'SELECT', MIME_TYPE, None), b'1')
+        cache.put(('other', 'SELECT', MIME_TYPE, None), b'2')
+        cache.invalidate('repo')
+        self.assertIsNone(cache.get(('repo', 'SELECT', MIME_TYPE, None)))
+        self.assertEqual(cache.get(('other', 'SELECT', MIME_TYPE, None)), b'2')
+
+    def test_stale_put_discarded(self):
+        cache = QueryCache()
+        generation = cache.generation('repo')
+        cache.invalidate('repo')
+        cache.put(('repo', 'SELECT', MIME_TYPE, None), b'1', generation=generation)
+        self.assertEqual(len(cache), 0)
+
+
+class TestRDF4JQueryCache(TestCase):
+
+    QUERY = "SELECT ?s WHERE {?s ?p ?o}"
+
+    def setUp(self):
+        self.cache = QueryCache()
+        self.rdf4j = RDF4J(RDF4J_BASE_TEST, query_cache=self.cache)
+        self.rdf4j.create_repository('test_cache', auth=AUTH['admin'], accept_existing=True)
+
+    def tearDown(self):
+        self.rdf4j.drop_repository('test_cache', auth=AUTH['admin'], accept_not_exist=True)
+
+    def test_cached_until_write(self):
+        result = self.rdf4j.query_repository('test_cache', self.QUERY, auth=AUTH['viewer'])
+        self.assertEqual(result['results']['bindings'], [])
+        self.rdf4j.query_repository('test_cache', self.QUERY, auth=AUTH['viewer'])
+        self.assertEqual(self.cache.hits, 1)
+
+        response = self.rdf4j.add_data_to_repo(
+            'test_cache',
+            b'<http://example.org/s> <http://example.org/p> "o" .\n',
+            'application/n-triples',
+            auth=AUTH['admin'],
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+        result = self.rdf4j.query_repository('test_cache', self.QUERY, auth=AUTH['viewer'])
+        self.assertEqual(len(result['results']['bindings']), 1)
+        self.assertEqual(self.cache.hits, 1)
+
+        self.rdf4j.empty_repository('test_cache', auth=AUTH['admin'])
+        result = self.rdf4j.query_repository('test_cache', self.QUERY, auth=AUTH['viewer'])
+        self.assertEqual(result['results']['bindings'], [])
+
+    def test_write_joining_transaction(self):
+        result = self.rdf4j.query_repository('test_cache', self.QUERY, auth=AUTH['viewer'])
+        self.assertEqual(result['results']['bindings'], [])
+
+        api = self.rdf4j.get_api('test_cache')
+        with self.rdf4j.transaction('test_cache', auth=AUTH['admin']) as transaction:
+            api.add_triple_data_to_repo(b'<http://example.org/s> <http://example.org/p> "o" .\n',
+                                        'application/n-triples', auth=AUTH['admin'],
+                                        transaction_uri=transaction.uri)
+
+        result = self.rdf4j.query_repository('test_cache', self.QUERY, auth=AUTH['viewer'])
+        self.assertEqual(len(result['results']['bindings']), 1)
@@ -0,0 +1,114 @@
+from http import HTTPStatus
+from unittest import TestCase
+
+from pyrdf4j.cluster import HashRing, ShardedRDF4J, plan_moves
+from tests.constants import AUTH, RDF4J_BASE_TEST
+
+NODES = ['http://node1/', 'http://node2/', 'http://node3/']
+
+
+class TestHashRing(TestCase):
+
+    def test_stable_placement(self):
+        ring = HashRing(NODES)
+        self.assertEqual(ring.node_for('tenant'), HashRing(NODES).node_for('tenant'))
+        self.assertIn(ring.node_for('tenant'), NODES)
+
+    def test_spread(self):
+        ring = HashRing(NODES)
+        placed = {node: 0 for node in NODES}
+        for i in range(3000):
+            placed[ring.node_for('tenant{}'.format(i))] += 1
+        for count in placed.values():
+            self.assertGreater(count, 500)
+
+    def test_add_node_moves_few_keys(self):
+        ring = HashRing(NODES)
+        bigger = ring.copy()
+        bigger.add('http://node4/')
+        keys = ['tenant{}'.format(i) for i in range(3000)]
+        moved = [key for key in keys if ring.node_for(key) != bigger.node_for(key)]
+        self.assertLess(len(moved), 1500)
+        for key in moved:
+            self.assertEqual(bigger.node_for(key), 'http://node4/')
+
+    def test_remove(self):
+        ring = HashRing(NODES)
+        ring.remove('http://node2/')
+        for i in range(100):
+            self.assertNotEqual(ring.node_for('tenant{}'.format(i)), 'http://node2/')
+
+    def test_plan_moves(self):
+        ring = HashRing(NODES)
+        repositories = {node: [] for node in NODES}
+        for i in range(30):
+            repositories[NODES[0]].append('tenant{}'.format(i))
+        moves = plan_moves(repositories, ring, overrides={'tenant0': NODES[1]})
+        self.assertIn(('tenant0', NODES[0], NODES[1]), moves)
+        for repo_id, source, target in moves:
+            self.assertEqual(source, NODES[0])
+            if repo_id != 'tenant0':
+                self.assertEqual(target, ring.node_for(repo_id))
+
+
+class TestRebalance(TestCase):
+
+    def setUp(self):
+        self.cluster = ShardedRDF4J(NODES[:1])
+        self.repositories = {NODES[0]: ['tenant{}'.format(i) for i in range(30)]}
+        self.cluster.list_repositories = lambda auth=None: self.repositories
+        self.failing = None
+
+    def move_repository(self, repo_id, source_base, target_base, auth=None, drop=True):
+        if repo_id == self.failing:
+            raise ConnectionError(repo_id)
+        self.repositories[source_base].remove(repo_id)
+        self.repositories.setdefault(target_base, []).append(repo_id)
+
+    def test_failing_move(self):
+        self.cluster.move_repository = self.move_repository
+        self.cluster.overrides['tenant0'] = NODES[0]
+        ring = HashRing(NODES)
+        moves = plan_moves(self.repositories, ring, overrides=self.cluster.overrides)
+        self.failing = moves[0][0]
+
+        with self.assertRaises(ConnectionError):
+            self.cluster.rebalance(ring)
+        self.assertEqual(self.cluster.ring.nodes, NODES[:1])
+        self.assertEqual(self.cluster.node_base(self.failing), NODES[0])
+        for repo_id, source, target in moves[1:]:
+            self.assertEqual(self.cluster.node_base(repo_id), target)
+
+        self.failing = None
+        self.assertEqual(self.cluster.rebalance(ring), [moves[0]])
+        self.assertIs(self.cluster.ring, ring)
+        self.assertEqual(self.cluster.overrides, {'tenant0': NODES[0]})
+        for node, repo_ids in self.repositories.items():
+            for repo_id in repo_ids:
+                self.assertEqual(self.cluster.node_base(repo_id), node)
+
+
+class TestShardedRDF4J(TestCase):
+
+    def setUp(self):
+        self.cluster = ShardedRDF4J([RDF4J_BASE_TEST])
+
+    def tearDown(self):
+        self.cluster.drop_repository('test_cluster', auth=AUTH['admin'], accept_not_exist=True)
+
+    def test_routing(self):
+        self.cluster.create_repository('test_cluster', auth=AUTH['admin'], accept_existing=True)
+        response = self.cluster.add_data_to_repo(
+            'test_cluster',
+            b'<http://example.org/s> <http://example.org/p> "o" .\n',
+            'application/n-triples',
+            auth=AUTH['admin'],
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        result = self.cluster.query_repository('test_cluster', "SELECT ?s WHERE {?s ?p ?o}", auth=AUTH['viewer'])
+        self.assertEqual(len(result['results']['bindings']), 1)
+        self.assertIn('test_cluster', self.cluster.list_repositories(auth=AUTH['viewer'])[RDF4J_BASE_TEST])
+
+    def test_override(self):
+        cluster = ShardedRDF4J(NODES, overrides={'test_cluster': NODES[2]})
+        self.assertIs(cluster.node_for('test_cluster'), cluster.nodes[NODES[2]])
@@ -0,0 +1,59 @@
+import gzip
+import io
+from unittest import TestCase
+
+from pyrdf4j.api_graph import APIGraph
+from pyrdf4j.compression import CompressionStatistics, iter_gzip, UPLOAD
+from pyrdf4j.rdf4j import RDF4J
+from tests.constants import AUTH, RDF4J_BASE_TEST
+
+DATA = b''.join(
+    '<http://example.org/s{}> <http://example.org/p> "o{}" .\n'.format(i, i).encode('utf8') for i in range(1000))
+
+
+class TestGzipBody(TestCase):
+
+    def test_iter_gzip(self):
+        sizes = []
+        for data in [DATA, DATA.decode('utf8'), io.BytesIO(DATA), [DATA[:100], DATA[100:]]]:
+            with self.subTest(data=type(data)):
+                compressed = b''.join(iter_gzip(data, chunk_size=1000, on_done=lambda *size: sizes.append(size)))
+                self.assertEqual(gzip.decompress(compressed), DATA)
+                self.assertEqual(sizes[-1], (len(DATA), len(compressed)))
+
+    def test_statistics(self):
+        statistics = CompressionStatistics(history=2)
+        for i in range(3):
+            transfer = statistics.record(UPLOAD, 'http://example.org/', 1000, 100)
+        self.assertEqual(transfer.ratio, 10)
+        self.assertEqual(transfer.saved, 900)
+        self.assertEqual(len(statistics.transfers), 2)
+        self.assertEqual(statistics.saved, 2700)
+        self.assertEqual(statistics.ratio(UPLOAD), 10)
+
+
+class TestCompressedUpload(TestCase):
+
+    def setUp(self):
+        self.rdf4j = RDF4J(RDF4J_BASE_TEST, compress=True)
+        self.rdf4j.create_repository('test_compression', auth=AUTH['admin'], overwrite=True)
+
+    def tearDown(self):
+        self.rdf4j.drop_repository('test_compression', auth=AUTH['admin'], accept_not_exist=True)
+
+    def test_upload(self):
+        self.rdf4j.add_data_to_repo('test_compression', DATA, 'application/n-triples', auth=AUTH['admin'])
+        result = self.rdf4j.query_repository('test_compression', 'SELECT ?s WHERE {?s ?p ?o}', auth=AUTH['viewer'])
+        self.assertEqual(len(result['results']['bindings']), 1000)
+
+        compression = self.rdf4j.server.compression
+        self.assertEqual(compression.count[UPLOAD], 1)
+        self.assertEqual(compression.raw_bytes[UPLOAD], len(DATA))
+        self.assertGreater(compression.ratio(UPLOAD), 5)
+
+
+class TestCompressedUploadGraph(TestCompressedUpload):
+
+    def setUp(self):
+        self.rdf4j = RDF4J(RDF4J_BASE_TEST, api=APIGraph, compress=True)
+        self.rdf4j.create_repository('test_compression', auth=AUTH['admin'], overwrite=True)
@@ -0,0 +1,72 @@
+from http import HTTPStatus
+from unittest import TestCase
+
+from pyrdf4j.api_graph import APIGraph
+from pyrdf4j.rdf4j import RDF4J
+from tests.constants import AUTH, RDF4J_BASE_TEST
+
+GRAPH = 'http://example.org/graph'
+OTHER = 'http://example.org/other'
+
+QUERY = "SELECT ?o WHERE {?s ?p ?o}"
+
+
+def triple(value):
+    return '<http://example.org/s> <http://example.org/p> "{}" .\n'.format(value).encode('utf8')
+
+
+class TestContexts(TestCase):
+
+    def setUp(self):
+        self.rdf4j = RDF4J(RDF4J_BASE_TEST)
+        self.rdf4j.create_repository('test_contexts', auth=AUTH['admin'], overwrite=True)
+
+    def tearDown(self):
+        self.rdf4j.drop_repository('test_contexts', auth=AUTH['admin'], accept_not_exist=True)
+
+    def objects(self, graph):
+        data = self.rdf4j.get_graph('test_contexts', graph=graph, mime_type='application/n-triples',
+                                    auth=AUTH['viewer'])
+        return sorted(line.split(b'"')[1].decode('utf8') for line in data.splitlines() if line.strip())
+
+    def test_add_to_context(self):
+        self.rdf4j.add_data_to_repo('test_contexts', triple('default'), 'application/n-triples', auth=AUTH['admin'])
+        self.rdf4j.add_data_to_repo('test_contexts', triple('graph'), 'application/n-triples', auth=AUTH['admin'],
+                                    context=GRAPH)
+        self.assertEqual(self.objects(None), ['default'])
+        self.assertEqual(self.objects(GRAPH), ['graph'])
+        self.assertIn(GRAPH, self.rdf4j.get_api('test_contexts').get_contexts(auth=AUTH['viewer']))
+
+    def test_replace_context(self):
+        self.rdf4j.add_data_to_repo('test_contexts', triple('default'), 'application/n-triples', auth=AUTH['admin'])
+        self.rdf4j.add_data_to_repo('test_contexts', triple('old'), 'application/n-triples', auth=AUTH['admin'],
+                                    context=GRAPH)
+        self.rdf4j.add_data_to_repo('test_contexts', triple('other'), 'application/n-triples', auth=AUTH['admin'],
+                                    context=OTHER)
+
+        api = self.rdf4j.get_api('test_contexts')
+        api.replace_triple_data_in_repo(triple('new'), 'application/n-triples', auth=AUTH['admin'], context=GRAPH)
+
+        self.assertEqual(self.objects(None), ['default'])
+        self.assertEqual(self.objects(GRAPH), ['new'])
+        self.assertEqual(self.objects(OTHER), ['other'])
+
+    def test_graph_store(self):
+        response = self.rdf4j.put_graph('test_contexts', triple('put'), 'application/n-triples', graph=GRAPH,
+                                        auth=AUTH['admin'])
+        self.assertIn(response.status_code, [HTTPStatus.CREATED, HTTPStatus.NO_CONTENT])
+        self.rdf4j.put_graph('test_contexts', triple('default'), 'application/n-triples', auth=AUTH['admin'])
+        self.assertEqual(self.objects(GRAPH), ['put'])
+        self.assertEqual(self.objects(None), ['default'])
+
+        response = self.rdf4j.delete_graph('test_contexts', graph=GRAPH, auth=AUTH['admin'])
+        self.assertEqual(response.status_code, HTTPStatus.NO_CONTENT)
+        result = self.rdf4j.query_repository('test_contexts', QUERY, auth=AUTH['viewer'])
+        self.assertEqual([binding['o']['value'] for binding in result['results']['bindings']], ['default'])
+
+
+class TestContextsGraph(TestContexts):
+
+    def setUp(self):
+        self.rdf4j = RDF4J(RDF4J_BASE_TEST, api=APIGraph)
+        self.rdf4j.create_repository('test_contexts', auth=AUTH['admin'], overwrite=True)
@@ -6,6 +6,12 @@ from pyrdf4j.errors import URINotReachable
 from pyrdf4j.rdf4j import RDF4J
 from tests.constants import AUTH, RDF4J_BASE_TEST
 
+URI_S = {'type': 'uri', 'value': 'http://example.org/s'}
+URI_P = {'type': 'uri', 'value': 'http://example.org/p'}
+GRAPH = {'type': 'uri', 'value': 'http://example.org/graph'}
+
+QUERY = "SELECT ?o WHERE {?s ?p ?o}"
+
 
 class TestEmpty(TestCase):
 
@@ -44,6 +50,36 @@ class TestEmpty(TestCase):
         )
         self.assertTrue('Potsdam' not in response.decode('utf-8'))
 
+    def test_empty_contexts(self):
+        response = self.rdf4j.import_statements('test_bulk_load', [
+            (URI_S, URI_P, {'type': 'literal', 'value': 'default'}, None),
+            (URI_S, URI_P, {'type': 'literal', 'value': 'graph'}, GRAPH),
+        ], auth=AUTH['admin'])
+
+        self.rdf4j.empty_repository('test_bulk_load', auth=AUTH['admin'], contexts=[GRAPH['value']])
+
+        result = self.rdf4j.query_repository('test_bulk_load', QUERY, auth=AUTH['viewer'])
+        self.assertEqual([binding['o']['value'] for binding in result['results']['bindings']], ['default'])
+
+        self.rdf4j.empty_repository('test_bulk_load', auth=AUTH['admin'], contexts=[None])
+        result = self.rdf4j.query_repository('test_bulk_load', QUERY, auth=AUTH['viewer'])
+        self.assertEqual(result['results']['bindings'], [])
+
+    def test_no_contexts(self):
+        self.rdf4j.import_statements('test_bulk_load', [(URI_S, URI_P, GRAPH, GRAPH)], auth=AUTH['admin'])
+        self.assertIsNone(self.rdf4j.empty_repository('test_bulk_load', auth=AUTH['admin'], contexts=[]))
+        result = self.rdf4j.query_repository('test_bulk_load', QUERY, auth=AUTH['viewer'])
+        self.assertEqual(len(result['results']['bindings']), 1)
+
+    def test_reset(self):
+        api = self.rdf4j.get_api('test_bulk_load')
+        self.assertIsNotNone(api.config)
+        self.rdf4j.import_statements('test_bulk_load', [(URI_S, URI_P, URI_S, None)], auth=AUTH['admin'])
+        response = self.rdf4j.empty_repository('test_bulk_load', auth=AUTH['admin'], reset=True)
+        self.assertEqual(response.status_code, HTTPStatus.NO_CONTENT)
+        result = self.rdf4j.query_repository('test_bulk_load', QUERY, auth=AUTH['viewer'])
+        self.assertEqual(result['results']['bindings'], [])
+
 
 class TestEmptyGraph(TestEmpty):
 
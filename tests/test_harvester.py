@@ -0,0 +1,36 @@
+from unittest import TestCase
+
+from pyrdf4j.errors import URINotReachable
+from pyrdf4j.harvester import Harvester, LOADED, FAILED
+from pyrdf4j.rdf4j import RDF4J
+from tests.constants import AUTH, RDF4J_BASE_TEST
+
+POTSDAM = 'https://opendata.potsdam.de/api/v2/catalog/exports/ttl'
+ADLER = 'https://backend.datenadler.de/concepts/rdf_ttl'
+
+
+class TestHarvester(TestCase):
+
+    def setUp(self):
+        self.rdf4j = RDF4J(RDF4J_BASE_TEST)
+
+    def tearDown(self):
+        self.rdf4j.drop_repositories(['test_harvest_a', 'test_harvest_b'], auth=AUTH['admin'], accept_not_exist=True)
+
+    def test_harvest(self):
+        harvester = Harvester(self.rdf4j, auth=AUTH['admin'], download_workers=3, write_workers=1)
+        results = harvester.harvest([
+            ('test_harvest_a', POTSDAM, 'application/x-turtle', {'clear_repository': True}),
+            ('test_harvest_b', ADLER, 'application/x-turtle', {'context': ADLER}),
+            ('test_harvest_b', 'https://ttl', 'application/x-turtle'),
+        ])
+
+        self.assertEqual([result.status for result in results], [LOADED, LOADED, FAILED])
+        self.assertGreater(results[0].bytes, 0)
+        self.assertGreater(results[0].seconds, 0)
+        self.assertIsInstance(results[2].error, URINotReachable)
+        self.assertIn(ADLER, self.rdf4j.get_api('test_harvest_b').get_contexts(auth=AUTH['viewer']))
+
+        result = self.rdf4j.get_turtle_from_query('test_harvest_a', 'CONSTRUCT {?s ?p ?o} WHERE {?s ?p ?o}',
+                                                  auth=AUTH['viewer'])
+        self.assertIn('Potsdam', result.decode('utf8'))
@@ -0,0 +1,86 @@
+from http import HTTPStatus
+from unittest import TestCase, skipIf
+
+from pyrdf4j import metrics
+from pyrdf4j.metrics import Histogram, Instrumentation, MetricsCollector, describe_request, COMMIT, ROLLBACK
+from pyrdf4j.rdf4j import RDF4J
+from tests.constants import AUTH, RDF4J_BASE_TEST
+
+DATA = b'<http://example.org/s> <http://example.org/p> "o" .\n'
+
+
+class Recorder(Instrumentation):
+
+    def __init__(self):
+        self.records = []
+
+    def before_request(self, record):
+        return record.operation
+
+    def after_request(self, record, state):
+        self.records.append((state, record))
+
+
+class TestDescribeRequest(TestCase):
+
+    def test_describe_request(self):
+        base = 'http://example.org/rdf4j-server/repositories/books'
+        self.assertEqual(describe_request('POST', base), ('books', 'query'))
+        self.assertEqual(describe_request('PUT', base + '/transactions/12-ab?action=ADD'),
+                         ('books', 'PUT transaction ADD'))
+        self.assertEqual(describe_request('PUT', base + '/transactions/12-ab', {'action': 'SIZE'}),
+                         ('books', 'PUT transaction SIZE'))
+        self.assertEqual(describe_request('GET', base + '/statements'), ('books', 'GET statements'))
+        self.assertEqual(describe_request('GET', 'http://example.org/rdf4j-server/protocol'), (None, 'GET protocol'))
+
+    def test_histogram(self):
+        histogram = Histogram(buckets=(0.1, 1))
+        for value in [0.05, 0.1, 0.5, 5]:
+            histogram.observe(value)
+        self.assertEqual(histogram.cumulative(), [(0.1, 2), (1, 3), (float('inf'), 4)])
+        self.assertEqual(histogram.count, 4)
+
+
+class TestMetrics(TestCase):
+
+    def setUp(self):
+        self.collector = MetricsCollector()
+        self.recorder = Recorder()
+        self.rdf4j = RDF4J(RDF4J_BASE_TEST, instruments=[self.collector, self.recorder])
+        self.rdf4j.create_repository('test_metrics', auth=AUTH['admin'], overwrite=True)
+
+    def tearDown(self):
+        self.rdf4j.drop_repository('test_metrics', auth=AUTH['admin'], accept_not_exist=True)
+
+    def test_requests(self):
+        self.rdf4j.add_data_to_repo('test_metrics', DATA, 'application/n-triples', auth=AUTH['admin'])
+        self.rdf4j.query_repository('test_metrics', 'SELECT * WHERE {?s ?p ?o}', auth=AUTH['viewer'])
+
+        self.assertEqual(self.collector.requests[('test_metrics', 'query', HTTPStatus.OK)], 1)
+        self.assertEqual(self.collector.bytes_sent[('test_metrics', 'PUT transaction ADD')], len(DATA))
+        self.assertGreater(self.collector.bytes_received[('test_metrics', 'query')], 0)
+        self.assertEqual(self.collector.latency[('test_metrics', 'query')].count, 1)
+        self.assertEqual(self.collector.transactions[('test_metrics', COMMIT)].count, 1)
+        self.assertEqual(self.collector.open_transactions, 0)
+
+        operations = [state for state, record in self.recorder.records]
+        self.assertIn('PUT transaction COMMIT', operations)
+
+        text = self.collector.prometheus()
+        self.assertIn('pyrdf4j_requests_total{repository="test_metrics",operation="query",status="200"} 1', text)
+        self.assertIn('pyrdf4j_transaction_seconds_count{repository="test_metrics",outcome="commit"} 1', text)
+
+    def test_rollback(self):
+        with self.assertRaises(ValueError):
+            with self.rdf4j.transaction('test_metrics', auth=AUTH['admin']) as transaction:
+                transaction.add(DATA, 'application/n-triples')
+                raise ValueError()
+        self.assertEqual(self.collector.transactions[('test_metrics', ROLLBACK)].count, 1)
+
+
+@skipIf(metrics.trace is None, 'opentelemetry-api is not installed')
+class TestTracing(TestCase):
+
+    def test_spans(self):
+        rdf4j = RDF4J(RDF4J_BASE_TEST, instruments=[metrics.TracingInstrumentation()])
+        rdf4j.list_repositories(auth=AUTH['viewer'])
@@ -1,6 +1,8 @@
 from unittest import TestCase
 
-from pyrdf4j.errors import DataBaseNotReachable
+import requests
+
+from pyrdf4j.errors import DataBaseNotReachable, URINotReachable
 from pyrdf4j.rdf4j import RDF4J
 from tests.constants import AUTH
 
@@ -19,6 +21,12 @@ class TestDatabaseNotReachable(TestCase):
             accept_existing=True
         )
 
+    def test_source_not_reachable(self):
+        self.rdf4j = RDF4J(RDF4J_BASE_TEST)
+        with self.assertRaises(URINotReachable) as context:
+            self.rdf4j.fetch_source('test_sparql', RDF4J_BASE_TEST + 'data.ttl', stream=True)
+        self.assertIsInstance(context.exception.__cause__, requests.exceptions.ConnectionError)
+
 
 class TestDatabaseNotReachableGraph(TestDatabaseNotReachable):
     pass
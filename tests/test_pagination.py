@@ -0,0 +1,120 @@
+import io
+import json
+from itertools import islice
+from unittest import TestCase
+
+from pyrdf4j.errors import PaginationError
+from pyrdf4j.pagination import Cursor, PaginatedQuery, offset_page, keyset_page, XSD
+from pyrdf4j.rdf4j import RDF4J
+from tests.constants import AUTH, RDF4J_BASE_TEST
+
+DATA = ''.join(
+    '<http://example.org/s{:02}> <http://example.org/p> "o{}" .\n'.format(i, i) for i in range(25)).encode('utf8')
+
+SUBJECTS = ['http://example.org/s{:02}'.format(i) for i in range(25)]
+
+
+class TestPageQueries(TestCase):
+
+    def test_offset_page(self):
+        query = 'PREFIX ex: <http://example.org/>\nSELECT ?s WHERE { ?s ex:p ?o } ORDER BY ?s'
+        self.assertEqual(offset_page(query, 10, 20), query + '\nLIMIT 10 OFFSET 20')
+        self.assertTrue(offset_page(query, 10, 0).endswith('ORDER BY ?s\nLIMIT 10'))
+
+    def test_keyset_page(self):
+        query = 'SELECT ?s ?n WHERE { ?s <http://example.org/n> ?n { SELECT ?x WHERE {?x ?y ?z} LIMIT 1 } }'
+        key = [{'type': 'uri', 'value': 'http://example.org/s1'},
+               {'type': 'literal', 'value': '5', 'datatype': XSD + 'integer'}]
+        page = keyset_page(query, ['s', 'n'], key, 10)
+        self.assertIn('LIMIT 1 }\nFILTER (', page)
+        self.assertIn('sameTerm(?s, <http://example.org/s1>) && (?n > "5"^^<{}integer>)'.format(XSD), page)
+        self.assertIn('|| (sameTerm(?s, <http://example.org/s1>) && sameTerm(?n, "5"^^<{}integer>)))'.format(XSD),
+                      page)
+        self.assertTrue(page.endswith('}\nORDER BY ?s ?n\nLIMIT 10'))
+
+    def test_unsupported_queries(self):
+        for query in ['SELECT * WHERE {?s ?p ?o} LIMIT 5', 'CONSTRUCT {?s ?p ?o} WHERE {?s ?p ?o}']:
+            with self.subTest(query=query):
+                with self.assertRaises(PaginationError):
+                    offset_page(query, 10, 0)
+        with self.assertRaises(PaginationError):
+            keyset_page('SELECT * WHERE {?s ?p ?o} ORDER BY ?s', ['s'], None, 10)
+        with self.assertRaises(PaginationError):
+            keyset_page('SELECT * WHERE {?s ?p ?o}', ['s'], [{'type': 'bnode', 'value': 'b0'}], 10)
+
+
+class FakeResponse:
+
+    def __init__(self, rows):
+        self.raw = io.BytesIO(json.dumps({'head': {'vars': ['s']}, 'results': {'bindings': rows}}).encode('utf8'))
+
+    def close(self):
+        pass
+
+
+class IgnoringAPI:
+    """Answers every page query with the first rows, as if the FILTER was not understood"""
+
+    def stream_query(self, query, mime_type=None, auth=None):
+        limit = int(query.rsplit('LIMIT', 1)[1])
+        return FakeResponse([{'s': {'type': 'uri', 'value': subject}} for subject in SUBJECTS[:limit]])
+
+
+class TestPaginationChecks(TestCase):
+
+    def test_filter_ignored(self):
+        pages = PaginatedQuery(IgnoringAPI(), 'SELECT ?s WHERE {?s ?p ?o}', page_size=10, order_by=['s'])
+        with self.assertRaises(PaginationError):
+            list(pages)
+        self.assertEqual(pages.cursor.offset, 10)
+
+
+class TestPaginatedQuery(TestCase):
+
+    def setUp(self):
+        self.rdf4j = RDF4J(RDF4J_BASE_TEST)
+        self.rdf4j.create_repository('test_pagination', auth=AUTH['admin'], overwrite=True)
+        self.rdf4j.add_data_to_repo('test_pagination', DATA, 'application/n-triples', auth=AUTH['admin'])
+
+    def tearDown(self):
+        self.rdf4j.drop_repository('test_pagination', auth=AUTH['admin'], accept_not_exist=True)
+
+    def test_offset(self):
+        pages = self.rdf4j.paginated_query('test_pagination', 'SELECT ?s WHERE {?s ?p ?o} ORDER BY ?s',
+                                           page_size=10, auth=AUTH['viewer'])
+        self.assertEqual([binding['s']['value'] for binding in pages], SUBJECTS)
+        self.assertEqual(pages.pages, 3)
+        self.assertEqual(pages.cursor, Cursor(25, None))
+
+    def test_keyset(self):
+        for result_format in ['json', 'tsv', 'binary']:
+            with self.subTest(result_format=result_format):
+                pages = self.rdf4j.paginated_query('test_pagination', 'SELECT ?s ?o WHERE {?s ?p ?o}',
+                                                   page_size=10, order_by=['s'], auth=AUTH['viewer'],
+                                                   result_format=result_format)
+                self.assertEqual([binding['s']['value'] for binding in pages], SUBJECTS)
+                self.assertEqual(pages.cursor.key, [{'type': 'uri', 'value': SUBJECTS[-1]}])
+
+    def test_keys_not_unique(self):
+        self.rdf4j.add_data_to_repo('test_pagination', b'<http://example.org/s09> <http://example.org/q> "x" .\n',
+                                    'application/n-triples', auth=AUTH['admin'])
+        for page_size in [5, 10]:
+            with self.subTest(page_size=page_size):
+                pages = self.rdf4j.paginated_query('test_pagination', 'SELECT ?s ?o WHERE {?s ?p ?o}',
+                                                   page_size=page_size, order_by=['s'], auth=AUTH['viewer'])
+                with self.assertRaises(PaginationError):
+                    list(pages)
+
+    def test_resume(self):
+        query = 'SELECT ?s WHERE {?s ?p ?o}'
+        for order_by in [None, ['s']]:
+            with self.subTest(order_by=order_by):
+                pages = self.rdf4j.paginated_query('test_pagination', query, page_size=10, order_by=order_by,
+                                                   auth=AUTH['viewer'], prefetch=False)
+                first = list(islice(pages, 15))
+                cursor = Cursor(**json.loads(json.dumps(pages.cursor._asdict())))
+                self.assertEqual(cursor.offset, 15)
+
+                rest = list(self.rdf4j.paginated_query('test_pagination', query, page_size=10, order_by=order_by,
+                                                       cursor=cursor, auth=AUTH['viewer']))
+                self.assertEqual(sorted(binding['s']['value'] for binding in first + rest), SUBJECTS)
@@ -0,0 +1,76 @@
+from unittest import TestCase
+
+from pyrdf4j.errors import QueryNotPartitionable
+from pyrdf4j.partition import PartitionedDataset, parse_star_query, subject_of_line
+from pyrdf4j.rdf4j import RDF4J
+from tests.constants import AUTH, RDF4J_BASE_TEST
+
+LINES = [
+    '<http://example.org/s{}> <http://example.org/p> "o{}" .\n'.format(i, i).encode('utf8')
+    for i in range(100)
+]
+
+
+class TestStarQuery(TestCase):
+
+    def test_star_query(self):
+        star = parse_star_query(
+            'PREFIX ex: <http://example.org/> '
+            'SELECT DISTINCT ?name WHERE { ex:s ex:name ?name ; a ex:Person . '
+            'OPTIONAL { ex:s ex:age ?age } FILTER(?name != "x"@en) } LIMIT 10')
+        self.assertEqual(star.subject, '<http://example.org/s>')
+        self.assertTrue(star.distinct)
+        self.assertEqual(star.limit, 10)
+
+    def test_variable_subject(self):
+        star = parse_star_query('SELECT * WHERE {?s <http://example.org/p> ?o . ?s <http://example.org/q> 5}')
+        self.assertEqual(star.subject, '?s')
+
+    def test_not_partitionable(self):
+        for query in [
+            'SELECT * WHERE {?s ?p ?o . ?o ?q ?r}',
+            'SELECT * WHERE {?s ?p ?o} ORDER BY ?o',
+            'SELECT (COUNT(?s) AS ?count) WHERE {?s ?p ?o}',
+            'SELECT * WHERE {{?s ?p ?o} UNION {?s ?q ?o}}',
+            'SELECT * WHERE {?s <http://example.org/p>/<http://example.org/q> ?o}',
+            'CONSTRUCT {?s ?p ?o} WHERE {?s ?p ?o}',
+        ]:
+            with self.subTest(query=query):
+                with self.assertRaises(QueryNotPartitionable):
+                    parse_star_query(query)
+
+    def test_subject_of_line(self):
+        self.assertEqual(subject_of_line(LINES[0]), b'<http://example.org/s0>')
+        self.assertEqual(subject_of_line(b'_:b1 <http://example.org/p> "o" .'), b'_:b1')
+
+
+class TestPartitionedDataset(TestCase):
+
+    def setUp(self):
+        self.rdf4j = RDF4J(RDF4J_BASE_TEST)
+        self.dataset = PartitionedDataset(self.rdf4j, 'test_partition', partitions=3)
+        self.dataset.create(auth=AUTH['admin'], accept_existing=True)
+
+    def tearDown(self):
+        self.dataset.drop(auth=AUTH['admin'], accept_not_exist=True)
+
+    def test_load_and_query(self):
+        statistics = self.dataset.load(LINES, auth=AUTH['admin'], batch_size=1024)
+        self.assertEqual(statistics.triples, 100)
+
+        sizes = [
+            len(self.rdf4j.query_repository(repo_id, 'SELECT ?s WHERE {?s ?p ?o}', auth=AUTH['viewer'])
+                ['results']['bindings'])
+            for repo_id in self.dataset.repo_ids
+        ]
+        self.assertEqual(sum(sizes), 100)
+        self.assertTrue(all(sizes))
+
+        result = self.dataset.query('SELECT ?s ?o WHERE {?s <http://example.org/p> ?o}', auth=AUTH['viewer'])
+        self.assertEqual(len(result['results']['bindings']), 100)
+
+        result = self.dataset.query('SELECT ?o WHERE {<http://example.org/s7> ?p ?o}', auth=AUTH['viewer'])
+        self.assertEqual(result['results']['bindings'][0]['o']['value'], 'o7')
+
+        result = self.dataset.query('SELECT ?s WHERE {?s ?p ?o} LIMIT 5', auth=AUTH['viewer'])
+        self.assertEqual(len(result['results']['bindings']), 5)
@@ -0,0 +1,135 @@
+import time
+from http import HTTPStatus
+from unittest import TestCase
+
+from pyrdf4j.rdf4j import RDF4J
+from pyrdf4j.replicas import ReplicaSet
+from pyrdf4j.server import Server
+from tests.constants import AUTH, RDF4J_BASE_TEST
+
+# Nothing listens on the discard port
+DEAD_REPLICA = 'http://127.0.0.1:9/rdf4j-server/'
+
+QUERY = "SELECT ?s WHERE {?s ?p ?o}"
+
+
+class TestReplicaSet(TestCase):
+
+    def test_least_outstanding(self):
+        replicas = ReplicaSet(['http://a/', 'http://b/'])
+        first = replicas.choose()
+        second = replicas.choose()
+        self.assertIsNot(first, second)
+        replicas.finish(first, 0.1, ok=True)
+        self.assertIs(replicas.choose(), first)
+
+    def test_mark_down_after_failures(self):
+        replicas = ReplicaSet(['http://a/'], failure_threshold=2)
+        for i in range(2):
+            replicas.finish(replicas.choose(), 0.1, ok=False)
+        self.assertIsNone(replicas.choose())
+
+    def test_slow_replica_marked_down(self):
+        replicas = ReplicaSet(['http://a/'], failure_threshold=1, max_latency=1.0)
+        replicas.finish(replicas.choose(), 2.0, ok=True)
+        self.assertIsNone(replicas.choose())
+
+    def test_down_replica_recovers(self):
+        replicas = ReplicaSet(['http://a/'], failure_threshold=1, down_seconds=0)
+        replicas.finish(replicas.choose(), 0.1, ok=False)
+        self.assertIsNotNone(replicas.choose())
+
+    def test_hedge_delay(self):
+        replicas = ReplicaSet(['http://a/'], hedge_percentile=90, hedge_min_samples=10)
+        for i in range(10):
+            replica = replicas.choose()
+            self.assertIsNone(replicas.hedge_delay())
+            replicas.finish(replica, i / 10, ok=True)
+        self.assertEqual(replicas.hedge_delay(), 0.9)
+
+
+class FakeResponse:
+
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class TestHedgedRequest(TestCase):
+
+    def setUp(self):
+        replicas = ReplicaSet(['http://a/', 'http://b/'], hedge_percentile=0, hedge_min_samples=1)
+        replicas.finish(replicas.choose(), 0.01, ok=True)
+        self.server = Server('http://primary/', replicas=replicas)
+        self.responses = []
+
+    def tearDown(self):
+        self.server.close()
+
+    def answer(self, *answers):
+        """Lets the replicas answer in turn with (delay, status) after the delay"""
+        answers = list(answers)
+
+        def replica_request(replica, method, path, **params):
+            delay, status = answers.pop(0)
+            time.sleep(delay)
+            response = FakeResponse(status)
+            self.responses.append(response)
+            return response
+        self.server._replica_request = replica_request
+
+    def hedged_request(self):
+        replica = self.server.replicas.choose()
+        return self.server._hedged_request(replica, [replica], 'GET', 'protocol')
+
+    def test_failed_winner_is_closed(self):
+        self.answer((0.1, HTTPStatus.SERVICE_UNAVAILABLE), (0.3, HTTPStatus.OK))
+        response = self.hedged_request()
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual([response.closed for response in self.responses], [True, False])
+
+    def test_both_failed(self):
+        self.answer((0.1, HTTPStatus.SERVICE_UNAVAILABLE), (0.3, HTTPStatus.BAD_GATEWAY))
+        response = self.hedged_request()
+        self.assertEqual(response.status_code, HTTPStatus.BAD_GATEWAY)
+        self.assertEqual([response.closed for response in self.responses], [True, True])
+
+    def test_executor(self):
+        self.assertIsNotNone(self.server._hedge_executor)
+        self.assertIsNone(Server('http://primary/')._hedge_executor)
+
+
+class TestReplicaRouting(TestCase):
+
+    def setUp(self):
+        self.rdf4j = RDF4J(
+            RDF4J_BASE_TEST,
+            replicas=ReplicaSet([DEAD_REPLICA, RDF4J_BASE_TEST], failure_threshold=1),
+        )
+        self.rdf4j.create_repository('test_replicas', auth=AUTH['admin'], accept_existing=True)
+
+    def tearDown(self):
+        self.rdf4j.drop_repository('test_replicas', auth=AUTH['admin'], accept_not_exist=True)
+
+    def test_failover(self):
+        for i in range(3):
+            result = self.rdf4j.query_repository('test_replicas', QUERY, auth=AUTH['viewer'])
+            self.assertEqual(result['results']['bindings'], [])
+        dead, alive = self.rdf4j.server.replicas.replicas
+        self.assertFalse(dead.healthy)
+        self.assertEqual(alive.requests, 3)
+
+    def test_check_replicas(self):
+        health = self.rdf4j.server.check_replicas(auth=AUTH['viewer'])
+        self.assertEqual(health, {DEAD_REPLICA: False, RDF4J_BASE_TEST: True})
+
+    def test_hedged_reads(self):
+        replicas = ReplicaSet([RDF4J_BASE_TEST, RDF4J_BASE_TEST], hedge_percentile=0, hedge_min_samples=1)
+        rdf4j = RDF4J(RDF4J_BASE_TEST, replicas=replicas)
+        for i in range(5):
+            result = rdf4j.query_repository('test_replicas', QUERY, auth=AUTH['viewer'])
+            self.assertEqual(result['results']['bindings'], [])
+        rdf4j.server.close()
@@ -1,9 +1,14 @@
+import os
+import tempfile
+from http import HTTPStatus
+
 from pyrdf4j.api_graph import APIGraph
-from pyrdf4j.errors import CreateRepositoryError
+from pyrdf4j.errors import CreateRepositoryError, CreateRepositoryAlreadyExists, RepositoryTypeUnknown, \
+    RepositoryTemplateError
 from unittest import TestCase
 
 from pyrdf4j.rdf4j import RDF4J
-from pyrdf4j.repo_types import REPO_TYPES
+from pyrdf4j.repo_types import REPO_TYPES, DEFAULTS, TemplateRegistry, repo_config_factory, template_registry
 from tests.constants import AUTH, RDF4J_BASE_TEST
 
 # The custom rules are no parameters,
@@ -63,3 +68,56 @@ class TestRepoTypesGraph(TestRepoTypes):
 
     def setUp(self):
         self.rdf4j = RDF4J(rdf4j_base=RDF4J_BASE_TEST, api=APIGraph)
+
+
+class TestTemplateRegistry(TestCase):
+
+    def test_defaults_not_mutated(self):
+        config = repo_config_factory('native', 'test', 'test', tripleIndexes='spoc')
+        self.assertIn('spoc', config)
+        self.assertEqual(DEFAULTS['tripleIndexes'], 'spoc,posc')
+        self.assertIn('spoc,posc', repo_config_factory('native', 'test', 'test'))
+
+    def test_registry_immutable(self):
+        registry = template_registry()
+        self.assertIs(registry, template_registry())
+        self.assertEqual(set(registry.templates), set(REPO_TYPES))
+        with self.assertRaises(TypeError):
+            registry.templates['memory'] = ''
+        with self.assertRaises(TypeError):
+            DEFAULTS['persist'] = 'true'
+
+    def test_unknown_type(self):
+        with self.assertRaises(RepositoryTypeUnknown):
+            repo_config_factory('unknown', 'test', 'test')
+
+    def test_validation(self):
+        with tempfile.TemporaryDirectory() as folder:
+            with open(os.path.join(folder, 'broken.ttl'), 'w') as template_file:
+                template_file.write('rep:repositoryID "{repo_id}" ; rdfs:label "{undefined}" .')
+            with self.assertRaises(RepositoryTemplateError):
+                TemplateRegistry(folder=folder, repo_types=['broken'])
+
+
+class TestBulkProvisioning(TestCase):
+
+    REPO_IDS = ['test_bulk_provision_{}'.format(i) for i in range(10)]
+
+    def setUp(self):
+        self.rdf4j = RDF4J(rdf4j_base=RDF4J_BASE_TEST)
+
+    def tearDown(self):
+        self.rdf4j.drop_repositories(self.REPO_IDS, accept_not_exist=True, auth=AUTH['admin'])
+
+    def test_create_and_drop(self):
+        results = self.rdf4j.create_repositories(self.REPO_IDS, auth=AUTH['admin'])
+        self.assertEqual(set(results), set(self.REPO_IDS))
+        for response in results.values():
+            self.assertEqual(response.status_code, HTTPStatus.NO_CONTENT)
+
+        results = self.rdf4j.create_repositories(self.REPO_IDS[:1], auth=AUTH['admin'])
+        self.assertIsInstance(results[self.REPO_IDS[0]], CreateRepositoryAlreadyExists)
+
+        results = self.rdf4j.drop_repositories(self.REPO_IDS, auth=AUTH['admin'])
+        for response in results.values():
+            self.assertEqual(response.status_code, HTTPStatus.NO_CONTENT)
@@ -0,0 +1,56 @@
+import io
+import json
+from unittest import TestCase
+
+from pyrdf4j.results import iter_bindings, parse_term
+
+BINDINGS = [
+    {
+        's': {'type': 'uri', 'value': 'http://example.org/s'},
+        'o': {'type': 'literal', 'value': 'a\tb "c"', 'xml:lang': 'en'},
+    },
+    {
+        's': {'type': 'bnode', 'value': 'b0'},
+        'o': {'type': 'literal', 'value': '5', 'datatype': 'http://www.w3.org/2001/XMLSchema#int'},
+    },
+    {
+        's': {'type': 'uri', 'value': 'http://example.org/s2'},
+    },
+]
+
+TSV = '?s\t?o\n' \
+      '<http://example.org/s>\t"a\\tb \\"c\\""@en\n' \
+      '_:b0\t"5"^^<http://www.w3.org/2001/XMLSchema#int>\n' \
+      '<http://example.org/s2>\t\n'
+
+CSV = 's,o\r\n' \
+      'http://example.org/s,"a\tb ""c"""\r\n' \
+      'b0,5\r\n' \
+      'http://example.org/s2,\r\n'
+
+
+class TestResults(TestCase):
+
+    def test_json(self):
+        data = json.dumps({'head': {'vars': ['s', 'o']}, 'results': {'bindings': BINDINGS}})
+        bindings = list(iter_bindings(io.BytesIO(data.encode('utf8')), 'json'))
+        self.assertEqual(bindings, BINDINGS)
+
+    def test_tsv(self):
+        bindings = list(iter_bindings(io.BytesIO(TSV.encode('utf8')), 'tsv'))
+        self.assertEqual(bindings, BINDINGS)
+
+    def test_csv(self):
+        bindings = list(iter_bindings(io.BytesIO(CSV.encode('utf8')), 'csv'))
+        self.assertEqual(bindings, [
+            {'s': 'http://example.org/s', 'o': 'a\tb "c"'},
+            {'s': 'b0', 'o': '5'},
+            {'s': 'http://example.org/s2'},
+        ])
+
+    def test_abbreviated_terms(self):
+        self.assertEqual(parse_term('42')['datatype'], 'http://www.w3.org/2001/XMLSchema#integer')
+        self.assertEqual(parse_term('4.2')['datatype'], 'http://www.w3.org/2001/XMLSchema#decimal')
+        self.assertEqual(parse_term('4.2e1')['datatype'], 'http://www.w3.org/2001/XMLSchema#double')
+        self.assertEqual(parse_term('true')['datatype'], 'http://www.w3.org/2001/XMLSchema#boolean')
+        self.assertIsNone(parse_term(''))
@@ -0,0 +1,49 @@
+import threading
+from unittest import TestCase
+
+from requests.auth import HTTPBasicAuth
+
+from pyrdf4j.api_graph import APIGraph
+from pyrdf4j.rdf4j import RDF4J
+from tests.constants import AUTH, RDF4J_BASE_TEST
+
+
+class TestConnectionPool(TestCase):
+
+    def setUp(self):
+        self.rdf4j = RDF4J(RDF4J_BASE_TEST, auth=AUTH['viewer'], pool_maxsize=4)
+        self.server = self.rdf4j.server
+
+    def test_apis_share_server(self):
+        api_1 = self.rdf4j.get_api('test_pool_1')
+        api_2 = self.rdf4j.get_api('test_pool_2')
+        self.assertIs(api_1.server, self.server)
+        self.assertIs(api_2.server, self.server)
+
+    def test_session_per_thread_shares_adapter(self):
+        sessions = []
+
+        def get_session():
+            sessions.append(self.server.session)
+
+        thread = threading.Thread(target=get_session)
+        thread.start()
+        thread.join()
+        get_session()
+
+        self.assertIsNot(sessions[0], sessions[1])
+        for session in sessions:
+            self.assertIs(session.get_adapter(RDF4J_BASE_TEST), self.server.adapter)
+        self.assertIs(self.server.session, sessions[1])
+
+    def test_default_auth(self):
+        self.assertIsInstance(self.server.session.auth, HTTPBasicAuth)
+        self.assertEqual(self.server.session.auth.username, AUTH['viewer'].username)
+        self.assertEqual(self.server.adapter._pool_maxsize, 4)
+
+
+class TestConnectionPoolGraph(TestConnectionPool):
+
+    def setUp(self):
+        self.rdf4j = RDF4J(RDF4J_BASE_TEST, api=APIGraph, auth=AUTH['viewer'], pool_maxsize=4)
+        self.server = self.rdf4j.server
@@ -66,6 +66,32 @@ class TestSPARQL(TestCase):
         self.assertTrue('xml' in response.decode('utf8'))
         self.assertTrue(len(response.decode('utf8')) > 100)
 
+    def test_copy_repository_per_context(self):
+        DATA = '<http://example.org/s> <http://example.org/p> "default" .\n' \
+               '<http://example.org/s> <http://example.org/p> "g1" <http://example.org/g1> .\n' \
+               '<http://example.org/s> <http://example.org/p> "g2" <http://example.org/g2> .\n'
+        self.rdf4j.add_data_to_repo('test_sparql3', DATA, 'application/n-quads', auth=AUTH['admin'])
+        self.rdf4j.create_repository('test_sparql2', auth=AUTH['admin'], accept_existing=True)
+
+        responses = self.rdf4j.copy_repository(
+            'test_sparql3', 'test_sparql2', auth=AUTH['admin'], per_context=True)
+        self.assertEqual(len(responses), 3)
+
+        api = self.rdf4j.get_api('test_sparql2')
+        self.assertEqual(
+            sorted(api.get_contexts(auth=AUTH['viewer'])),
+            ['http://example.org/g1', 'http://example.org/g2'])
+        statements = list(self.rdf4j.export_statements('test_sparql2', auth=AUTH['viewer']))
+        self.assertEqual(len(statements), 3)
+
+    def test_export_import(self):
+        statements = list(self.rdf4j.export_statements('test_sparql', auth=AUTH['viewer']))
+        self.assertTrue(len(statements) > 10)
+
+        self.rdf4j.import_statements('test_sparql3', statements, auth=AUTH['admin'])
+        statements_imported = list(self.rdf4j.export_statements('test_sparql3', auth=AUTH['viewer']))
+        self.assertEqual(len(statements_imported), len(statements))
+
     def test_query_ids(self):
         QUERY = """SELECT DISTINCT ?s
        WHERE {
@@ -77,6 +103,28 @@ class TestSPARQL(TestCase):
         self.assertTrue(len(response['results']['bindings']) >= 1)
         self.assertTrue('s' in response['results']['bindings'][0])
 
+    def test_iter_query(self):
+        QUERY = """SELECT DISTINCT ?s
+       WHERE {
+          ?s a <http://www.w3.org/ns/dcat#Catalog>
+       }"""
+        response = self.rdf4j.query_repository('test_sparql', QUERY, auth=AUTH['admin'])
+        for result_format in ['json', 'tsv', 'binary']:
+            with self.subTest(result_format=result_format):
+                bindings = list(self.rdf4j.iter_query(
+                    'test_sparql', QUERY, auth=AUTH['admin'], result_format=result_format))
+                self.assertEqual(bindings, response['results']['bindings'])
+
+    def test_query_binary(self):
+        QUERY = """SELECT DISTINCT ?s
+       WHERE {
+          ?s a <http://www.w3.org/ns/dcat#Catalog>
+       }"""
+        response = self.rdf4j.query_repository('test_sparql', QUERY, auth=AUTH['admin'])
+        response_binary = self.rdf4j.query_repository(
+            'test_sparql', QUERY, auth=AUTH['admin'], result_format='binary')
+        self.assertEqual(response_binary, response)
+
     def test_query_empty(self):
         QUERY = """SELECT DISTINCT ?s
        WHERE {
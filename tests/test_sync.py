@@ -0,0 +1,106 @@
+from unittest import TestCase
+
+from pyrdf4j.errors import SyncError
+from pyrdf4j.rdf4j import RDF4J
+from pyrdf4j.sync import ContextSync, canonical_statement, canonical_bnodes
+from tests.constants import AUTH, RDF4J_BASE_TEST
+
+GRAPH = 'http://example.org/source'
+
+QUERY = "SELECT ?o WHERE {?s ?p ?o}"
+
+
+def knows(target, names=('x', 'y')):
+    """<s> knows one of two named blank nodes"""
+    return ['<http://example.org/s> <http://example.org/knows> _:{} .\n'.format(target)] + [
+        '_:{} <http://example.org/name> "{}" .\n'.format(label, name) for label, name in zip(names, 'AB')]
+
+
+def lines(values):
+    return ['<http://example.org/s> <http://example.org/p> "{}" .\n'.format(value) for value in values]
+
+
+class TestCanonicalStatement(TestCase):
+
+    def test_canonical_statement(self):
+        self.assertEqual(
+            canonical_statement(b'<http://example.org/s>  <http://example.org/p> "\\u0041\\"b"^^'
+                                b'<http://www.w3.org/2001/XMLSchema#string> <http://example.org/g> .'),
+            b'<http://example.org/s> <http://example.org/p> "A\\"b" .\n')
+        self.assertEqual(
+            canonical_statement(b'_:b0 <http://example.org/p> "a b"@EN .'),
+            b'_:b0 <http://example.org/p> "a b"@en .\n')
+        self.assertIsNone(canonical_statement(b'# comment'))
+
+    def test_canonical_bnodes(self):
+        def canonical(source):
+            return canonical_bnodes([canonical_statement(line.encode('utf8')) for line in source])
+
+        self.assertEqual(canonical(knows('x')), canonical(knows('b1', names=('b1', 'b2'))))
+        self.assertNotEqual(canonical(knows('x')), canonical(knows('y')))
+        # two blank nodes pointing at each other cannot be told apart
+        self.assertIsNone(canonical(['_:a <http://example.org/p> _:b .\n', '_:b <http://example.org/p> _:a .\n']))
+
+    def test_not_a_statement(self):
+        with self.assertRaises(ValueError):
+            canonical_statement(b'<http://example.org/s> <http://example.org/p> .')
+
+
+class TestContextSync(TestCase):
+
+    def setUp(self):
+        self.rdf4j = RDF4J(RDF4J_BASE_TEST)
+        self.rdf4j.create_repository('test_sync', auth=AUTH['admin'], overwrite=True)
+        self.api = self.rdf4j.get_api('test_sync')
+
+    def tearDown(self):
+        self.rdf4j.drop_repository('test_sync', auth=AUTH['admin'], accept_not_exist=True)
+
+    def objects(self):
+        result = self.rdf4j.query_repository('test_sync', QUERY, auth=AUTH['viewer'])
+        return sorted(binding['o']['value'] for binding in result['results']['bindings'])
+
+    def sync(self, source):
+        return ContextSync(self.api, GRAPH, auth=AUTH['admin']).sync(source)
+
+    def test_delta(self):
+        statistics = self.sync(lines(range(100)))
+        self.assertEqual(statistics.added, 100)
+        self.assertEqual(statistics.removed, 0)
+
+        statistics = self.sync(lines(range(2, 101)))
+        self.assertEqual((statistics.added, statistics.removed, statistics.unchanged), (1, 2, 98))
+        self.assertEqual(self.objects(), sorted(str(i) for i in range(2, 101)))
+        self.assertEqual(self.rdf4j.get_api('test_sync').get_contexts(auth=AUTH['viewer']), [GRAPH])
+
+        statistics = self.sync(lines(range(2, 101)))
+        self.assertEqual((statistics.added, statistics.removed), (0, 0))
+
+    def test_bnodes(self):
+        source = lines(['a']) + ['_:b0 <http://example.org/p> "b" .\n']
+        self.sync(source)
+        statistics = self.sync(lines(['a']) + ['_:other <http://example.org/p> "b" .\n'])
+        self.assertFalse(statistics.bnodes_replaced)
+
+        statistics = self.sync(lines(['a']) + ['_:b0 <http://example.org/p> "c" .\n'])
+        self.assertTrue(statistics.bnodes_replaced)
+        self.assertEqual(self.objects(), ['a', 'c'])
+
+    def test_bnode_reference_changed(self):
+        self.sync(knows('x'))
+        statistics = self.sync(knows('b1', names=('b1', 'b2')))
+        self.assertFalse(statistics.bnodes_replaced)
+
+        statistics = self.sync(knows('y'))
+        self.assertTrue(statistics.bnodes_replaced)
+        self.assertEqual(statistics.stored, 3)
+        self.assertEqual(self.sync(knows('y')).bnodes_replaced, False)
+
+    def test_malformed_lines(self):
+        statistics = self.sync(lines(['a']) + ['<http://example.org/s> <http://example.org/p> .\n'] + lines(['b']))
+        self.assertEqual((statistics.added, statistics.skipped), (2, 1))
+        self.assertEqual(self.objects(), ['a', 'b'])
+
+    def test_line_based_only(self):
+        with self.assertRaises(SyncError):
+            self.rdf4j.sync_from_uri('test_sync', 'http://example.org/source.ttl', 'text/turtle', auth=AUTH['admin'])
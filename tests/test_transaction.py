@@ -0,0 +1,129 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+
+from pyrdf4j.api_graph import APIGraph
+from pyrdf4j.metrics import MetricsCollector, ROLLBACK
+from pyrdf4j.rdf4j import RDF4J
+from tests.constants import AUTH, RDF4J_BASE_TEST
+
+DATA = b'''<http://example.org/s1> <http://example.org/p> "o1" .
+<http://example.org/s2> <http://example.org/p> "o2" .
+'''
+
+QUERY = "SELECT ?s WHERE {?s ?p ?o}"
+
+
+class TestTransaction(TestCase):
+
+    def setUp(self):
+        self.rdf4j = RDF4J(RDF4J_BASE_TEST)
+        self.rdf4j.create_repository('test_transaction', auth=AUTH['admin'], accept_existing=True)
+
+    def tearDown(self):
+        self.rdf4j.drop_repository('test_transaction', auth=AUTH['admin'], accept_not_exist=True)
+
+    def count(self):
+        result = self.rdf4j.query_repository('test_transaction', QUERY, auth=AUTH['viewer'])
+        return len(result['results']['bindings'])
+
+    def test_commit(self):
+        with self.rdf4j.transaction('test_transaction', auth=AUTH['admin']) as transaction:
+            transaction.add(DATA, 'application/n-triples')
+            transaction.delete(DATA.splitlines()[0], 'application/n-triples')
+            result = json.loads(transaction.query(QUERY))
+            self.assertEqual(len(result['results']['bindings']), 1)
+            # not visible outside the transaction before the commit
+            self.assertEqual(self.count(), 0)
+        self.assertEqual(self.count(), 1)
+
+    def test_update(self):
+        self.rdf4j.add_data_to_repo('test_transaction', DATA, 'application/n-triples', auth=AUTH['admin'])
+        with self.rdf4j.transaction('test_transaction', auth=AUTH['admin']) as transaction:
+            transaction.update('CLEAR ALL')
+            self.assertEqual(transaction.size(), 0)
+        self.assertEqual(self.count(), 0)
+
+    def test_rollback_on_exception(self):
+        with self.assertRaises(ValueError):
+            with self.rdf4j.transaction('test_transaction', auth=AUTH['admin']) as transaction:
+                transaction.add(DATA, 'application/n-triples')
+                raise ValueError
+        self.assertEqual(self.count(), 0)
+
+    def test_rollback_on_failing_body(self):
+        collector = MetricsCollector()
+        rdf4j = RDF4J(RDF4J_BASE_TEST, instruments=[collector])
+
+        def body():
+            yield DATA
+            raise ValueError('source connection lost')
+
+        with self.assertRaises(ValueError):
+            rdf4j.add_data_to_repo('test_transaction', body(), 'application/n-triples', auth=AUTH['admin'])
+        self.assertEqual(collector.open_transactions, 0)
+        self.assertEqual(collector.transactions[('test_transaction', ROLLBACK)].count, 1)
+        self.assertEqual(self.count(), 0)
+
+
+class TestConcurrentAPI(TestCase):
+
+    def setUp(self):
+        self.rdf4j = RDF4J(RDF4J_BASE_TEST)
+        self.rdf4j.create_repository('test_concurrent', auth=AUTH['admin'], accept_existing=True)
+
+    def tearDown(self):
+        self.rdf4j.drop_repository('test_concurrent', auth=AUTH['admin'], accept_not_exist=True)
+
+    def add(self, i):
+        triple_data = '<http://example.org/s{}> <http://example.org/p> "o" .\n'.format(i).encode('utf8')
+        return self.rdf4j.add_data_to_repo('test_concurrent', triple_data, 'application/n-triples',
+                                           auth=AUTH['admin'])
+
+    def test_parallel_adds_share_api(self):
+        api = self.rdf4j.get_api('test_concurrent')
+        repo_uri = api.repo_uri
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(self.add, range(50)))
+        self.assertEqual(api.repo_uri, repo_uri)
+        result = self.rdf4j.query_repository('test_concurrent', QUERY, auth=AUTH['viewer'])
+        self.assertEqual(len(result['results']['bindings']), 50)
+
+
+class TestAtomicReplace(TestCase):
+
+    def setUp(self):
+        self.rdf4j = RDF4J(RDF4J_BASE_TEST)
+        self.rdf4j.create_repository('test_replace', auth=AUTH['admin'], accept_existing=True)
+        self.rdf4j.add_data_to_repo('test_replace', DATA, 'application/n-triples', auth=AUTH['admin'])
+
+    def tearDown(self):
+        self.rdf4j.drop_repository('test_replace', auth=AUTH['admin'], accept_not_exist=True)
+
+    def values(self):
+        result = self.rdf4j.query_repository('test_replace', "SELECT ?o WHERE {?s ?p ?o}", auth=AUTH['viewer'])
+        return sorted(binding['o']['value'] for binding in result['results']['bindings'])
+
+    def test_readers_see_old_data_during_replace(self):
+        seen = []
+
+        def body(executor):
+            yield b'<http://example.org/s3> <http://example.org/p> "o3" .\n'
+            # query from another thread while the upload is running
+            seen.append(executor.submit(self.values).result())
+            yield b'<http://example.org/s4> <http://example.org/p> "o4" .\n'
+
+        api = self.rdf4j.get_api('test_replace')
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            api.replace_triple_data_in_repo(body(executor), 'application/n-triples', auth=AUTH['admin'])
+
+        self.assertEqual(seen, [['o1', 'o2']])
+        self.assertEqual(self.values(), ['o3', 'o4'])
+
+
+class TestAtomicReplaceGraph(TestAtomicReplace):
+
+    def setUp(self):
+        self.rdf4j = RDF4J(RDF4J_BASE_TEST, api=APIGraph)
+        self.rdf4j.create_repository('test_replace', auth=AUTH['admin'], accept_existing=True)
+        self.rdf4j.add_data_to_repo('test_replace', DATA, 'application/n-triples', auth=AUTH['admin'])
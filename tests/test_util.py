@@ -0,0 +1,29 @@
+import gzip
+from unittest import TestCase
+
+from pyrdf4j.util import iter_gunzip, encode_context
+
+DATA = b'<http://example.org/s> <http://example.org/p> "o" .\n' * 1000
+
+
+class TestGunzip(TestCase):
+
+    def chunks(self, data, size=100):
+        return [data[i:i + size] for i in range(0, len(data), size)]
+
+    def test_gunzip_chunks(self):
+        compressed = gzip.compress(DATA)
+        self.assertEqual(b''.join(iter_gunzip(self.chunks(compressed))), DATA)
+
+    def test_gunzip_multiple_members(self):
+        compressed = gzip.compress(DATA) + gzip.compress(DATA)
+        self.assertEqual(b''.join(iter_gunzip(self.chunks(compressed, 7))), DATA + DATA)
+
+
+class TestEncodeContext(TestCase):
+
+    def test_encode_context(self):
+        self.assertEqual(encode_context(None), 'null')
+        self.assertEqual(encode_context('http://example.org/g'), '<http://example.org/g>')
+        self.assertEqual(encode_context('<http://example.org/g>'), '<http://example.org/g>')
+        self.assertEqual(encode_context('_:b0'), '_:b0')
@@ -0,0 +1,64 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from requests.structures import CaseInsensitiveDict
+
+from pyrdf4j.rdf4j import RDF4J
+from pyrdf4j.validators import ValidatorStore, SkippedSource
+from tests.constants import AUTH, RDF4J_BASE_TEST
+
+SOURCE = 'https://opendata.potsdam.de/api/v2/catalog/exports/ttl'
+
+
+class Response:
+
+    def __init__(self, **headers):
+        self.headers = CaseInsensitiveDict(headers)
+
+
+class TestValidatorStore(TestCase):
+
+    def test_persistence(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'validators.json')
+            store = ValidatorStore(path)
+            store.update('http://example.org/a', 'repo', Response(ETag='"1"'), 'abc')
+            store.update('http://example.org/b', 'repo', Response(**{'Last-Modified': 'yesterday'}), 'def')
+
+            store = ValidatorStore(path)
+            self.assertEqual(len(store), 2)
+            self.assertEqual(store.conditional_headers('http://example.org/a', 'repo'), {'If-None-Match': '"1"'})
+            self.assertEqual(store.conditional_headers('http://example.org/b', 'repo'),
+                             {'If-Modified-Since': 'yesterday'})
+            self.assertEqual(store.conditional_headers('http://example.org/a', 'other'), {})
+
+            store.forget_repository('repo')
+            self.assertEqual(len(ValidatorStore(path)), 0)
+
+
+class TestConditionalHarvest(TestCase):
+
+    def setUp(self):
+        self.store = ValidatorStore()
+        self.rdf4j = RDF4J(RDF4J_BASE_TEST, validator_store=self.store)
+        self.rdf4j.create_repository('test_validators', auth=AUTH['admin'], overwrite=True)
+
+    def tearDown(self):
+        self.rdf4j.drop_repository('test_validators', auth=AUTH['admin'], accept_not_exist=True)
+
+    def test_skip_unchanged(self):
+        for stream in [False, True]:
+            with self.subTest(stream=stream):
+                response = self.rdf4j.bulk_load_from_uri(
+                    'test_validators', SOURCE, 'application/x-turtle', clear_repository=True,
+                    auth=AUTH['admin'], stream=stream)
+                self.assertNotIsInstance(response, SkippedSource)
+
+                skipped = self.rdf4j.bulk_load_from_uri(
+                    'test_validators', SOURCE, 'application/x-turtle', clear_repository=True,
+                    auth=AUTH['admin'], stream=stream)
+                self.assertIsInstance(skipped, SkippedSource)
+                self.assertIn(skipped, self.store.skipped)
+
+                self.rdf4j.empty_repository('test_validators', auth=AUTH['admin'])